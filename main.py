@@ -15,17 +15,27 @@ from views.receitas import ReceitasFrame
 from views.gastos_gerais import GastosGeraisFrame
 from views.historico import HistoricoFrame
 from views.visao_geral import VisaoGeralFrame
+from views.busca import BuscaFrame
+
+# Antecedência (em dias) com que uma conta não paga é lembrada
+DIAS_LEMBRETE = 5
+
+# Intervalo entre as verificações de contas não pagas enquanto o aplicativo está aberto (30 minutos)
+INTERVALO_LEMBRETES_MS = 30 * 60 * 1000
 
 class ControleGastosApp(tk.Tk):
     """Classe principal do aplicativo de controle de gastos"""
 
-    def __init__(self, modo_teste=False):
+    def __init__(self, modo_teste=False, armazenamento="json"):
         """Inicializa o aplicativo"""
         super().__init__()
         
         # Define o modo (teste ou produção)
         self.modo_teste = modo_teste
         
+        # Define onde os dados são persistidos (json, journal, sqlite ou particionado)
+        self.armazenamento = armazenamento
+        
         # Configurando a janela principal
         self.title(f"Controle Financeiro{' - MODO TESTE' if self.modo_teste else ''}")
         self.geometry("1000x650")
@@ -35,7 +45,7 @@ class ControleGastosApp(tk.Tk):
         self.configurar_tema()
         
         # Inicializando o gerenciador de dados com o modo apropriado
-        self.data_manager = DataManager(modo_teste=self.modo_teste)
+        self.data_manager = DataManager(modo_teste=self.modo_teste, armazenamento=self.armazenamento)
         
         # Criando o menu
         self.criar_menu()
@@ -57,40 +67,28 @@ class ControleGastosApp(tk.Tk):
         if self.modo_teste:
             self.criar_indicador_teste()
             
-        # Verificando contas não pagas e exibindo lembretes
-        self.verificar_contas_nao_pagas()
+        # Verificando contas não pagas e exibindo lembretes depois que a janela for desenhada,
+        # agendado como as verificações seguintes (e cancelado da mesma forma ao fechar)
+        self._lembrete_agendado = self.after_idle(self.verificar_contas_nao_pagas)
 
     def verificar_contas_nao_pagas(self):
         """Verifica se existem contas não pagas e exibe lembretes"""
-        # Obtendo o mês e ano atuais
         hoje = datetime.datetime.now()
-        mes_atual = hoje.month
-        ano_atual = hoje.year
-        
-        # Obtendo as contas fixas do período atual
-        contas_fixas = self.data_manager.obter_contas_fixas_por_periodo(mes_atual, ano_atual)
         
-        # Filtrando apenas as contas não pagas e com data limite próxima
+        # A fila de vencimentos devolve só as contas com data limite próxima (ou sem data) ainda não avisadas
         contas_nao_pagas = []
-        for conta in contas_fixas:
-            # Verificando se a conta não está paga
-            if not conta.get('pago', False):
-                # Verificando se tem data limite
-                if 'data_limite' in conta:
-                    try:
-                        data_limite = datetime.datetime.strptime(conta['data_limite'], "%d/%m/%Y")
-                        dias_restantes = (data_limite - hoje).days
-                        
-                        # Se faltam menos de 5 dias ou já passou da data
-                        if dias_restantes <= 5:
-                            status = "ATRASADA!" if dias_restantes < 0 else f"Vence em {dias_restantes} dias"
-                            contas_nao_pagas.append((conta['descricao'], conta['data_limite'], status))
-                    except ValueError:
-                        # Se a data estiver em formato inválido, inclui sem calcular dias
-                        contas_nao_pagas.append((conta['descricao'], conta.get('data_limite', 'Data desconhecida'), ""))
-                else:
-                    # Se não tiver data limite, inclui sem data
-                    contas_nao_pagas.append((conta['descricao'], "Sem data limite", ""))
+        for lembrete in self.data_manager.obter_lembretes_vencimento(hoje, DIAS_LEMBRETE):
+            data_limite = lembrete['vencimento']
+            if data_limite is not None:
+                dias_restantes = (data_limite - hoje).days
+                status = "ATRASADA!" if dias_restantes < 0 else f"Vence em {dias_restantes} dias"
+                contas_nao_pagas.append((lembrete['descricao'], data_limite.strftime("%d/%m/%Y"), status))
+            elif lembrete['data_limite']:
+                # Se a data estiver em formato inválido, inclui sem calcular dias
+                contas_nao_pagas.append((lembrete['descricao'], lembrete['data_limite'], ""))
+            else:
+                # Se não tiver data limite, inclui sem data
+                contas_nao_pagas.append((lembrete['descricao'], "Sem data limite", ""))
         
         # Se houver contas não pagas, exibe um lembrete
         if contas_nao_pagas:
@@ -101,6 +99,9 @@ class ControleGastosApp(tk.Tk):
             
             # Exibindo o lembrete
             messagebox.showwarning("Lembrete de Contas", mensagem)
+        
+        # Verificando de novo mais tarde, para avisar das contas que se aproximarem do vencimento com o aplicativo aberto
+        self._lembrete_agendado = self.after(INTERVALO_LEMBRETES_MS, self.verificar_contas_nao_pagas)
 
     def configurar_tema(self):
         """Configura o tema visual do aplicativo"""
@@ -214,7 +215,7 @@ class ControleGastosApp(tk.Tk):
             # Reiniciar o aplicativo com o modo alternado
             python = sys.executable
             modo = "" if self.modo_teste else "--teste"
-            os.execl(python, python, *sys.argv[0:1], modo)
+            os.execl(python, python, *sys.argv[0:1], modo, f"--armazenamento={self.armazenamento}")
 
     def criar_abas(self):
         """Cria as abas do aplicativo"""
@@ -237,6 +238,10 @@ class ControleGastosApp(tk.Tk):
         # Aba Histórico
         self.historico_frame = HistoricoFrame(self.notebook, self.data_manager)
         self.notebook.add(self.historico_frame, text="Histórico")
+        
+        # Aba Buscar
+        self.busca_frame = BuscaFrame(self.notebook, self.data_manager)
+        self.notebook.add(self.busca_frame, text="Buscar")
 
     def ao_mudar_aba(self, event=None):
         """Método chamado quando o usuário muda de aba"""
@@ -254,6 +259,8 @@ class ControleGastosApp(tk.Tk):
             self.contas_fixas_frame.atualizar()
         elif tab_index == 4:  # Histórico
             self.historico_frame.atualizar()
+        elif tab_index == 5:  # Buscar
+            self.busca_frame.atualizar()
 
     def mostrar_sobre(self):
         """Mostra informações sobre o aplicativo"""
@@ -321,15 +328,8 @@ class ControleGastosApp(tk.Tk):
     def salvar_dados_atuais(self):
         """Salva os dados atuais"""
         try:
-            # Obtendo os dados atuais
-            gastos = self.data_manager.obter_gastos()
-            receitas = self.data_manager.obter_receitas()
-            contas_fixas = self.data_manager.obter_contas_fixas()
-            
-            # Salvando cada tipo de dado no seu respectivo arquivo
-            self.data_manager.salvar_dados(self.data_manager.gastos_file, gastos)
-            self.data_manager.salvar_dados(self.data_manager.receitas_file, receitas)
-            self.data_manager.salvar_dados(self.data_manager.contas_fixas_file, contas_fixas)
+            # Gravando no armazenamento os dados carregados em memória
+            self.data_manager.sincronizar()
             
             print("Dados salvos com sucesso!")
             
@@ -343,8 +343,12 @@ class ControleGastosApp(tk.Tk):
             # Confirmando o fechamento
             if messagebox.askyesno("Confirmar", "Deseja realmente sair do aplicativo?"):
                 try:
+                    # Cancelando a próxima verificação de lembretes
+                    self.after_cancel(self._lembrete_agendado)
+                    
                     # Salvando os dados automaticamente
                     self.salvar_dados_atuais()
+                    self.data_manager.fechar()
                 finally:
                     # Garantindo que o aplicativo será fechado
                     self.quit()
@@ -361,7 +365,13 @@ def main():
     # Verifica se o modo teste foi solicitado via linha de comando
     modo_teste = "--teste" in sys.argv
     
-    app = ControleGastosApp(modo_teste=modo_teste)
+    # Verifica se outro armazenamento foi solicitado (ex.: --armazenamento=sqlite)
+    armazenamento = "json"
+    for argumento in sys.argv[1:]:
+        if argumento.startswith("--armazenamento="):
+            armazenamento = argumento.split("=", 1)[1]
+    
+    app = ControleGastosApp(modo_teste=modo_teste, armazenamento=armazenamento)
     app.mainloop()
 
 # Executando o aplicativo
@@ -0,0 +1,58 @@
+"""
+Módulo com o agrupamento (soma, quantidade, maior e menor valor) de gastos, receitas e contas fixas por dimensão
+"""
+from models.registros import para_reais
+
+# Dimensões pelas quais os valores podem ser agrupados e filtrados
+DIMENSOES = ('categoria', 'mes', 'ano', 'tipo')
+
+# Tipo de cada coleção na dimensão "tipo"
+TIPOS_AGRUPAMENTO = {
+    'gasto': 'gastos',
+    'receita': 'receitas',
+    'conta_fixa': 'contas_fixas'
+}
+
+class Agrupamento:
+    """Soma, quantidade, maior e menor valor (em centavos) de cada grupo, acumulados em uma única passada"""
+
+    def __init__(self):
+        """Inicializa o agrupamento sem nenhum grupo"""
+        # Chave do grupo -> [soma, quantidade, maior, menor]
+        self.grupos = {}
+
+    def adicionar(self, chave, centavos):
+        """Acumula um valor no seu grupo"""
+        grupo = self.grupos.get(chave)
+        if grupo is None:
+            self.grupos[chave] = [centavos, 1, centavos, centavos]
+            return
+        grupo[0] += centavos
+        grupo[1] += 1
+        if centavos > grupo[2]:
+            grupo[2] = centavos
+        if centavos < grupo[3]:
+            grupo[3] = centavos
+
+    def juntar(self, chave, soma, quantidade, maior, menor):
+        """Junta a um grupo valores já agregados (por exemplo, nas colunas dos gastos)"""
+        grupo = self.grupos.get(chave)
+        if grupo is None:
+            self.grupos[chave] = [soma, quantidade, maior, menor]
+            return
+        grupo[0] += soma
+        grupo[1] += quantidade
+        grupo[2] = max(grupo[2], maior)
+        grupo[3] = min(grupo[3], menor)
+
+    def resultado(self):
+        """Retorna {chave: {'soma', 'quantidade', 'maximo', 'minimo'}} com os valores em reais"""
+        return {
+            chave: {
+                'soma': para_reais(soma),
+                'quantidade': quantidade,
+                'maximo': para_reais(maior),
+                'minimo': para_reais(menor)
+            }
+            for chave, (soma, quantidade, maior, menor) in self.grupos.items()
+        }
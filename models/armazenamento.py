@@ -0,0 +1,112 @@
+"""
+Módulo de armazenamento em arquivos JSON para o aplicativo de controle de gastos
+"""
+import os
+import json
+
+# Tamanho dos blocos lidos por vez ao percorrer um arquivo JSON
+TAMANHO_BLOCO = 64 * 1024
+
+def iterar_json(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """Percorre os itens de um arquivo JSON cujo conteúdo é uma lista, mantendo em memória apenas um bloco por vez"""
+    decodificador = json.JSONDecoder()
+    try:
+        arquivo = open(caminho, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+
+    with arquivo:
+        buffer = ''
+        posicao = 0
+        fim_arquivo = False
+        dentro_da_lista = False
+
+        while True:
+            # Pulando espaços e separadores até o próximo valor
+            while posicao < len(buffer) and buffer[posicao] in ' \t\r\n,':
+                posicao += 1
+
+            if posicao < len(buffer):
+                if not dentro_da_lista:
+                    if buffer[posicao] != '[':
+                        # O arquivo não contém uma lista
+                        return
+                    dentro_da_lista = True
+                    posicao += 1
+                    continue
+
+                if buffer[posicao] == ']':
+                    return
+
+                try:
+                    item, fim_item = decodificador.raw_decode(buffer, posicao)
+                except json.JSONDecodeError:
+                    fim_item = None
+
+                # Um valor só está completo quando seguido de um separador: um número no fim do bloco ("0" de "0.1",
+                # por exemplo) pode continuar no próximo
+                if fim_item is not None and (fim_arquivo or (fim_item < len(buffer) and buffer[fim_item] in ' \t\r\n,]')):
+                    yield item
+                    posicao = fim_item
+                    continue
+
+                if fim_arquivo:
+                    # Conteúdo inválido ou truncado: a leitura para no último item completo
+                    return
+            elif fim_arquivo:
+                return
+
+            # Descartando o que já foi lido e acrescentando o próximo bloco
+            bloco = arquivo.read(tamanho_bloco)
+            buffer = buffer[posicao:] + bloco
+            posicao = 0
+            fim_arquivo = not bloco
+
+class ArmazenamentoJSON:
+    """Armazena cada coleção (gastos, receitas, contas fixas) em um arquivo JSON"""
+
+    def __init__(self, arquivos):
+        """Inicializa o armazenamento a partir de um dicionário coleção -> arquivo"""
+        self.arquivos = arquivos
+
+    def assinatura(self, nome):
+        """Retorna a assinatura (mtime, tamanho) do arquivo da coleção ou None se ele não existir"""
+        try:
+            info = os.stat(self.arquivos[nome])
+        except OSError:
+            return None
+        return (info.st_mtime_ns, info.st_size)
+
+    def versao_arquivos(self, nome):
+        """Retorna a versão persistente dos arquivos da coleção, que muda a cada gravação (usada pelo snapshot binário)"""
+        return self.assinatura(nome)
+
+    def carregar(self, nome):
+        """Carrega todos os registros de uma coleção"""
+        try:
+            with open(self.arquivos[nome], 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            # Se o arquivo estiver vazio ou não existir, retorna uma lista vazia
+            return []
+
+    def iterar(self, nome):
+        """Percorre os registros de uma coleção sem carregar o arquivo inteiro"""
+        return iterar_json(self.arquivos[nome])
+
+    def salvar(self, nome, dados):
+        """Grava todos os registros de uma coleção"""
+        with open(self.arquivos[nome], 'w', encoding='utf-8') as f:
+            json.dump(list(dados), f, indent=4, ensure_ascii=False)
+
+    def registrar(self, nome, operacoes, dados):
+        """Persiste uma lista de operações sobre a coleção (o JSON é sempre regravado por inteiro)"""
+        self.salvar(nome, dados)
+
+    def sincronizar(self, nome, dados):
+        """Grava a coleção por inteiro, garantindo que o arquivo reflita os dados em memória"""
+        self.salvar(nome, dados)
+
+    def fechar(self):
+        """Libera os recursos do armazenamento"""
+        pass
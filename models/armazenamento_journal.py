@@ -0,0 +1,274 @@
+"""
+Módulo de armazenamento em JSON com journal de operações para o aplicativo de controle de gastos
+"""
+import os
+import json
+import threading
+
+from models.armazenamento import ArmazenamentoJSON
+
+def aplicar_operacoes(dados, operacoes):
+    """Aplica uma sequência de operações sobre uma lista de registros e retorna a nova lista"""
+    # Indexando os registros pelo ID (registros antigos sem ID são mantidos na posição original)
+    registros = {}
+    for posicao, registro in enumerate(dados):
+        registros[registro.get('id', ('sem_id', posicao))] = registro
+
+    # As operações são idempotentes, então reaplicar um trecho já compactado não altera o resultado
+    for operacao in operacoes:
+        tipo = operacao['op']
+
+        if tipo in ('adicionar', 'atualizar'):
+            registro = operacao['registro']
+            registros[registro['id']] = registro
+        elif tipo == 'excluir':
+            registros.pop(operacao['id'], None)
+        elif tipo == 'pagar':
+            conta = registros.get(operacao['id'])
+            if conta is None:
+                continue
+
+            historico = conta.setdefault('historico_pagamentos', {})
+            if operacao['pagamento'] is None:
+                historico.pop(operacao['chave'], None)
+            else:
+                historico[operacao['chave']] = operacao['pagamento']
+        else:
+            raise ValueError(f"Operação desconhecida: {tipo}")
+
+    return list(registros.values())
+
+def _ultima_exclusao(operacoes_registro):
+    """Retorna a posição no journal da última exclusão de um registro ou -1 se ele não foi excluído"""
+    ultima = -1
+    for posicao, operacao in operacoes_registro:
+        if operacao['op'] == 'excluir':
+            ultima = posicao
+    return ultima
+
+def _posicao_inclusao(operacoes_registro):
+    """Retorna a posição no journal da inclusão que coloca o registro no fim da coleção ou None se ele não existe ao final"""
+    ultima_exclusao = _ultima_exclusao(operacoes_registro)
+    for posicao, operacao in operacoes_registro:
+        if posicao > ultima_exclusao and operacao['op'] in ('adicionar', 'atualizar'):
+            return posicao
+    return None
+
+class ArmazenamentoJournal(ArmazenamentoJSON):
+    """Mantém o JSON como snapshot e grava cada alteração como uma linha em um journal (.log) ao lado dele"""
+
+    def __init__(self, arquivos, limite_operacoes=200):
+        """Inicializa o armazenamento; o journal é compactado a cada `limite_operacoes` operações"""
+        super().__init__(arquivos)
+        self.limite_operacoes = limite_operacoes
+
+        # Operações gravadas no journal desde a última compactação, por coleção
+        self._pendentes = {}
+
+        # Estado dos arquivos após a última escrita feita por este processo e versão das alterações externas
+        self._estado_conhecido = {}
+        self._versao_externa = {}
+
+        # A compactação roda em segundo plano; a trava protege os arquivos durante as trocas
+        self._trava = threading.RLock()
+        self._compactacoes = {}
+
+        # Coleções cujo journal já teve uma última linha incompleta descartada antes da primeira gravação
+        self._journal_verificado = set()
+
+    def _arquivo_log(self, nome):
+        """Retorna o caminho do journal ativo de uma coleção"""
+        return self.arquivos[nome] + ".log"
+
+    def _arquivo_log_compactando(self, nome):
+        """Retorna o caminho do journal que está sendo incorporado ao snapshot"""
+        return self.arquivos[nome] + ".log.1"
+
+    def _estado_arquivos(self, nome):
+        """Retorna (mtime, tamanho) do snapshot e dos journals de uma coleção"""
+        estado = []
+        for arquivo in (self.arquivos[nome], self._arquivo_log_compactando(nome), self._arquivo_log(nome)):
+            try:
+                info = os.stat(arquivo)
+                estado.append((info.st_mtime_ns, info.st_size))
+            except OSError:
+                estado.append(None)
+        return tuple(estado)
+
+    def _registrar_estado(self, nome):
+        """Memoriza o estado dos arquivos após uma escrita feita por este processo"""
+        self._estado_conhecido[nome] = self._estado_arquivos(nome)
+
+    def assinatura(self, nome):
+        """Retorna a versão da coleção, que só muda quando outro processo altera os arquivos"""
+        with self._trava:
+            estado = self._estado_arquivos(nome)
+            if estado != self._estado_conhecido.get(nome):
+                self._versao_externa[nome] = self._versao_externa.get(nome, 0) + 1
+                self._estado_conhecido[nome] = estado
+            return self._versao_externa.get(nome, 0)
+
+    def versao_arquivos(self, nome):
+        """Retorna o estado do snapshot e dos journals, que muda a cada gravação (usado pelo snapshot binário)"""
+        with self._trava:
+            return self._estado_arquivos(nome)
+
+    def _ler_journal(self, arquivo):
+        """Lê as operações de um journal, ignorando uma última linha incompleta"""
+        operacoes = []
+        try:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        operacoes.append(json.loads(linha))
+                    except json.JSONDecodeError:
+                        # Linha truncada por uma gravação interrompida
+                        break
+        except FileNotFoundError:
+            pass
+        return operacoes
+
+    def carregar(self, nome):
+        """Carrega o snapshot e reaplica as operações registradas nos journals"""
+        with self._trava:
+            dados = super().carregar(nome)
+            compactando = self._ler_journal(self._arquivo_log_compactando(nome))
+            ativo = self._ler_journal(self._arquivo_log(nome))
+            self._pendentes[nome] = len(ativo)
+
+        return aplicar_operacoes(dados, compactando + ativo)
+
+    def iterar(self, nome):
+        """Percorre a coleção sem carregá-la inteira; só os registros citados nos journals ficam em memória"""
+        # A trava impede que uma compactação troque o snapshot durante a leitura
+        with self._trava:
+            operacoes = self._ler_journal(self._arquivo_log_compactando(nome)) + self._ler_journal(self._arquivo_log(nome))
+
+            # Agrupando as operações (e sua posição no journal) pelo ID do registro afetado
+            operacoes_por_id = {}
+            for posicao, operacao in enumerate(operacoes):
+                registro_id = operacao['registro']['id'] if 'registro' in operacao else operacao['id']
+                operacoes_por_id.setdefault(registro_id, []).append((posicao, operacao))
+
+            # Registros que vão para o fim da coleção, com a posição da operação que os incluiu
+            ao_final = []
+
+            # Os registros do snapshot saem na ordem original, já com as operações aplicadas
+            for registro in super().iterar(nome):
+                operacoes_registro = operacoes_por_id.pop(registro.get('id'), None)
+                if operacoes_registro is None:
+                    yield registro
+                    continue
+
+                # Sem exclusão o registro continua no mesmo lugar; excluído e incluído de novo, vai para o fim
+                if _ultima_exclusao(operacoes_registro) < 0:
+                    yield from aplicar_operacoes([registro], [operacao for _, operacao in operacoes_registro])
+                    continue
+
+                inclusao = _posicao_inclusao(operacoes_registro)
+                if inclusao is not None:
+                    ao_final.append((inclusao, [registro], operacoes_registro))
+
+            # Registros incluídos depois do snapshot (ou excluídos e incluídos de novo)
+            for operacoes_registro in operacoes_por_id.values():
+                inclusao = _posicao_inclusao(operacoes_registro)
+                if inclusao is not None:
+                    ao_final.append((inclusao, [], operacoes_registro))
+
+            ao_final.sort(key=lambda item: item[0])
+            for _, dados, operacoes_registro in ao_final:
+                yield from aplicar_operacoes(dados, [operacao for _, operacao in operacoes_registro])
+
+    def _descartar_linha_incompleta(self, arquivo):
+        """Remove do fim do journal uma linha gravada pela metade, para que as próximas operações não se juntem a ela"""
+        try:
+            with open(arquivo, 'rb+') as f:
+                conteudo = f.read()
+                if conteudo and not conteudo.endswith(b"\n"):
+                    f.truncate(conteudo.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    def registrar(self, nome, operacoes, dados):
+        """Acrescenta as operações ao journal; o custo não depende do tamanho do histórico"""
+        with self._trava:
+            if nome not in self._journal_verificado:
+                # Uma gravação interrompida pode ter deixado a última linha incompleta
+                self._descartar_linha_incompleta(self._arquivo_log(nome))
+                self._journal_verificado.add(nome)
+
+            with open(self._arquivo_log(nome), 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps(operacao, ensure_ascii=False) + "\n" for operacao in operacoes))
+            self._registrar_estado(nome)
+
+            self._pendentes[nome] = self._pendentes.get(nome, 0) + len(operacoes)
+            if self._pendentes[nome] >= self.limite_operacoes:
+                self._iniciar_compactacao(nome)
+
+    def _iniciar_compactacao(self, nome):
+        """Separa o journal ativo e o incorpora ao snapshot em uma thread"""
+        compactacao = self._compactacoes.get(nome)
+        if compactacao is not None and compactacao.is_alive():
+            return
+
+        # Um journal separado que sobrou de uma compactação interrompida é incorporado primeiro
+        if not os.path.exists(self._arquivo_log_compactando(nome)):
+            os.replace(self._arquivo_log(nome), self._arquivo_log_compactando(nome))
+            self._pendentes[nome] = 0
+            self._registrar_estado(nome)
+
+        compactacao = threading.Thread(target=self._compactar, args=(nome,), daemon=True)
+        self._compactacoes[nome] = compactacao
+        compactacao.start()
+
+    def _compactar(self, nome):
+        """Gera um novo snapshot a partir do snapshot atual e do journal separado"""
+        with self._trava:
+            dados = ArmazenamentoJSON.carregar(self, nome)
+        operacoes = self._ler_journal(self._arquivo_log_compactando(nome))
+        dados = aplicar_operacoes(dados, operacoes)
+
+        # Gravando em um arquivo temporário para que o snapshot nunca fique pela metade
+        temporario = self.arquivos[nome] + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, indent=4, ensure_ascii=False)
+
+        with self._trava:
+            os.replace(temporario, self.arquivos[nome])
+            os.remove(self._arquivo_log_compactando(nome))
+            self._registrar_estado(nome)
+
+    def _aguardar_compactacao(self, nome):
+        """Aguarda a compactação em andamento de uma coleção, se houver"""
+        compactacao = self._compactacoes.pop(nome, None)
+        if compactacao is not None:
+            compactacao.join()
+
+    def salvar(self, nome, dados):
+        """Grava a coleção inteira como novo snapshot e descarta os journals"""
+        self._aguardar_compactacao(nome)
+
+        with self._trava:
+            temporario = self.arquivos[nome] + ".tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(list(dados), f, indent=4, ensure_ascii=False)
+            os.replace(temporario, self.arquivos[nome])
+
+            for arquivo in (self._arquivo_log_compactando(nome), self._arquivo_log(nome)):
+                if os.path.exists(arquivo):
+                    os.remove(arquivo)
+
+            self._pendentes[nome] = 0
+            self._registrar_estado(nome)
+
+    def sincronizar(self, nome, dados):
+        """Compacta a coleção, incorporando ao snapshot as operações pendentes no journal"""
+        with self._trava:
+            possui_journal = self._pendentes.get(nome, 0) > 0 or os.path.exists(self._arquivo_log_compactando(nome))
+        if possui_journal:
+            self.salvar(nome, dados)
+
+    def fechar(self):
+        """Aguarda as compactações em andamento"""
+        for nome in list(self._compactacoes):
+            self._aguardar_compactacao(nome)
@@ -0,0 +1,228 @@
+"""
+Módulo de armazenamento dos gastos em um arquivo JSON por mês para o aplicativo de controle de gastos
+"""
+import os
+import json
+import heapq
+
+from models.armazenamento import ArmazenamentoJSON, iterar_json
+from models.armazenamento_journal import aplicar_operacoes
+from models.registros import periodo_data
+
+# Partição dos gastos cuja data não pôde ser interpretada
+SEM_DATA = "sem_data"
+
+def particao_gasto(gasto):
+    """Retorna o nome da partição (AAAA-MM) de um gasto"""
+    periodo = periodo_data(gasto.get('data'))
+    if periodo is None:
+        return SEM_DATA
+    return f"{periodo[0]:04d}-{periodo[1]:02d}"
+
+def _ordem_id(gasto):
+    """Chave de ordenação dos gastos pelo ID (gastos sem ID vêm primeiro), a mesma ordem do arquivo JSON único"""
+    return gasto.get('id') or 0
+
+def _ler_json(caminho):
+    """Lê uma lista de um arquivo JSON, retornando uma lista vazia se ele não existir ou for inválido"""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return []
+
+def _gravar_json(caminho, dados):
+    """Grava um JSON em um arquivo temporário e o move para o lugar, para que nunca fique pela metade"""
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, indent=4, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+def _remover(caminho):
+    """Remove um arquivo, se ele existir"""
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+class ArmazenamentoParticionado(ArmazenamentoJSON):
+    """Guarda os gastos em um arquivo por mês (AAAA-MM.json) listado em um manifesto; as demais coleções ficam no JSON"""
+
+    # Coleções que podem ser consultadas por período direto no armazenamento
+    colecoes_por_periodo = ('gastos',)
+
+    def __init__(self, arquivos, diretorio):
+        """Inicializa o armazenamento; na primeira execução os gastos são migrados do arquivo JSON único"""
+        super().__init__(arquivos)
+        self.diretorio = diretorio
+        self.arquivo_manifesto = os.path.join(diretorio, "manifesto.json")
+
+        # Partição de cada gasto (ID -> AAAA-MM), conhecida a partir da última carga completa
+        self._particao_por_id = {}
+        self._mapa_completo = False
+
+        # Migração única do arquivo de gastos existente (que é mantido como está)
+        if not os.path.exists(self.arquivo_manifesto):
+            os.makedirs(diretorio, exist_ok=True)
+            self.salvar('gastos', ArmazenamentoJSON.carregar(self, 'gastos'))
+
+    def _arquivo_particao(self, particao):
+        """Retorna o caminho do arquivo de uma partição"""
+        return os.path.join(self.diretorio, particao + ".json")
+
+    def _ler_manifesto(self):
+        """Lê o manifesto com as partições existentes e a quantidade de gastos de cada uma"""
+        try:
+            with open(self.arquivo_manifesto, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {'versao': 0, 'particoes': {}}
+
+    def _gravar_manifesto(self, manifesto, particoes):
+        """Grava o manifesto com as partições informadas, incrementando sua versão"""
+        manifesto['versao'] = manifesto.get('versao', 0) + 1
+        manifesto['particoes'] = dict(sorted(particoes.items()))
+        _gravar_json(self.arquivo_manifesto, manifesto)
+
+    def _particoes(self):
+        """Retorna as partições de gastos em ordem cronológica"""
+        return sorted(self._ler_manifesto()['particoes'])
+
+    def assinatura(self, nome):
+        """Retorna a assinatura da coleção; para os gastos é a do manifesto, regravado a cada alteração"""
+        if nome != 'gastos':
+            return super().assinatura(nome)
+
+        try:
+            info = os.stat(self.arquivo_manifesto)
+        except OSError:
+            return None
+        return (info.st_mtime_ns, info.st_size)
+
+    def carregar(self, nome):
+        """Carrega todos os registros de uma coleção; os gastos das partições são juntados na ordem dos IDs"""
+        if nome != 'gastos':
+            return super().carregar(nome)
+
+        self._particao_por_id = {}
+        dados = []
+        for particao in self._particoes():
+            for gasto in _ler_json(self._arquivo_particao(particao)):
+                self._particao_por_id[gasto.get('id')] = particao
+                dados.append(gasto)
+
+        # A mesma ordem do armazenamento JSON, em que os gastos ficam na ordem em que foram incluídos
+        dados.sort(key=_ordem_id)
+        self._mapa_completo = True
+        return dados
+
+    def carregar_periodo(self, nome, mes, ano):
+        """Carrega apenas os gastos do mês/ano, lendo somente o arquivo da partição"""
+        if nome != 'gastos':
+            return super().carregar(nome)
+        return _ler_json(self._arquivo_particao(f"{ano:04d}-{mes:02d}"))
+
+    def iterar(self, nome):
+        """Percorre os registros de uma coleção; os gastos são lidos uma partição por vez"""
+        if nome != 'gastos':
+            return super().iterar(nome)
+        return self._iterar_gastos()
+
+    def _iterar_gastos(self):
+        """Percorre os gastos de todas as partições na ordem dos IDs, intercalando as partições (já ordenadas)"""
+        particoes = [iterar_json(self._arquivo_particao(particao)) for particao in self._particoes()]
+        yield from heapq.merge(*particoes, key=_ordem_id)
+
+    def salvar(self, nome, dados):
+        """Grava todos os registros de uma coleção; os gastos são redistribuídos entre as partições"""
+        if nome != 'gastos':
+            super().salvar(nome, dados)
+            return
+
+        # Cada partição fica na ordem dos IDs, para que as partições possam ser intercaladas ao percorrê-las
+        particoes = {}
+        for gasto in sorted(dados, key=_ordem_id):
+            particoes.setdefault(particao_gasto(gasto), []).append(gasto)
+
+        # Removendo as partições que ficaram vazias
+        manifesto = self._ler_manifesto()
+        for particao in manifesto['particoes']:
+            if particao not in particoes:
+                _remover(self._arquivo_particao(particao))
+
+        for particao, gastos in particoes.items():
+            _gravar_json(self._arquivo_particao(particao), gastos)
+
+        self._gravar_manifesto(manifesto, {particao: len(gastos) for particao, gastos in particoes.items()})
+
+        self._particao_por_id = {
+            gasto.get('id'): particao for particao, gastos in particoes.items() for gasto in gastos
+        }
+        self._mapa_completo = True
+
+    def _localizar(self, gasto_id):
+        """Retorna a partição atual de um gasto ou None se ele não existir"""
+        if not self._mapa_completo:
+            # Sem uma carga completa neste processo, o mapa é montado percorrendo as partições
+            self._particao_por_id = {}
+            for particao in self._particoes():
+                for gasto in iterar_json(self._arquivo_particao(particao)):
+                    self._particao_por_id[gasto.get('id')] = particao
+            self._mapa_completo = True
+
+        return self._particao_por_id.get(gasto_id)
+
+    def registrar(self, nome, operacoes, dados):
+        """Persiste as operações sobre os gastos regravando apenas as partições afetadas"""
+        if nome != 'gastos':
+            super().registrar(nome, operacoes, dados)
+            return
+
+        # Separando as operações pela partição que cada uma altera
+        operacoes_por_particao = {}
+        for operacao in operacoes:
+            tipo = operacao['op']
+
+            if tipo in ('adicionar', 'atualizar'):
+                gasto = operacao['registro']
+                nova = particao_gasto(gasto)
+                antiga = self._localizar(gasto['id'])
+
+                # Um gasto que mudou de mês sai da partição antiga
+                if antiga is not None and antiga != nova:
+                    operacoes_por_particao.setdefault(antiga, []).append({'op': 'excluir', 'id': gasto['id']})
+                operacoes_por_particao.setdefault(nova, []).append(operacao)
+                self._particao_por_id[gasto['id']] = nova
+            elif tipo == 'excluir':
+                antiga = self._localizar(operacao['id'])
+                if antiga is not None:
+                    operacoes_por_particao.setdefault(antiga, []).append(operacao)
+                    del self._particao_por_id[operacao['id']]
+            else:
+                raise ValueError(f"Operação desconhecida: {tipo}")
+
+        manifesto = self._ler_manifesto()
+        particoes = dict(manifesto['particoes'])
+        for particao, operacoes_particao in operacoes_por_particao.items():
+            caminho = self._arquivo_particao(particao)
+            gastos = sorted(aplicar_operacoes(_ler_json(caminho), operacoes_particao), key=_ordem_id)
+
+            if gastos:
+                _gravar_json(caminho, gastos)
+                particoes[particao] = len(gastos)
+            else:
+                _remover(caminho)
+                particoes.pop(particao, None)
+
+        self._gravar_manifesto(manifesto, particoes)
+
+    def sincronizar(self, nome, dados):
+        """Grava a coleção por inteiro; as partições de gastos já estão sempre atualizadas"""
+        if nome != 'gastos':
+            super().sincronizar(nome, dados)
+
+def migrar_json_para_particionado(arquivo_json, diretorio):
+    """Distribui os gastos de um arquivo JSON único em partições mensais e retorna a quantidade migrada"""
+    if os.path.exists(os.path.join(diretorio, "manifesto.json")):
+        raise FileExistsError(f"Já existe um armazenamento particionado em {diretorio}")
+
+    armazenamento = ArmazenamentoParticionado({'gastos': arquivo_json}, diretorio)
+    return sum(armazenamento._ler_manifesto()['particoes'].values())
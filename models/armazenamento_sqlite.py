@@ -0,0 +1,283 @@
+"""
+Módulo de armazenamento em SQLite para o aplicativo de controle de gastos
+"""
+import os
+import json
+import sqlite3
+
+from models.armazenamento import ArmazenamentoJSON
+
+# Esquema do banco: os campos usados em consultas ficam em colunas indexadas
+# e o registro completo é guardado como JSON na coluna "dados"
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS gastos (
+    id INTEGER PRIMARY KEY,
+    ano INTEGER,
+    mes INTEGER,
+    categoria TEXT,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_gastos_periodo ON gastos (ano, mes);
+CREATE INDEX IF NOT EXISTS idx_gastos_categoria ON gastos (categoria);
+
+CREATE TABLE IF NOT EXISTS receitas (
+    id INTEGER PRIMARY KEY,
+    ano INTEGER,
+    mes INTEGER,
+    recorrente INTEGER NOT NULL DEFAULT 0,
+    inicio INTEGER,
+    fim INTEGER,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_receitas_periodo ON receitas (ano, mes);
+CREATE INDEX IF NOT EXISTS idx_receitas_vigencia ON receitas (inicio, fim);
+
+CREATE TABLE IF NOT EXISTS contas_fixas (
+    id INTEGER PRIMARY KEY,
+    ano INTEGER,
+    mes INTEGER,
+    recorrente INTEGER NOT NULL DEFAULT 0,
+    inicio INTEGER,
+    fim INTEGER,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_contas_fixas_periodo ON contas_fixas (ano, mes);
+CREATE INDEX IF NOT EXISTS idx_contas_fixas_vigencia ON contas_fixas (inicio, fim);
+
+CREATE TABLE IF NOT EXISTS pagamentos (
+    conta_id INTEGER NOT NULL,
+    chave TEXT NOT NULL,
+    dados TEXT NOT NULL,
+    PRIMARY KEY (conta_id, chave)
+);
+"""
+
+def _ano_mes(data):
+    """Extrai (ano, mes) de uma data no formato DD/MM/AAAA"""
+    try:
+        _, mes, ano = data.split('/')
+        return int(ano), int(mes)
+    except (AttributeError, ValueError):
+        return None, None
+
+def _ordinal(data):
+    """Converte uma data DD/MM/AAAA no ordinal de mês (ano * 12 + mês)"""
+    ano, mes = _ano_mes(data)
+    if ano is None:
+        return None
+    return ano * 12 + mes
+
+def _renumerar(dados):
+    """Dá um ID novo aos registros sem ID inteiro ou com ID repetido, que a chave primária do banco descartaria"""
+    # Os IDs novos continuam a partir do maior ID válido, na ordem do arquivo
+    proximo_id = max((registro['id'] for registro in dados if type(registro.get('id')) is int), default=0) + 1
+    vistos = set()
+    registros = []
+    renumerados = []
+    for posicao, registro in enumerate(dados):
+        registro_id = registro.get('id')
+        if type(registro_id) is not int or registro_id in vistos:
+            renumerados.append((posicao, registro_id, proximo_id))
+            registro = dict(registro, id=proximo_id)
+            registro_id = proximo_id
+            proximo_id += 1
+        vistos.add(registro_id)
+        registros.append(registro)
+    return registros, renumerados
+
+class ArmazenamentoSQLite:
+    """Armazena as coleções em um banco SQLite, gravando uma linha por alteração"""
+
+    # Coleções que podem ser consultadas por período direto no armazenamento
+    colecoes_por_periodo = ('gastos', 'receitas', 'contas_fixas')
+
+    def __init__(self, caminho_banco, arquivos_json=None):
+        """Abre (ou cria) o banco; um banco novo é populado a partir dos arquivos JSON"""
+        self.caminho_banco = caminho_banco
+        banco_novo = not os.path.exists(caminho_banco)
+
+        self.conexao = sqlite3.connect(caminho_banco)
+        self.conexao.executescript(ESQUEMA)
+
+        # Registros renumerados na última importação dos arquivos JSON
+        self.renumerados = {}
+
+        # Migração única dos arquivos JSON existentes
+        if banco_novo and arquivos_json:
+            self.importar_json(arquivos_json)
+
+    def importar_json(self, arquivos_json):
+        """Substitui o conteúdo do banco pelos dados dos arquivos JSON, renumerando os IDs repetidos ou ausentes"""
+        origem = ArmazenamentoJSON(arquivos_json)
+        totais = {}
+        # Coleção -> [(posição no arquivo, ID antigo, ID novo)]
+        self.renumerados = {}
+        for nome in ('gastos', 'receitas', 'contas_fixas'):
+            if nome in arquivos_json:
+                dados, renumerados = _renumerar(origem.carregar(nome))
+                self.salvar(nome, dados)
+                totais[nome] = len(dados)
+                if renumerados:
+                    self.renumerados[nome] = renumerados
+        return totais
+
+    def assinatura(self, nome):
+        """Retorna a versão do banco, que muda quando outra conexão grava alterações"""
+        return self.conexao.execute("PRAGMA data_version").fetchone()[0]
+
+    def carregar(self, nome):
+        """Carrega todos os registros de uma coleção"""
+        linhas = self.conexao.execute(f"SELECT id, dados FROM {nome} ORDER BY id").fetchall()
+        return self._montar_registros(nome, linhas, todos=True)
+
+    def iterar(self, nome):
+        """Percorre os registros de uma coleção linha a linha, sem montar a lista inteira"""
+        if nome == 'contas_fixas':
+            # As contas são poucas e precisam do histórico de pagamentos, montado em conjunto
+            yield from self.carregar(nome)
+            return
+
+        for registro_id, dados in self.conexao.execute(f"SELECT id, dados FROM {nome} ORDER BY id"):
+            registro = json.loads(dados)
+            registro['id'] = registro_id
+            yield registro
+
+    def carregar_periodo(self, nome, mes, ano):
+        """Carrega apenas os registros que podem pertencer ao mês/ano, usando os índices do banco"""
+        if nome == 'gastos':
+            linhas = self.conexao.execute(
+                "SELECT id, dados FROM gastos WHERE ano = ? AND mes = ? ORDER BY id", (ano, mes)
+            ).fetchall()
+        else:
+            ordinal = ano * 12 + mes
+            linhas = self.conexao.execute(
+                f"SELECT id, dados FROM {nome} "
+                "WHERE (recorrente = 0 AND ano = ? AND mes = ?) "
+                "OR (recorrente = 1 AND (inicio IS NULL OR inicio <= ?) AND (fim IS NULL OR fim >= ?)) "
+                "ORDER BY id",
+                (ano, mes, ordinal, ordinal)
+            ).fetchall()
+        return self._montar_registros(nome, linhas)
+
+    def _montar_registros(self, nome, linhas, todos=False):
+        """Converte linhas (id, dados) em registros, anexando o histórico de pagamentos das contas"""
+        registros = []
+        for registro_id, dados in linhas:
+            registro = json.loads(dados)
+            registro['id'] = registro_id
+            registros.append(registro)
+
+        # O histórico de pagamentos das contas fica em uma tabela própria
+        if nome == 'contas_fixas' and registros:
+            if todos:
+                cursor = self.conexao.execute("SELECT conta_id, chave, dados FROM pagamentos ORDER BY rowid")
+            else:
+                ids = [registro['id'] for registro in registros]
+                marcadores = ", ".join("?" * len(ids))
+                cursor = self.conexao.execute(
+                    f"SELECT conta_id, chave, dados FROM pagamentos WHERE conta_id IN ({marcadores}) ORDER BY rowid",
+                    ids
+                )
+
+            historicos = {}
+            for conta_id, chave, dados in cursor:
+                historicos.setdefault(conta_id, {})[chave] = json.loads(dados)
+
+            for registro in registros:
+                if registro['id'] in historicos:
+                    registro['historico_pagamentos'] = historicos[registro['id']]
+
+        return registros
+
+    def salvar(self, nome, dados):
+        """Grava todos os registros de uma coleção"""
+        with self.conexao:
+            self.conexao.execute(f"DELETE FROM {nome}")
+            if nome == 'contas_fixas':
+                self.conexao.execute("DELETE FROM pagamentos")
+
+            for registro in dados:
+                self._gravar_registro(nome, registro)
+
+    def registrar(self, nome, operacoes, dados):
+        """Persiste uma lista de operações sobre a coleção em uma única transação"""
+        with self.conexao:
+            for operacao in operacoes:
+                tipo = operacao['op']
+
+                if tipo in ('adicionar', 'atualizar'):
+                    self._gravar_registro(nome, operacao['registro'])
+                elif tipo == 'excluir':
+                    self.conexao.execute(f"DELETE FROM {nome} WHERE id = ?", (operacao['id'],))
+                    if nome == 'contas_fixas':
+                        self.conexao.execute("DELETE FROM pagamentos WHERE conta_id = ?", (operacao['id'],))
+                elif tipo == 'pagar':
+                    if operacao['pagamento'] is None:
+                        self.conexao.execute(
+                            "DELETE FROM pagamentos WHERE conta_id = ? AND chave = ?",
+                            (operacao['id'], operacao['chave'])
+                        )
+                    else:
+                        self.conexao.execute(
+                            "INSERT OR REPLACE INTO pagamentos (conta_id, chave, dados) VALUES (?, ?, ?)",
+                            (operacao['id'], operacao['chave'], json.dumps(operacao['pagamento'], ensure_ascii=False))
+                        )
+                else:
+                    raise ValueError(f"Operação desconhecida: {tipo}")
+
+    def _gravar_registro(self, nome, registro):
+        """Insere ou substitui a linha de um registro"""
+        if nome == 'gastos':
+            ano, mes = _ano_mes(registro.get('data'))
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO gastos (id, ano, mes, categoria, dados) VALUES (?, ?, ?, ?, ?)",
+                (registro.get('id'), ano, mes, registro.get('categoria'), json.dumps(registro, ensure_ascii=False))
+            )
+            return
+
+        recorrente = bool(registro.get('recorrente', False))
+        if recorrente:
+            ano, mes = None, None
+            inicio = _ordinal(registro.get('data_inicio'))
+            fim = _ordinal(registro.get('data_fim'))
+        elif nome == 'receitas':
+            ano, mes = _ano_mes(registro.get('data'))
+            inicio, fim = None, None
+        else:
+            ano, mes = registro.get('ano'), registro.get('mes')
+            inicio, fim = None, None
+
+        # O histórico de pagamentos das contas é gravado na tabela de pagamentos
+        dados = registro
+        if nome == 'contas_fixas':
+            dados = {k: v for k, v in registro.items() if k != 'historico_pagamentos'}
+
+        self.conexao.execute(
+            f"INSERT OR REPLACE INTO {nome} (id, ano, mes, recorrente, inicio, fim, dados) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (registro.get('id'), ano, mes, int(recorrente), inicio, fim, json.dumps(dados, ensure_ascii=False))
+        )
+
+        if nome == 'contas_fixas':
+            self.conexao.execute("DELETE FROM pagamentos WHERE conta_id = ?", (registro.get('id'),))
+            for chave, pagamento in registro.get('historico_pagamentos', {}).items():
+                self.conexao.execute(
+                    "INSERT INTO pagamentos (conta_id, chave, dados) VALUES (?, ?, ?)",
+                    (registro.get('id'), chave, json.dumps(pagamento, ensure_ascii=False))
+                )
+
+    def sincronizar(self, nome, dados):
+        """As alterações já são gravadas linha a linha, então não há nada a regravar"""
+        self.conexao.commit()
+
+    def fechar(self):
+        """Fecha a conexão com o banco"""
+        self.conexao.close()
+
+def migrar_json_para_sqlite(arquivos_json, caminho_banco):
+    """Migra os arquivos JSON para um banco SQLite e retorna a quantidade de registros por coleção (nenhum é descartado)"""
+    armazenamento = ArmazenamentoSQLite(caminho_banco)
+    try:
+        return armazenamento.importar_json(arquivos_json)
+    finally:
+        armazenamento.fechar()
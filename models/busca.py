@@ -0,0 +1,161 @@
+"""
+Módulo com o índice de trigramas das descrições, usado na busca de registros em todos os períodos
+"""
+import datetime
+import unicodedata
+from functools import lru_cache
+
+@lru_cache(maxsize=65536)
+def normalizar_texto(texto):
+    """Converte um texto para a forma usada na busca: sem acentos, em minúsculas e com espaços simples"""
+    if not isinstance(texto, str):
+        return ""
+    if texto.isascii():
+        # Sem acentos a decompor
+        return " ".join(texto.casefold().split())
+    decomposto = unicodedata.normalize('NFKD', texto)
+    sem_acentos = "".join(caractere for caractere in decomposto if not unicodedata.combining(caractere))
+    return " ".join(sem_acentos.casefold().split())
+
+def trigramas(texto):
+    """Retorna o conjunto de sequências de três caracteres de um texto normalizado"""
+    return {texto[posicao:posicao + 3] for posicao in range(len(texto) - 2)}
+
+class IndiceTexto:
+    """Índice invertido de trigramas das descrições de uma coleção, atualizado a cada alteração"""
+
+    def __init__(self, campo='descricao'):
+        """Inicializa o índice vazio para o campo informado"""
+        self.campo = campo
+        # Texto normalizado -> {id do registro: registro}; descrições repetidas compartilham a mesma entrada
+        self.textos = {}
+        # Trigrama -> textos normalizados que o contêm
+        self.trigramas = {}
+        # id do registro -> texto normalizado
+        self._texto_do_registro = {}
+        # Registros ainda não indexados (id do registro -> registro); o índice só é montado na primeira busca
+        self._pendentes = None
+
+    def reconstruir(self, registros):
+        """Reconstrói o índice a partir de todos os registros, adiando a montagem até a primeira busca"""
+        self.textos = {}
+        self.trigramas = {}
+        self._texto_do_registro = {}
+        self._pendentes = {id(registro): registro for registro in registros}
+
+    def _montar(self):
+        """Indexa os registros cuja montagem foi adiada"""
+        pendentes, self._pendentes = self._pendentes, None
+
+        # Os registros são agrupados pelo texto normalizado antes de os textos novos entrarem nos trigramas
+        campo = self.campo
+        for chave, registro in pendentes.items():
+            texto = normalizar_texto(getattr(registro, campo))
+            self._texto_do_registro[chave] = texto
+            registros = self.textos.get(texto)
+            if registros is None:
+                registros = self.textos[texto] = {}
+            registros[chave] = registro
+        for texto in self.textos:
+            for trigrama in trigramas(texto):
+                self.trigramas.setdefault(trigrama, set()).add(texto)
+
+    def adicionar(self, registro):
+        """Inclui a descrição de um registro"""
+        if self._pendentes is not None:
+            self._pendentes[id(registro)] = registro
+            return
+
+        texto = normalizar_texto(getattr(registro, self.campo))
+        self._texto_do_registro[id(registro)] = texto
+
+        registros = self.textos.get(texto)
+        if registros is None:
+            # Um texto novo entra nas listas de cada um dos seus trigramas
+            registros = self.textos[texto] = {}
+            for trigrama in trigramas(texto):
+                self.trigramas.setdefault(trigrama, set()).add(texto)
+        registros[id(registro)] = registro
+
+    def remover(self, registro):
+        """Retira a descrição de um registro"""
+        if self._pendentes is not None:
+            self._pendentes.pop(id(registro), None)
+            return
+
+        texto = self._texto_do_registro.pop(id(registro), None)
+        if texto is None:
+            return
+
+        registros = self.textos[texto]
+        registros.pop(id(registro), None)
+        if registros:
+            return
+
+        # O último registro com esse texto leva o texto junto
+        del self.textos[texto]
+        for trigrama in trigramas(texto):
+            textos = self.trigramas[trigrama]
+            textos.discard(texto)
+            if not textos:
+                del self.trigramas[trigrama]
+
+    def estimar(self, consulta):
+        """Retorna um limite superior da quantidade de registros encontrados pela busca, sem executá-la"""
+        consulta = normalizar_texto(consulta)
+        if not consulta:
+            return 0
+        if self._pendentes is not None:
+            self._montar()
+        if len(consulta) < 3:
+            return len(self._texto_do_registro)
+
+        # Os encontrados estão entre os registros dos textos da lista de trigramas mais curta
+        textos = min((self.trigramas.get(trigrama, ()) for trigrama in trigramas(consulta)), key=len)
+        return sum(len(self.textos[texto]) for texto in textos)
+
+    def buscar(self, consulta):
+        """Retorna os registros cuja descrição contém a consulta, ignorando acentos e maiúsculas"""
+        consulta = normalizar_texto(consulta)
+        if not consulta:
+            return []
+        if self._pendentes is not None:
+            self._montar()
+
+        if len(consulta) < 3:
+            # Consultas curtas não têm trigramas: os textos distintos são verificados um a um
+            candidatos = self.textos
+        else:
+            # Os candidatos contêm todos os trigramas da consulta, começando pela lista mais curta
+            listas = sorted((self.trigramas.get(trigrama, ()) for trigrama in trigramas(consulta)), key=len)
+            if not listas[0]:
+                return []
+            candidatos = set(listas[0]).intersection(*listas[1:])
+
+        # A presença dos trigramas não garante a sequência, que é confirmada no texto
+        encontrados = []
+        for texto in candidatos:
+            if consulta in texto:
+                encontrados.extend(self.textos[texto].values())
+        return encontrados
+
+def recencia(registro, mes_atual):
+    """Retorna o ordinal do dia mais recente de um registro, usado para ordenar os resultados da busca"""
+    # Gastos e receitas pontuais têm a própria data
+    dia = getattr(registro, 'dia', None)
+    vigencia = registro.vigencia
+    if vigencia is None:
+        if dia is not None:
+            return dia
+        periodo = registro.periodo
+        if periodo is None:
+            return -1
+        ordinal = periodo[0] * 12 + periodo[1]
+    else:
+        # Um registro recorrente vale pelo último mês em que ocorreu (o atual, se ainda estiver em vigor)
+        inicio, fim = vigencia
+        ordinal = max(inicio, min(mes_atual, fim if fim is not None else mes_atual))
+
+    # O mês vira o ordinal do seu primeiro dia
+    ano, mes = divmod(ordinal - 1, 12)
+    return datetime.date(ano, mes + 1, 1).toordinal()
@@ -0,0 +1,204 @@
+"""
+Módulo com o armazenamento em colunas (arrays NumPy) dos gastos, usado nos relatórios por intervalo de meses
+"""
+import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    # O NumPy é opcional: sem ele, o gerenciador de dados soma os registros diretamente
+    np = None
+
+# Indica se as colunas podem ser usadas (o NumPy está instalado)
+COLUNAS_DISPONIVEIS = np is not None
+
+# Ordinal (date.toordinal) de 01/01/1970, origem do datetime64 do NumPy
+_ORIGEM_EPOCA = datetime.date(1970, 1, 1).toordinal()
+
+# Ordinal de mês (ano * 12 + mês) de janeiro de 1970
+_MES_EPOCA = 1970 * 12 + 1
+
+# Mês usado para gastos com data inválida: entram nos totais gerais, mas em nenhum intervalo
+SEM_MES = -1
+
+def meses_dos_dias(dias):
+    """Converte um array de ordinais de dia em ordinais de mês (ano * 12 + mês)"""
+    datas = (np.asarray(dias, dtype=np.int64) - _ORIGEM_EPOCA).astype('datetime64[D]')
+    return datas.astype('datetime64[M]').astype(np.int64) + _MES_EPOCA
+
+class ColunasGastos:
+    """Mantém valor (centavos), mês e categoria de cada gasto em arrays, atualizados a cada alteração"""
+
+    def __init__(self, categorias=()):
+        """Inicializa as colunas; as categorias informadas recebem os primeiros códigos, na ordem dada"""
+        self._categorias_iniciais = list(categorias)
+        self.reconstruir([])
+
+    def reconstruir(self, registros):
+        """Reconstrói as colunas a partir de todos os gastos"""
+        registros = list(registros)
+        self.categorias = list(self._categorias_iniciais)
+        self._codigos = {categoria: codigo for codigo, categoria in enumerate(self.categorias)}
+
+        self._registros = registros
+        # Linha de cada gasto (id do registro -> linha), montada só na primeira remoção
+        self._linhas_por_registro = None
+        self.tamanho = len(registros)
+
+        # As colunas são montadas em bloco; datas inválidas ficam com o mês SEM_MES
+        capacidade = max(16, self.tamanho)
+        self.centavos = np.zeros(capacidade, dtype=np.int64)
+        self.meses = np.full(capacidade, SEM_MES, dtype=np.int64)
+        self.codigos = np.zeros(capacidade, dtype=np.int64)
+        if not registros:
+            return
+
+        self.centavos[:self.tamanho] = [registro.centavos for registro in registros]
+        codigos = self._codigos
+        self.codigos[:self.tamanho] = [
+            codigos[registro.categoria] if registro.categoria in codigos else self._codigo(registro.categoria)
+            for registro in registros
+        ]
+        dias = np.array([registro.dia if registro.dia is not None else 0 for registro in registros], dtype=np.int64)
+        validos = np.array([registro.dia is not None for registro in registros], dtype=bool)
+        self.meses[:self.tamanho] = np.where(validos, meses_dos_dias(np.where(validos, dias, _ORIGEM_EPOCA)), SEM_MES)
+
+    def _codigo(self, categoria):
+        """Retorna o código de uma categoria, criando um novo se ela ainda não existir"""
+        codigo = self._codigos.get(categoria)
+        if codigo is None:
+            codigo = len(self.categorias)
+            self._codigos[categoria] = codigo
+            self.categorias.append(categoria)
+        return codigo
+
+    @property
+    def _linhas(self):
+        """Retorna o dicionário id do registro -> linha, montando-o na primeira vez"""
+        if self._linhas_por_registro is None:
+            self._linhas_por_registro = {id(registro): linha for linha, registro in enumerate(self._registros)}
+        return self._linhas_por_registro
+
+    def adicionar(self, registro):
+        """Inclui um gasto no fim das colunas, dobrando a capacidade quando necessário"""
+        if self.tamanho == len(self.centavos):
+            capacidade = 2 * len(self.centavos)
+            self.centavos = np.resize(self.centavos, capacidade)
+            self.meses = np.resize(self.meses, capacidade)
+            self.codigos = np.resize(self.codigos, capacidade)
+
+        linha = self.tamanho
+        self.centavos[linha] = registro.centavos
+        self.meses[linha] = meses_dos_dias([registro.dia])[0] if registro.dia is not None else SEM_MES
+        self.codigos[linha] = self._codigo(registro.categoria)
+
+        self._registros.append(registro)
+        if self._linhas_por_registro is not None:
+            self._linhas_por_registro[id(registro)] = linha
+        self.tamanho += 1
+
+    def remover(self, registro):
+        """Retira um gasto das colunas, movendo o último para a linha liberada"""
+        linha = self._linhas.pop(id(registro), None)
+        if linha is None:
+            return
+
+        ultima = self.tamanho - 1
+        if linha != ultima:
+            movido = self._registros[ultima]
+            self.centavos[linha] = self.centavos[ultima]
+            self.meses[linha] = self.meses[ultima]
+            self.codigos[linha] = self.codigos[ultima]
+            self._registros[linha] = movido
+            self._linhas[id(movido)] = linha
+
+        self._registros.pop()
+        self.tamanho = ultima
+
+    def total(self):
+        """Retorna a soma de todos os gastos em centavos"""
+        return int(self.centavos[:self.tamanho].sum())
+
+    def matriz(self, inicio, fim):
+        """Retorna a matriz (meses x categorias) com a soma em centavos entre os ordinais de mês inicio e fim"""
+        quantidade_meses = max(0, fim - inicio + 1)
+        quantidade_categorias = len(self.categorias)
+
+        meses = self.meses[:self.tamanho]
+        selecionados = (meses >= inicio) & (meses <= fim)
+
+        # Cada gasto cai na célula (mês, categoria), achatada em um único índice para o bincount
+        celulas = (meses[selecionados] - inicio) * quantidade_categorias + self.codigos[:self.tamanho][selecionados]
+        totais = np.bincount(
+            celulas,
+            weights=self.centavos[:self.tamanho][selecionados],
+            minlength=quantidade_meses * quantidade_categorias
+        )
+        return totais.astype(np.int64).reshape(quantidade_meses, quantidade_categorias)
+
+    def agrupar(self, por_mes=False, por_categoria=False, mes=None, ano=None, categoria=None):
+        """Retorna {(ordinal do mês, categoria): [soma, quantidade, maior, menor]} em centavos dos gastos filtrados"""
+        centavos = self.centavos[:self.tamanho]
+        meses = self.meses[:self.tamanho]
+        codigos = self.codigos[:self.tamanho]
+
+        # Filtrando os gastos pelo mês, ano e categoria (gastos sem mês não passam em filtro de data)
+        selecionados = np.ones(self.tamanho, dtype=bool)
+        if mes is not None:
+            selecionados &= (meses != SEM_MES) & ((meses - 1) % 12 + 1 == mes)
+        if ano is not None:
+            selecionados &= (meses != SEM_MES) & ((meses - 1) // 12 == ano)
+        if categoria is not None:
+            if categoria not in self._codigos:
+                return {}
+            selecionados &= codigos == self._codigos[categoria]
+        if not selecionados.any():
+            return {}
+        centavos = centavos[selecionados]
+
+        # Mês e categoria formam uma única chave inteira; o np.unique numera os grupos e indica o grupo de cada gasto
+        # (a dimensão não agrupada fica como None, assim como o mês dos gastos com data inválida)
+        quantidade_categorias = len(self.categorias)
+        chaves = np.zeros(len(centavos), dtype=np.int64)
+        if por_mes:
+            chaves += (meses[selecionados] - SEM_MES) * quantidade_categorias
+        if por_categoria:
+            chaves += codigos[selecionados]
+        grupos, grupo_de_cada = np.unique(chaves, return_inverse=True)
+        grupo_de_cada = grupo_de_cada.reshape(-1)
+
+        somas = np.bincount(grupo_de_cada, weights=centavos, minlength=len(grupos))
+        quantidades = np.bincount(grupo_de_cada, minlength=len(grupos))
+        maiores = np.full(len(grupos), np.iinfo(np.int64).min, dtype=np.int64)
+        menores = np.full(len(grupos), np.iinfo(np.int64).max, dtype=np.int64)
+        np.maximum.at(maiores, grupo_de_cada, centavos)
+        np.minimum.at(menores, grupo_de_cada, centavos)
+
+        resultado = {}
+        for posicao, chave in enumerate(grupos.tolist()):
+            ordinal, codigo = divmod(chave, quantidade_categorias)
+            ordinal += SEM_MES
+            resultado[(
+                ordinal if por_mes and ordinal != SEM_MES else None,
+                self.categorias[codigo] if por_categoria else None
+            )] = [int(somas[posicao]), int(quantidades[posicao]), int(maiores[posicao]), int(menores[posicao])]
+        return resultado
+
+    def _linhas_das_categorias(self, categorias):
+        """Retorna a máscara das linhas das categorias informadas ou None se nenhuma delas existir"""
+        codigos = [self._codigos[categoria] for categoria in categorias if categoria in self._codigos]
+        if not codigos:
+            return None
+        return np.isin(self.codigos[:self.tamanho], codigos)
+
+    def contar_categorias(self, categorias):
+        """Retorna a quantidade de gastos das categorias informadas, sem montar a lista de registros"""
+        linhas = self._linhas_das_categorias(categorias)
+        return int(np.count_nonzero(linhas)) if linhas is not None else 0
+
+    def registros_das_categorias(self, categorias):
+        """Retorna os gastos das categorias informadas, localizados pela coluna de categorias"""
+        linhas = self._linhas_das_categorias(categorias)
+        if linhas is None:
+            return []
+        return [self._registros[linha] for linha in np.flatnonzero(linhas).tolist()]
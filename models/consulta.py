@@ -0,0 +1,101 @@
+"""
+Módulo com a consulta composta (por encadeamento de filtros) sobre gastos, receitas e contas fixas
+"""
+from models.agregacao import TIPOS_AGRUPAMENTO
+from models.busca import normalizar_texto
+from models.registros import para_centavos
+
+class Consulta:
+    """Filtros encadeados sobre os registros, executados sob demanda pelo gerenciador de dados com o índice mais barato"""
+
+    def __init__(self, data_manager):
+        """Inicializa a consulta sem filtros (todos os registros de todos os tipos)"""
+        self._data_manager = data_manager
+        self.tipos = tuple(TIPOS_AGRUPAMENTO)
+        # Cada filtro fica None enquanto não for definido
+        self.categorias = None
+        self.ids = None
+        self.inicio = None
+        self.fim = None
+        self.minimo = None
+        self.maximo = None
+        self.textos = []
+
+    def tipo(self, *tipos):
+        """Filtra pelos tipos de registro ('gasto', 'receita', 'conta_fixa')"""
+        desconhecidos = set(tipos) - set(TIPOS_AGRUPAMENTO)
+        if desconhecidos:
+            raise ValueError(f"Tipo desconhecido: {', '.join(sorted(desconhecidos))}")
+        self.tipos = tuple(tipo for tipo in TIPOS_AGRUPAMENTO if tipo in tipos)
+        return self
+
+    def categoria(self, *categorias):
+        """Filtra os gastos pelas categorias (receitas e contas fixas não têm categoria)"""
+        self.categorias = set(categorias)
+        return self
+
+    def id(self, *ids):
+        """Filtra pelos IDs dos registros"""
+        self.ids = set(ids)
+        return self
+
+    def entre(self, inicio, fim):
+        """Filtra pelos meses entre dois (mes, ano), inclusive; receitas e contas recorrentes aparecem em cada mês"""
+        self.inicio = inicio[1] * 12 + inicio[0]
+        self.fim = fim[1] * 12 + fim[0]
+        return self
+
+    def no_mes(self, mes, ano):
+        """Filtra por um único mês/ano"""
+        return self.entre((mes, ano), (mes, ano))
+
+    def valor_min(self, valor):
+        """Filtra pelo valor mínimo (inclusive) do registro"""
+        self.minimo = para_centavos(valor)
+        return self
+
+    def valor_max(self, valor):
+        """Filtra pelo valor máximo (inclusive) do registro"""
+        self.maximo = para_centavos(valor)
+        return self
+
+    def texto(self, texto):
+        """Filtra pela descrição, que deve conter o texto (sem diferenciar acentos e maiúsculas)"""
+        texto = normalizar_texto(texto)
+        if texto:
+            self.textos.append(texto)
+        return self
+
+    def aceita(self, registro):
+        """Indica se um registro passa nos filtros que não dependem do mês"""
+        if self.ids is not None and registro.id not in self.ids:
+            return False
+        if self.categorias is not None and getattr(registro, 'categoria', None) not in self.categorias:
+            return False
+        if self.minimo is not None and registro.centavos < self.minimo:
+            return False
+        if self.maximo is not None and registro.centavos > self.maximo:
+            return False
+        if self.textos:
+            descricao = normalizar_texto(registro.descricao)
+            return all(texto in descricao for texto in self.textos)
+        return True
+
+    def itens(self):
+        """Percorre, sob demanda, os pares (tipo, registro como dicionário) que passam nos filtros"""
+        for tipo in self.tipos:
+            for registro in self._data_manager._executar_consulta(self, tipo):
+                yield tipo, registro
+
+    def __iter__(self):
+        """Percorre, sob demanda, os registros (como dicionários) que passam nos filtros"""
+        for _, registro in self.itens():
+            yield registro
+
+    def lista(self):
+        """Retorna todos os registros que passam nos filtros"""
+        return list(self)
+
+    def plano(self):
+        """Retorna, para cada tipo, o índice que a consulta usará ('id', 'texto', 'mes', 'categoria' ou 'todos')"""
+        return {tipo: self._data_manager._planejar_consulta(self, tipo)[0] for tipo in self.tipos}
@@ -2,16 +2,79 @@
 Módulo de gerenciamento de dados para o aplicativo de controle de gastos
 """
 import os
+import gc
+import heapq
 import json
 import datetime
-import calendar
 from datetime import datetime as dt
+from contextlib import contextmanager
+from operator import attrgetter, itemgetter
+
+from models.armazenamento import ArmazenamentoJSON
+from models.armazenamento_journal import ArmazenamentoJournal
+from models.armazenamento_particionado import ArmazenamentoParticionado
+from models.armazenamento_sqlite import ArmazenamentoSQLite
+
+from models.agregacao import DIMENSOES, TIPOS_AGRUPAMENTO, Agrupamento
+from models.busca import IndiceTexto, recencia
+from models.colunas import COLUNAS_DISPONIVEIS, ColunasGastos
+from models.consulta import Consulta
+from models.indices import FIM_ABERTO, IndiceMensal, IndicePeriodo, unir_intervalos
+from models.lembretes import FilaVencimentos
+from models.pagamentos import MapaPagamentos
+from models.parcelamento import data_final, parcelamento_da_conta
+from models.recorrencias import TabelaOcorrencias, criar_ocorrencia
+from models.resumo import carregar_resumo, gravar_resumo, normalizar_versao, ResumoMensal
+from models.snapshot import carregar_snapshot, gravar_snapshot
+from models.registros import TIPOS_POR_COLECAO, Registro, Gasto, Receita, ContaFixa, para_centavos, para_reais, periodo_data, ordinal_data
+
+# Funções que extraem dos registros tipados o período (pontuais) e a vigência (recorrentes) usados nos índices
+_periodo = attrgetter('periodo')
+_vigencia = attrgetter('vigencia')
+
+def _centavos(registro):
+    """Retorna o valor em centavos de um registro tipado ou de um dicionário vindo das telas"""
+    if isinstance(registro, Registro):
+        return registro.centavos
+    return para_centavos(registro['valor'])
+
+# Chave de ordenação das linhas do histórico cuja data não pôde ser interpretada (vão para o fim)
+_SEM_DATA = float('inf')
+
+@contextmanager
+def _sem_coleta_de_lixo():
+    """Suspende o coletor de lixo cíclico durante a criação em massa de registros (que não formam ciclos)"""
+    ativo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if ativo:
+            gc.enable()
+
+def _ordem_id(registro):
+    """Chave de ordenação dos registros pelo ID (registros sem ID vêm primeiro)"""
+    return registro.id if registro.id is not None else 0
+
+def _ordem_ocorrencia(ocorrencia):
+    """Chave de ordenação das ocorrências pelo ID do registro"""
+    return _ordem_id(ocorrencia.registro)
+
+def _chave_do_grupo(dimensoes, tipo, ordinal, categoria):
+    """Monta a chave de um grupo com os valores das dimensões pedidas, na ordem pedida"""
+    valores = {
+        'categoria': categoria,
+        'mes': (ordinal - 1) % 12 + 1 if ordinal is not None else None,
+        'ano': (ordinal - 1) // 12 if ordinal is not None else None,
+        'tipo': tipo
+    }
+    return tuple(valores[dimensao] for dimensao in dimensoes)
 
 class DataManager:
     """Classe responsável pelo gerenciamento de dados do aplicativo"""
     
-    def __init__(self, modo_teste=False):
-        """Inicializa o gerenciador de dados"""
+    def __init__(self, modo_teste=False, armazenamento="json", data_dir=None):
+        """Inicializa o gerenciador de dados (em data_dir, se informado, em vez do diretório do modo)"""
         # Define o modo (teste ou produção)
         self.modo_teste = modo_teste
         
@@ -19,7 +82,9 @@ class DataManager:
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         
         # Diretório de dados baseado no modo
-        if self.modo_teste:
+        if data_dir is not None:
+            self.data_dir = data_dir
+        elif self.modo_teste:
             self.data_dir = os.path.join(base_dir, "data_teste")
         else:
             self.data_dir = os.path.join(base_dir, "data")
@@ -29,9 +94,72 @@ class DataManager:
         self.receitas_file = os.path.join(self.data_dir, "receitas.json")
         self.contas_fixas_file = os.path.join(self.data_dir, "contas_fixas.json")
         
+        # Relacionando cada coleção ao seu arquivo
+        self.arquivos = {
+            'gastos': self.gastos_file,
+            'receitas': self.receitas_file,
+            'contas_fixas': self.contas_fixas_file
+        }
+        self._colecoes_por_arquivo = {arquivo: nome for nome, arquivo in self.arquivos.items()}
+        
+        # Cache em memória das coleções já carregadas: nome -> (assinatura, {id: registro tipado})
+        self._cache = {}
+        
+        # Versão dos arquivos de cada coleção já gravada no snapshot binário
+        self._versao_snapshot = {}
+        
+        # Próximo ID livre de cada coleção, definido na carga e incrementado a cada inclusão
+        self._proximo_id = {}
+        
+        # Operações acumuladas pela transação em andamento (nome -> operações) ou None fora de uma transação
+        self._transacao = None
+        
+        # Índices por período de cada coleção, reconstruídos a cada carga e atualizados a cada alteração
+        self._indices = {nome: self._criar_indice(nome) for nome in self.arquivos}
+        
+        # Índice de trigramas das descrições de cada coleção, usado na busca em todos os períodos
+        self._textos = {nome: IndiceTexto() for nome in self.arquivos}
+        
+        # Ocorrências mensais das receitas e contas fixas recorrentes, materializadas conforme os meses são consultados
+        self._ocorrencias = {nome: TabelaOcorrencias() for nome in ('receitas', 'contas_fixas')}
+        
+        # Meses pagos de cada conta fixa em bits, para as consultas de pendências em vários meses
+        self._pagamentos = MapaPagamentos()
+        
+        # Ocorrências não pagas das contas fixas ordenadas pela data limite, consumidas pelos lembretes
+        self._vencimentos = FilaVencimentos()
+        
+        # Contador de alterações de cada coleção, incrementado a cada gravação e a cada recarga
+        self._versoes = {nome: 0 for nome in self.arquivos}
+        
+        # Agrupamentos já calculados: (dimensões, filtro) -> (versão dos dados, resultado)
+        self._agrupamentos = {}
+        
+        # Meses disponíveis calculados pela última consulta, com a chave (mês atual, versões dos índices) em que valem
+        self._meses_disponiveis = None
+        
         # Criando os arquivos se não existirem
         self.verificar_arquivos()
         
+        # Definindo onde os dados são persistidos
+        self.tipo_armazenamento = armazenamento
+        if armazenamento == "sqlite":
+            # Na primeira execução o banco é criado a partir dos arquivos JSON
+            self.armazenamento = ArmazenamentoSQLite(
+                os.path.join(self.data_dir, "controle_gastos.db"),
+                self.arquivos
+            )
+        elif armazenamento == "journal":
+            # Cada alteração é acrescentada a um journal ao lado do JSON, compactado periodicamente
+            self.armazenamento = ArmazenamentoJournal(self.arquivos)
+        elif armazenamento == "particionado":
+            # Os gastos ficam em um arquivo por mês (data/gastos/AAAA-MM.json), migrados do JSON na primeira execução
+            self.armazenamento = ArmazenamentoParticionado(self.arquivos, os.path.join(self.data_dir, "gastos"))
+        elif armazenamento == "json":
+            self.armazenamento = ArmazenamentoJSON(self.arquivos)
+        else:
+            raise ValueError(f"Tipo de armazenamento desconhecido: {armazenamento}")
+        
         # Categorias de gastos
         self.categorias = [
             "Alimentação", 
@@ -43,6 +171,14 @@ class DataManager:
             "Vestuário", 
             "Outros"
         ]
+        
+        # Colunas (arrays NumPy) de valor, mês e categoria dos gastos, usadas nos totais e relatórios por intervalo;
+        # sem o NumPy instalado ficam como None, e os totais são somados nos próprios registros
+        self._colunas_gastos = ColunasGastos(self.categorias) if COLUNAS_DISPONIVEIS else None
+        
+        # Totais de cada mês, atualizados a cada alteração e gravados ao lado dos dados ao sincronizar
+        self.arquivo_resumo = os.path.join(self.data_dir, "resumo_mensal.json")
+        self._resumo = carregar_resumo(self.arquivo_resumo)
     
     def verificar_arquivos(self):
         """Verifica se os arquivos de dados existem, caso contrário, cria-os"""
@@ -66,95 +202,427 @@ class DataManager:
     
     def carregar_dados(self, arquivo):
         """Carrega os dados de um arquivo JSON"""
-        try:
-            with open(arquivo, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            # Se o arquivo estiver vazio ou não existir, retorna uma lista vazia
-            return []
+        nome = self._colecoes_por_arquivo.get(arquivo)
+        if nome is None:
+            return ArmazenamentoJSON({'arquivo': arquivo}).carregar('arquivo')
+        
+        return [registro.para_dict() for registro in self._obter_colecao(nome).values()]
     
     def salvar_dados(self, arquivo, dados):
         """Salva os dados em um arquivo JSON"""
-        with open(arquivo, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, indent=4, ensure_ascii=False)
+        nome = self._colecoes_por_arquivo.get(arquivo)
+        if nome is None:
+            ArmazenamentoJSON({'arquivo': arquivo}).salvar('arquivo', dados)
+            return
+        
+        dados = list(dados)
+        if self._transacao is not None:
+            # A gravação completa já inclui as operações pendentes da coleção
+            self._transacao.pop(nome, None)
+        
+        try:
+            self.armazenamento.salvar(nome, dados)
+        except Exception:
+            # Descartando a cópia em memória para que a próxima leitura volte ao armazenamento
+            self._cache.pop(nome, None)
+            raise
+        
+        self._definir_colecao(nome, self.armazenamento.assinatura(nome), dados)
+    
+    def sincronizar(self):
+        """Garante que as coleções em memória estejam gravadas no armazenamento"""
+        for nome, (_, colecao) in list(self._cache.items()):
+            # Alterações de uma transação em andamento só são gravadas quando ela termina
+            if self._transacao is not None and nome in self._transacao:
+                continue
+            
+            self.armazenamento.sincronizar(nome, self._dados_para_armazenar(colecao))
+            self._cache[nome] = (self.armazenamento.assinatura(nome), colecao)
+            self._gravar_snapshot(nome, colecao)
+            
+            # Os totais em memória correspondem agora à versão gravada da coleção
+            versao = self._versao_arquivos(nome)
+            self._resumo.versoes[nome] = normalizar_versao(versao) if versao is not None else None
+        
+        self._gravar_resumo()
+    
+    def fechar(self):
+        """Libera os recursos do armazenamento"""
+        self.armazenamento.fechar()
+    
+    @contextmanager
+    def transacao(self):
+        """Agrupa várias alterações em memória e grava cada coleção alterada uma única vez ao final"""
+        # Uma transação aninhada faz parte da transação mais externa
+        if self._transacao is not None:
+            yield self
+            return
+        
+        self._transacao = {}
+        try:
+            yield self
+        except BaseException:
+            # Desfazendo: o armazenamento não foi alterado, então as coleções tocadas são relidas dele
+            pendentes, self._transacao = self._transacao, None
+            for nome in pendentes:
+                self._cache.pop(nome, None)
+            raise
+        
+        pendentes, self._transacao = self._transacao, None
+        gravadas = set()
+        try:
+            for nome, operacoes in pendentes.items():
+                self._registrar_alteracao(nome, self._cache[nome][1], *operacoes)
+                gravadas.add(nome)
+        except Exception:
+            # As coleções que não chegaram a ser gravadas voltam ao estado do armazenamento
+            for nome in pendentes:
+                if nome not in gravadas:
+                    self._cache.pop(nome, None)
+            raise
+    
+    def _obter_colecao(self, nome):
+        """Retorna o dicionário ID -> registro de uma coleção, recarregando-o se foi alterado por outro processo"""
+        assinatura = self.armazenamento.assinatura(nome)
+        colecao = self._colecao_em_cache(nome, assinatura)
+        if colecao is not None:
+            return colecao
+        
+        # Sem o coletor de lixo, a criação de milhares de registros não dispara varreduras do heap inteiro
+        with _sem_coleta_de_lixo():
+            # O snapshot binário, quando corresponde aos arquivos atuais, evita interpretar o JSON
+            registros = self._carregar_snapshot(nome)
+            if registros is None:
+                registros = self.armazenamento.carregar(nome)
+            return self._definir_colecao(nome, assinatura, registros)
+    
+    def _arquivo_snapshot(self, nome):
+        """Retorna o caminho do snapshot binário de uma coleção, gravado ao lado do seu arquivo JSON"""
+        return self.arquivos[nome] + ".bin"
+    
+    def _versao_arquivos(self, nome):
+        """Retorna a versão persistente dos arquivos da coleção ou None se o armazenamento não usar snapshot"""
+        versao_arquivos = getattr(self.armazenamento, 'versao_arquivos', None)
+        if versao_arquivos is None:
+            return None
+        return versao_arquivos(nome)
+    
+    def _carregar_snapshot(self, nome):
+        """Carrega os registros tipados do snapshot binário se ele corresponder aos arquivos atuais, senão None"""
+        versao = self._versao_arquivos(nome)
+        if versao is None:
+            return None
+        
+        registros = carregar_snapshot(self._arquivo_snapshot(nome), TIPOS_POR_COLECAO[nome], versao)
+        if registros is not None:
+            self._versao_snapshot[nome] = versao
+        return registros
+    
+    def _gravar_snapshot(self, nome, colecao):
+        """Grava o snapshot binário de uma coleção, se os arquivos mudaram desde o último"""
+        versao = self._versao_arquivos(nome)
+        if versao is None or self._versao_snapshot.get(nome) == versao:
+            return
+        
+        try:
+            gravar_snapshot(self._arquivo_snapshot(nome), TIPOS_POR_COLECAO[nome], colecao.values(), versao)
+        except OSError:
+            # O snapshot é só um atalho para a carga; sem ele a próxima inicialização lê o JSON
+            return
+        self._versao_snapshot[nome] = versao
+    
+    def _gravar_resumo(self):
+        """Grava o resumo mensal, se alguma coleção tiver uma versão persistente a que ele corresponda"""
+        if not any(versao is not None for versao in self._resumo.versoes.values()):
+            return
+        
+        try:
+            gravar_resumo(self.arquivo_resumo, self._resumo)
+        except OSError:
+            # Sem o arquivo, a próxima inicialização refaz os totais a partir dos registros
+            pass
+    
+    def _resumo_da_colecao(self, nome, mes=None, ano=None):
+        """Retorna o resumo mensal que responde pelos totais de uma coleção (no mês ou em todos), atualizando-o se necessário"""
+        # Com a coleção em memória, o resumo é mantido a cada alteração
+        if self._colecao_em_cache(nome, self.armazenamento.assinatura(nome)) is not None:
+            return self._resumo
+        
+        versao = self._versao_arquivos(nome)
+        if versao is not None:
+            # O resumo gravado vale enquanto os arquivos da coleção não mudarem
+            if self._resumo.versao_valida(nome, versao):
+                return self._resumo
+        elif mes is not None and self._consultar_no_armazenamento(nome):
+            # Sem versão persistente, os totais do mês são montados apenas com os registros do período
+            resumo = ResumoMensal()
+            resumo.reconstruir(nome, self._registros_do_periodo(nome, mes, ano))
+            return resumo
+        
+        self._obter_colecao(nome)
+        return self._resumo
+    
+    def _colecao_em_cache(self, nome, assinatura):
+        """Retorna a cópia em memória de uma coleção se ela ainda for válida, senão None"""
+        # Usando a cópia em memória enquanto o armazenamento não for alterado externamente
+        em_cache = self._cache.get(nome)
+        if em_cache is not None and (em_cache[0] == assinatura or nome in (self._transacao or {})):
+            # Uma coleção alterada pela transação em andamento nunca é recarregada antes do fim dela
+            return em_cache[1]
+        return None
+    
+    def _definir_colecao(self, nome, assinatura, dados):
+        """Substitui a cópia em memória de uma coleção e reconstrói seus índices"""
+        # Os registros são convertidos uma única vez para o tipo da coleção (valores em centavos, datas em ordinais)
+        tipo = TIPOS_POR_COLECAO[nome]
+        
+        # Os registros ficam em um dicionário ID -> registro, que preserva a ordem da coleção
+        colecao = {}
+        maior_id = 0
+        for posicao, dados_registro in enumerate(dados):
+            # Registros vindos do snapshot binário já estão no tipo da coleção
+            registro = dados_registro if isinstance(dados_registro, Registro) else tipo.de_dict(dados_registro)
+            registro_id = registro.id
+            if registro_id is None or registro_id in colecao:
+                # Registros antigos sem ID (ou com ID repetido) são mantidos com uma chave própria
+                colecao[('sem_id', posicao)] = registro
+                continue
+            
+            colecao[registro_id] = registro
+            if isinstance(registro_id, int) and registro_id > maior_id:
+                maior_id = registro_id
+        
+        self._cache[nome] = (assinatura, colecao)
+        self._versoes[nome] += 1
+        # O contador nunca volta atrás, então um ID excluído não é reaproveitado na mesma sessão
+        self._proximo_id[nome] = max(maior_id + 1, self._proximo_id.get(nome, 1))
+        self._indices[nome].reconstruir(colecao.values())
+        self._resumo.reconstruir(nome, colecao.values())
+        self._textos[nome].reconstruir(colecao.values())
+        if nome in self._ocorrencias:
+            self._ocorrencias[nome].reconstruir(colecao.values())
+        if nome == 'contas_fixas':
+            self._pagamentos.reconstruir(colecao.values())
+            self._vencimentos.reconstruir(colecao.values())
+        if nome == 'gastos' and self._colunas_gastos is not None:
+            self._colunas_gastos.reconstruir(colecao.values())
+        return colecao
+    
+    def _criar_indice(self, nome):
+        """Cria o índice por período adequado a uma coleção"""
+        if nome == 'gastos':
+            return IndiceMensal(_periodo)
+        return IndicePeriodo(_periodo, _vigencia)
+    
+    def _dados_para_armazenar(self, colecao):
+        """Converte os registros tipados de uma coleção de volta em dicionários, sob demanda"""
+        return (registro.para_dict() for registro in colecao.values())
+    
+    def _registrar_alteracao(self, nome, colecao, *operacoes):
+        """Persiste as operações feitas sobre uma coleção e atualiza a cópia em memória"""
+        self._versoes[nome] += 1
+        
+        if self._transacao is not None:
+            # Dentro de uma transação as operações são acumuladas e gravadas apenas no final
+            self._transacao.setdefault(nome, []).extend(operacoes)
+            return
+        
+        try:
+            self.armazenamento.registrar(nome, operacoes, self._dados_para_armazenar(colecao))
+        except Exception:
+            # Descartando a cópia em memória para que a próxima leitura volte ao armazenamento
+            self._cache.pop(nome, None)
+            raise
+        
+        self._cache[nome] = (self.armazenamento.assinatura(nome), colecao)
+    
+    def _consultar_no_armazenamento(self, nome):
+        """Indica se uma consulta por período deve ir ao armazenamento em vez da cópia em memória"""
+        # Sem cópia em memória, um armazenamento indexado devolve apenas os registros do período
+        return nome not in self._cache and nome in getattr(self.armazenamento, 'colecoes_por_periodo', ())
+    
+    def _registros_do_periodo(self, nome, mes, ano):
+        """Retorna os registros tipados pontuais do mês e os recorrentes ativos nele, na ordem da coleção"""
+        if self._consultar_no_armazenamento(nome):
+            # O banco devolve os candidatos e um índice temporário aplica exatamente o mesmo critério
+            tipo = TIPOS_POR_COLECAO[nome]
+            indice = self._criar_indice(nome)
+            indice.reconstruir([tipo.de_dict(registro) for registro in self.armazenamento.carregar_periodo(nome, mes, ano)])
+        else:
+            self._obter_colecao(nome)
+            indice = self._indices[nome]
+        
+        return sorted(indice.obter(mes, ano), key=_ordem_id)
+    
+    def _ocorrencias_do_periodo(self, nome, mes, ano):
+        """Retorna as ocorrências no mês das receitas ou contas fixas (pontuais e recorrentes), na ordem da coleção"""
+        ordinal = ano * 12 + mes
+        if self._consultar_no_armazenamento(nome):
+            # Sem a coleção em memória, as ocorrências dos registros do período são criadas na hora
+            return [criar_ocorrencia(registro, ordinal) for registro in self._registros_do_periodo(nome, mes, ano)]
+        
+        # As recorrentes vêm já materializadas da tabela de ocorrências; só as pontuais do mês são criadas aqui
+        self._obter_colecao(nome)
+        ocorrencias = [criar_ocorrencia(registro, ordinal) for registro in self._indices[nome].pontuais.obter(mes, ano)]
+        ocorrencias.extend(self._ocorrencias[nome].obter(ordinal))
+        return sorted(ocorrencias, key=_ordem_ocorrencia)
     
     # Métodos para gerenciar gastos
     def obter_gastos(self):
         """Retorna todos os gastos"""
         return self.carregar_dados(self.gastos_file)
     
+    def iterar_gastos(self, mes=None, ano=None):
+        """Percorre os gastos (opcionalmente de um mês/ano) sem montar a lista inteira em memória"""
+        # Com a coleção já em memória não há o que ler; senão os gastos vêm do armazenamento um a um, sem cache
+        colecao = self._colecao_em_cache('gastos', self.armazenamento.assinatura('gastos'))
+        if colecao is not None:
+            gastos = (gasto.para_dict() for gasto in colecao.values())
+        else:
+            gastos = self.armazenamento.iterar('gastos')
+        
+        periodo = (ano, mes) if mes is not None and ano is not None else None
+        for gasto in gastos:
+            if periodo is None or periodo_data(gasto.get('data')) == periodo:
+                yield gasto
+    
+    def obter_gasto(self, gasto_id):
+        """Retorna um gasto pelo ID ou None se ele não existir"""
+        gasto = self._obter_colecao('gastos').get(gasto_id)
+        return gasto.para_dict() if gasto is not None else None
+    
     def adicionar_gasto(self, gasto):
         """Adiciona um novo gasto"""
-        gastos = self.obter_gastos()
+        gastos = self._obter_colecao('gastos')
         
         # Gerando um ID único para o gasto
-        gasto['id'] = self._gerar_id(gastos)
+        gasto['id'] = self._gerar_id('gastos')
         
-        gastos.append(gasto)
-        self.salvar_dados(self.gastos_file, gastos)
+        registro = Gasto.de_dict(gasto)
+        gastos[registro.id] = registro
+        self._indices['gastos'].adicionar(registro)
+        self._resumo.adicionar('gastos', registro)
+        self._textos['gastos'].adicionar(registro)
+        if self._colunas_gastos is not None:
+            self._colunas_gastos.adicionar(registro)
+        self._registrar_alteracao('gastos', gastos, {'op': 'adicionar', 'registro': gasto})
+    
+    def adicionar_gastos(self, gastos):
+        """Adiciona vários gastos gravando a coleção uma única vez"""
+        with self.transacao():
+            for gasto in gastos:
+                self.adicionar_gasto(gasto)
     
     def atualizar_gasto(self, gasto_id, gasto_atualizado):
         """Atualiza um gasto existente"""
-        gastos = self.obter_gastos()
-        
-        for i, gasto in enumerate(gastos):
-            if gasto['id'] == gasto_id:
-                gasto_atualizado['id'] = gasto_id
-                gastos[i] = gasto_atualizado
-                break
+        gastos = self._obter_colecao('gastos')
         
-        self.salvar_dados(self.gastos_file, gastos)
+        gasto = gastos.get(gasto_id)
+        if gasto is not None:
+            gasto_atualizado['id'] = gasto_id
+            registro = Gasto.de_dict(gasto_atualizado)
+            gastos[gasto_id] = registro
+            # Incluindo antes de retirar, para que um mês (ou vigência) mantido não pareça ter mudado
+            self._indices['gastos'].adicionar(registro)
+            self._indices['gastos'].remover(gasto)
+            self._resumo.remover('gastos', gasto)
+            self._resumo.adicionar('gastos', registro)
+            self._textos['gastos'].remover(gasto)
+            self._textos['gastos'].adicionar(registro)
+            if self._colunas_gastos is not None:
+                self._colunas_gastos.remover(gasto)
+                self._colunas_gastos.adicionar(registro)
+            self._registrar_alteracao('gastos', gastos, {'op': 'atualizar', 'registro': gasto_atualizado})
     
     def excluir_gasto(self, gasto_id):
         """Exclui um gasto"""
-        gastos = self.obter_gastos()
-        gastos = [g for g in gastos if g['id'] != gasto_id]
-        self.salvar_dados(self.gastos_file, gastos)
+        gastos = self._obter_colecao('gastos')
+        
+        gasto = gastos.pop(gasto_id, None)
+        if gasto is not None:
+            self._indices['gastos'].remover(gasto)
+            self._resumo.remover('gastos', gasto)
+            self._textos['gastos'].remover(gasto)
+            if self._colunas_gastos is not None:
+                self._colunas_gastos.remover(gasto)
+            self._registrar_alteracao('gastos', gastos, {'op': 'excluir', 'id': gasto_id})
     
     # Métodos para gerenciar receitas
     def obter_receitas(self):
         """Retorna todas as receitas"""
         return self.carregar_dados(self.receitas_file)
     
+    def obter_receita(self, receita_id):
+        """Retorna uma receita pelo ID ou None se ela não existir"""
+        receita = self._obter_colecao('receitas').get(receita_id)
+        return receita.para_dict() if receita is not None else None
+    
     def adicionar_receita(self, receita):
         """Adiciona uma nova receita"""
-        receitas = self.obter_receitas()
+        receitas = self._obter_colecao('receitas')
         
         # Gerando um ID único para a receita
-        receita['id'] = self._gerar_id(receitas)
+        receita['id'] = self._gerar_id('receitas')
         
-        receitas.append(receita)
-        self.salvar_dados(self.receitas_file, receitas)
+        registro = Receita.de_dict(receita)
+        receitas[registro.id] = registro
+        self._indices['receitas'].adicionar(registro)
+        self._resumo.adicionar('receitas', registro)
+        self._textos['receitas'].adicionar(registro)
+        self._ocorrencias['receitas'].adicionar(registro)
+        self._registrar_alteracao('receitas', receitas, {'op': 'adicionar', 'registro': receita})
     
     def atualizar_receita(self, receita_id, receita_atualizada):
         """Atualiza uma receita existente"""
-        receitas = self.obter_receitas()
-        
-        for i, receita in enumerate(receitas):
-            if receita['id'] == receita_id:
-                receita_atualizada['id'] = receita_id
-                receitas[i] = receita_atualizada
-                break
+        receitas = self._obter_colecao('receitas')
         
-        self.salvar_dados(self.receitas_file, receitas)
+        receita = receitas.get(receita_id)
+        if receita is not None:
+            receita_atualizada['id'] = receita_id
+            registro = Receita.de_dict(receita_atualizada)
+            receitas[receita_id] = registro
+            self._indices['receitas'].adicionar(registro)
+            self._indices['receitas'].remover(receita)
+            self._resumo.remover('receitas', receita)
+            self._resumo.adicionar('receitas', registro)
+            self._textos['receitas'].remover(receita)
+            self._textos['receitas'].adicionar(registro)
+            self._ocorrencias['receitas'].remover(receita)
+            self._ocorrencias['receitas'].adicionar(registro)
+            self._registrar_alteracao('receitas', receitas, {'op': 'atualizar', 'registro': receita_atualizada})
     
     def excluir_receita(self, receita_id):
         """Exclui uma receita"""
-        receitas = self.obter_receitas()
-        receitas = [r for r in receitas if r['id'] != receita_id]
-        self.salvar_dados(self.receitas_file, receitas)
+        receitas = self._obter_colecao('receitas')
+        
+        receita = receitas.pop(receita_id, None)
+        if receita is not None:
+            self._indices['receitas'].remover(receita)
+            self._resumo.remover('receitas', receita)
+            self._textos['receitas'].remover(receita)
+            self._ocorrencias['receitas'].remover(receita)
+            self._registrar_alteracao('receitas', receitas, {'op': 'excluir', 'id': receita_id})
     
     # Métodos para gerenciar contas fixas
     def obter_contas_fixas(self):
         """Retorna todas as contas fixas"""
         return self.carregar_dados(self.contas_fixas_file)
     
+    def obter_conta_fixa(self, conta_id):
+        """Retorna uma conta fixa pelo ID ou None se ela não existir"""
+        conta = self._obter_colecao('contas_fixas').get(conta_id)
+        return conta.para_dict() if conta is not None else None
+    
+    def calcular_data_fim_parcelas(self, data_inicio, num_parcelas):
+        """Retorna a data (DD/MM/AAAA) da última parcela de uma conta parcelada que começa em data_inicio"""
+        return data_final(dt.strptime(data_inicio, "%d/%m/%Y"), num_parcelas).strftime("%d/%m/%Y")
+    
     def adicionar_conta_fixa(self, conta):
         """Adiciona uma nova conta fixa"""
-        contas = self.obter_contas_fixas()
+        contas = self._obter_colecao('contas_fixas')
         
         # Gerando um ID único para a conta
-        conta['id'] = self._gerar_id(contas)
+        conta['id'] = self._gerar_id('contas_fixas')
         
         # Verificando se é uma conta parcelada
         if 'parcelado' in conta and conta['parcelado']:
@@ -167,462 +635,757 @@ class DataManager:
                 num_parcelas = int(conta['num_parcelas'])
                 
                 # Calculando a data de fim (data de início + número de parcelas - 1 mês)
-                data_fim = data_inicio
-                for _ in range(num_parcelas - 1):
-                    # Avançando um mês
-                    if data_fim.month == 12:
-                        data_fim = dt(data_fim.year + 1, 1, data_fim.day)
-                    else:
-                        # Tratando casos onde o dia pode não existir no mês seguinte
-                        ultimo_dia = calendar.monthrange(data_fim.year, data_fim.month + 1)[1]
-                        dia = min(data_fim.day, ultimo_dia)
-                        data_fim = dt(data_fim.year, data_fim.month + 1, dia)
+                data_fim = data_final(data_inicio, num_parcelas)
                 
                 # Formatando a data de fim
                 conta['data_fim'] = data_fim.strftime("%d/%m/%Y")
         
-        contas.append(conta)
-        self.salvar_dados(self.contas_fixas_file, contas)
+        registro = ContaFixa.de_dict(conta)
+        contas[registro.id] = registro
+        self._indices['contas_fixas'].adicionar(registro)
+        self._resumo.adicionar('contas_fixas', registro)
+        self._textos['contas_fixas'].adicionar(registro)
+        self._ocorrencias['contas_fixas'].adicionar(registro)
+        self._pagamentos.adicionar(registro)
+        self._vencimentos.adicionar(registro)
+        self._registrar_alteracao('contas_fixas', contas, {'op': 'adicionar', 'registro': conta})
     
     def atualizar_conta_fixa(self, conta_id, conta_atualizada):
         """Atualiza uma conta fixa existente"""
-        contas = self.obter_contas_fixas()
+        contas = self._obter_colecao('contas_fixas')
         
-        for i, conta in enumerate(contas):
-            if conta['id'] == conta_id:
-                conta_atualizada['id'] = conta_id
+        conta = contas.get(conta_id)
+        if conta is not None:
+            conta_atualizada['id'] = conta_id
+            
+            # Verificando se é uma conta parcelada
+            if 'parcelado' in conta_atualizada and conta_atualizada['parcelado']:
+                # Definindo o número de parcelas
+                conta_atualizada['num_parcelas'] = int(conta_atualizada.get('num_parcelas', 1))
                 
-                # Verificando se é uma conta parcelada
-                if 'parcelado' in conta_atualizada and conta_atualizada['parcelado']:
-                    # Definindo o número de parcelas
-                    conta_atualizada['num_parcelas'] = int(conta_atualizada.get('num_parcelas', 1))
+                # Se for parcelada, a data de fim é calculada automaticamente
+                if 'data_inicio' in conta_atualizada:
+                    data_inicio = dt.strptime(conta_atualizada['data_inicio'], "%d/%m/%Y")
+                    num_parcelas = int(conta_atualizada['num_parcelas'])
                     
-                    # Se for parcelada, a data de fim é calculada automaticamente
-                    if 'data_inicio' in conta_atualizada:
-                        data_inicio = dt.strptime(conta_atualizada['data_inicio'], "%d/%m/%Y")
-                        num_parcelas = int(conta_atualizada['num_parcelas'])
-                        
-                        # Calculando a data de fim (data de início + número de parcelas - 1 mês)
-                        data_fim = data_inicio
-                        for _ in range(num_parcelas - 1):
-                            # Avançando um mês
-                            if data_fim.month == 12:
-                                data_fim = dt(data_fim.year + 1, 1, data_fim.day)
-                            else:
-                                # Tratando casos onde o dia pode não existir no mês seguinte
-                                ultimo_dia = calendar.monthrange(data_fim.year, data_fim.month + 1)[1]
-                                dia = min(data_fim.day, ultimo_dia)
-                                data_fim = dt(data_fim.year, data_fim.month + 1, dia)
-                        
-                        # Formatando a data de fim
-                        conta_atualizada['data_fim'] = data_fim.strftime("%d/%m/%Y")
-                
-                contas[i] = conta_atualizada
-                break
-        
-        self.salvar_dados(self.contas_fixas_file, contas)
+                    # Calculando a data de fim (data de início + número de parcelas - 1 mês)
+                    data_fim = data_final(data_inicio, num_parcelas)
+                    
+                    # Formatando a data de fim
+                    conta_atualizada['data_fim'] = data_fim.strftime("%d/%m/%Y")
+            
+            registro = ContaFixa.de_dict(conta_atualizada)
+            contas[conta_id] = registro
+            self._indices['contas_fixas'].adicionar(registro)
+            self._indices['contas_fixas'].remover(conta)
+            self._resumo.remover('contas_fixas', conta)
+            self._resumo.adicionar('contas_fixas', registro)
+            self._textos['contas_fixas'].remover(conta)
+            self._textos['contas_fixas'].adicionar(registro)
+            self._ocorrencias['contas_fixas'].remover(conta)
+            self._ocorrencias['contas_fixas'].adicionar(registro)
+            self._pagamentos.remover(conta)
+            self._pagamentos.adicionar(registro)
+            self._vencimentos.remover(conta)
+            self._vencimentos.adicionar(registro)
+            self._registrar_alteracao('contas_fixas', contas, {'op': 'atualizar', 'registro': conta_atualizada})
     
     def excluir_conta_fixa(self, conta_id):
         """Exclui uma conta fixa"""
-        contas = self.obter_contas_fixas()
-        contas = [c for c in contas if c['id'] != conta_id]
-        self.salvar_dados(self.contas_fixas_file, contas)
+        contas = self._obter_colecao('contas_fixas')
+        
+        conta = contas.pop(conta_id, None)
+        if conta is not None:
+            self._indices['contas_fixas'].remover(conta)
+            self._resumo.remover('contas_fixas', conta)
+            self._textos['contas_fixas'].remover(conta)
+            self._ocorrencias['contas_fixas'].remover(conta)
+            self._pagamentos.remover(conta)
+            self._vencimentos.remover(conta)
+            self._registrar_alteracao('contas_fixas', contas, {'op': 'excluir', 'id': conta_id})
     
     def marcar_conta_como_paga(self, conta_id, mes, ano, status_pago=True, data_pagamento=None):
         """Marca uma conta fixa como paga ou pendente para um mês/ano específico"""
-        contas = self.obter_contas_fixas()
+        contas = self._obter_colecao('contas_fixas')
         
-        for conta in contas:
-            if conta['id'] == conta_id:
-                # Inicializando o histórico de pagamentos se não existir
-                if 'historico_pagamentos' not in conta:
-                    conta['historico_pagamentos'] = {}
-                
-                # Chave para o mês/ano no formato "MM/AAAA"
-                chave_mes_ano = f"{mes:02d}/{ano}"
-                
-                if status_pago:
-                    # Marcando como pago
-                    conta['historico_pagamentos'][chave_mes_ano] = {
-                        'pago': True,
-                        'data_pagamento': data_pagamento or dt.now().strftime("%d/%m/%Y")
-                    }
-                else:
-                    # Marcando como pendente (removendo do histórico)
-                    if chave_mes_ano in conta['historico_pagamentos']:
-                        del conta['historico_pagamentos'][chave_mes_ano]
-                
-                break
-        
-        self.salvar_dados(self.contas_fixas_file, contas)
+        conta = contas.get(conta_id)
+        if conta is not None:
+            # O pagamento altera as contas pagas do mês no resumo e nas ocorrências: a conta sai e volta com o histórico novo
+            self._resumo.remover('contas_fixas', conta)
+            self._ocorrencias['contas_fixas'].remover(conta)
+            self._vencimentos.remover(conta)
+            
+            # O histórico é alterado em uma cópia, para que os dicionários já entregues às telas não mudem junto
+            historico = dict(conta.historico_pagamentos or {})
+            
+            # Chave para o mês/ano no formato "MM/AAAA"
+            chave_mes_ano = f"{mes:02d}/{ano}"
+            
+            if status_pago:
+                # Marcando como pago
+                pagamento = {
+                    'pago': True,
+                    'data_pagamento': data_pagamento or dt.now().strftime("%d/%m/%Y")
+                }
+                historico[chave_mes_ano] = pagamento
+            else:
+                # Marcando como pendente (removendo do histórico)
+                pagamento = None
+                historico.pop(chave_mes_ano, None)
+            conta.definir('historico_pagamentos', historico)
+            
+            self._resumo.adicionar('contas_fixas', conta)
+            self._ocorrencias['contas_fixas'].adicionar(conta)
+            self._pagamentos.marcar(conta, chave_mes_ano, status_pago)
+            self._vencimentos.adicionar(conta)
+            self._registrar_alteracao('contas_fixas', contas, {
+                'op': 'pagar',
+                'id': conta_id,
+                'chave': chave_mes_ano,
+                'pagamento': pagamento
+            })
+    
+    def marcar_contas_como_pagas(self, conta_ids, mes, ano, status_pago=True, data_pagamento=None):
+        """Marca várias contas fixas como pagas ou pendentes em um mês/ano, gravando a coleção uma única vez"""
+        with self.transacao():
+            for conta_id in conta_ids:
+                self.marcar_conta_como_paga(conta_id, mes, ano, status_pago, data_pagamento)
     
     def verificar_conta_paga(self, conta_id, mes, ano):
         """Verifica se uma conta fixa está paga para um mês/ano específico"""
-        contas = self.obter_contas_fixas()
+        conta = self._obter_colecao('contas_fixas').get(conta_id)
         
-        for conta in contas:
-            if conta['id'] == conta_id:
-                # Verificando se existe histórico de pagamentos
-                if 'historico_pagamentos' not in conta:
-                    return False
-                
-                # Chave para o mês/ano no formato "MM/AAAA"
-                chave_mes_ano = f"{mes:02d}/{ano}"
-                
-                # Verificando se o mês/ano está no histórico
-                return chave_mes_ano in conta['historico_pagamentos']
+        # Verificando se existe histórico de pagamentos
+        if conta is None or not conta.historico_pagamentos:
+            return False
         
-        return False
+        # Verificando se o mês/ano (chave "MM/AAAA") está no histórico
+        return f"{mes:02d}/{ano}" in conta.historico_pagamentos
     
     def obter_data_pagamento(self, conta_id, mes, ano):
         """Obtém a data de pagamento de uma conta fixa para um mês/ano específico"""
-        contas = self.obter_contas_fixas()
+        conta = self._obter_colecao('contas_fixas').get(conta_id)
         
-        for conta in contas:
-            if conta['id'] == conta_id:
-                # Verificando se existe histórico de pagamentos
-                if 'historico_pagamentos' not in conta:
-                    return None
-                
-                # Chave para o mês/ano no formato "MM/AAAA"
-                chave_mes_ano = f"{mes:02d}/{ano}"
-                
-                # Verificando se o mês/ano está no histórico
-                if chave_mes_ano in conta['historico_pagamentos']:
-                    return conta['historico_pagamentos'][chave_mes_ano].get('data_pagamento')
+        # Verificando se existe histórico de pagamentos
+        if conta is None or not conta.historico_pagamentos:
+            return None
+        
+        # Verificando se o mês/ano (chave "MM/AAAA") está no histórico
+        pagamento = conta.historico_pagamentos.get(f"{mes:02d}/{ano}")
+        if pagamento is not None:
+            return pagamento.get('data_pagamento')
         
         return None
     
+    def contar_contas_pendentes(self, inicio, fim):
+        """Retorna a quantidade de contas fixas não pagas em cada (mes, ano) entre dois (mes, ano)"""
+        self._obter_colecao('contas_fixas')
+        quantidades = self._pagamentos.pendentes_por_mes(inicio[1] * 12 + inicio[0], fim[1] * 12 + fim[0])
+        return {((ordinal - 1) % 12 + 1, (ordinal - 1) // 12): quantidade for ordinal, quantidade in quantidades.items()}
+    
+    def obter_contas_pendentes(self, inicio, fim):
+        """Retorna as contas fixas não pagas em cada mês entre dois (mes, ano), em ordem de mês"""
+        self._obter_colecao('contas_fixas')
+        pendentes = []
+        ocorrencias = self._pagamentos.pendentes(inicio[1] * 12 + inicio[0], fim[1] * 12 + fim[0])
+        
+        # Dentro de cada mês, as contas seguem a ordem da coleção
+        for conta, ordinal in sorted(ocorrencias, key=lambda ocorrencia: (ocorrencia[1], _ordem_id(ocorrencia[0]))):
+            pendentes.append({
+                'id': conta.id,
+                'descricao': conta.descricao,
+                'mes': (ordinal - 1) % 12 + 1,
+                'ano': (ordinal - 1) // 12
+            })
+        return pendentes
+    
+    def obter_sequencia_pagamentos(self, conta_id, mes, ano):
+        """Retorna a sequência de meses pagos de uma conta fixa terminando em mes/ano ('atual') e a maior delas ('maior')"""
+        conta = self._obter_colecao('contas_fixas').get(conta_id)
+        if conta is None:
+            return {'atual': 0, 'maior': 0}
+        return {
+            'atual': self._pagamentos.sequencia(conta, ano * 12 + mes),
+            'maior': self._pagamentos.maior_sequencia(conta)
+        }
+    
+    def obter_lembretes_vencimento(self, hoje=None, dias=5):
+        """Retorna as contas fixas não pagas do mês que vencem em até `dias` dias (ou já venceram), cada uma uma única vez"""
+        hoje = hoje or dt.now()
+        self._obter_colecao('contas_fixas')
+        
+        # As contas do mês entram na fila na primeira verificação dele; depois ela é mantida pelas alterações
+        ordinal = hoje.year * 12 + hoje.month
+        if ordinal not in self._vencimentos.meses:
+            self._vencimentos.carregar_mes(ordinal, self._registros_do_periodo('contas_fixas', hoje.month, hoje.year))
+        
+        # Saem da fila apenas as ocorrências com (data limite - hoje).days <= dias
+        lembretes = []
+        for conta, _, vencimento in self._vencimentos.retirar(hoje + datetime.timedelta(days=dias + 1)):
+            lembretes.append({
+                'id': conta.id,
+                'descricao': conta.descricao,
+                'data_limite': conta.obter('data_limite'),
+                'vencimento': vencimento
+            })
+        return lembretes
+    
+    # Busca
+    def buscar(self, texto, limite=200):
+        """Retorna os registros de todos os períodos cuja descrição contém o texto, dos mais recentes aos mais antigos"""
+        hoje = datetime.date.today()
+        mes_atual = hoje.year * 12 + hoje.month
+        
+        # Cada coleção responde pelo seu índice de trigramas; só os mais recentes de cada uma disputam as posições
+        encontrados = []
+        for nome, tipo in (('gastos', 'Gasto'), ('receitas', 'Receita'), ('contas_fixas', 'Conta Fixa')):
+            self._obter_colecao(nome)
+            registros = self._textos[nome].buscar(texto)
+            for registro in heapq.nlargest(limite, registros, key=lambda registro: recencia(registro, mes_atual)):
+                encontrados.append((recencia(registro, mes_atual), tipo, registro))
+        
+        resultados = []
+        for _, tipo, registro in heapq.nlargest(limite, encontrados, key=itemgetter(0)):
+            resultado = registro.para_dict()
+            resultado['tipo'] = tipo
+            resultados.append(resultado)
+        return resultados
+    
     # Métodos para análise de dados
     def obter_gastos_por_periodo(self, mes=None, ano=None):
         """Retorna os gastos filtrados por mês e ano"""
-        gastos = self.obter_gastos()
-        
         if mes is not None and ano is not None:
-            # Filtrando por mês e ano
-            gastos_filtrados = []
-            for gasto in gastos:
-                data = dt.strptime(gasto['data'], "%d/%m/%Y")
-                if data.month == mes and data.year == ano:
-                    gastos_filtrados.append(gasto)
-            return gastos_filtrados
+            if (self._colecao_em_cache('gastos', self.armazenamento.assinatura('gastos')) is None
+                    and not self._consultar_no_armazenamento('gastos')):
+                # Sem a coleção em memória (nem um armazenamento que separe os meses), os gastos do mês são
+                # filtrados à medida que são lidos, sem carregar os demais
+                return sorted(self.iterar_gastos(mes, ano), key=lambda gasto: gasto.get('id') or 0)
+            
+            # A consulta percorre apenas o grupo do mês no índice mensal
+            return self.consulta().tipo('gasto').no_mes(mes, ano).lista()
         
-        return gastos
+        return self.obter_gastos()
     
     def obter_receitas_por_periodo(self, mes=None, ano=None):
         """Retorna as receitas filtradas por mês e ano"""
-        receitas = self.obter_receitas()
-        
         if mes is not None and ano is not None:
-            # Filtrando por mês e ano
-            receitas_filtradas = []
-            
-            for receita in receitas:
-                # Verificando se é uma receita recorrente
-                if receita.get('recorrente', False):
-                    # Verificando se a data de início é anterior ou igual ao período solicitado
-                    data_inicio = dt.strptime(receita['data_inicio'], "%d/%m/%Y")
-                    
-                    # Verificando se a data de fim (se existir) é posterior ou igual ao período solicitado
-                    tem_data_fim = 'data_fim' in receita and receita['data_fim']
-                    if tem_data_fim:
-                        data_fim = dt.strptime(receita['data_fim'], "%d/%m/%Y")
-                    
-                    # Verificando se o período solicitado está dentro do período da receita recorrente
-                    periodo_solicitado = dt(ano, mes, 1)
-                    
-                    if (data_inicio.year < ano or (data_inicio.year == ano and data_inicio.month <= mes)) and \
-                       (not tem_data_fim or (data_fim.year > ano or (data_fim.year == ano and data_fim.month >= mes))):
-                        # Criando uma cópia da receita para o período solicitado
-                        receita_periodo = receita.copy()
-                        receita_periodo['data'] = f"01/{mes:02d}/{ano}"
-                        receitas_filtradas.append(receita_periodo)
-                else:
-                    # Para receitas não recorrentes, verificamos a data normalmente
-                    data = dt.strptime(receita['data'], "%d/%m/%Y")
-                    if data.month == mes and data.year == ano:
-                        receitas_filtradas.append(receita)
-            
-            return receitas_filtradas
+            # As ocorrências do mês incluem as receitas pontuais dele e as recorrentes ativas nele
+            return self.consulta().tipo('receita').no_mes(mes, ano).lista()
         
-        return receitas
+        return self.obter_receitas()
     
     def obter_contas_fixas_por_periodo(self, mes=None, ano=None):
         """Retorna as contas fixas filtradas por mês e ano"""
-        contas = self.obter_contas_fixas()
-        
         if mes is not None and ano is not None:
-            # Filtrando por mês e ano
-            contas_filtradas = []
-            
-            for conta in contas:
-                # Verificando se a conta se aplica ao período solicitado
-                if conta.get('recorrente', False):
-                    # Verificando se a data de início é anterior ou igual ao período solicitado
-                    data_inicio = dt.strptime(conta['data_inicio'], "%d/%m/%Y")
-                    
-                    # Verificando se a data de fim (se existir) é posterior ou igual ao período solicitado
-                    tem_data_fim = 'data_fim' in conta and conta['data_fim']
-                    if tem_data_fim:
-                        data_fim = dt.strptime(conta['data_fim'], "%d/%m/%Y")
-                    
-                    # Verificando se o período solicitado está dentro do período da conta recorrente
-                    periodo_solicitado = dt(ano, mes, 1)
-                    
-                    if (data_inicio.year < ano or (data_inicio.year == ano and data_inicio.month <= mes)) and \
-                       (not tem_data_fim or (data_fim.year > ano or (data_fim.year == ano and data_fim.month >= mes))):
-                        # Criando uma cópia da conta para o período solicitado
-                        conta_periodo = conta.copy()
-                        
-                        # Verificando se a conta está paga para este período
-                        pago = self.verificar_conta_paga(conta['id'], mes, ano)
-                        data_pagamento = self.obter_data_pagamento(conta['id'], mes, ano)
-                        
-                        conta_periodo['pago'] = pago
-                        if pago and data_pagamento:
-                            conta_periodo['data_pagamento'] = data_pagamento
-                        
-                        # Adicionando o mês e ano para referência
-                        conta_periodo['mes'] = mes
-                        conta_periodo['ano'] = ano
-                        
-                        contas_filtradas.append(conta_periodo)
-                else:
-                    # Para contas não recorrentes, verificamos o mês e ano normalmente
-                    if conta.get('mes') == mes and conta.get('ano') == ano:
-                        contas_filtradas.append(conta)
+            # As ocorrências do mês incluem as contas pontuais dele e as recorrentes ativas nele
+            return self.consulta().tipo('conta_fixa').no_mes(mes, ano).lista()
+        
+        return self.obter_contas_fixas()
+    
+    def _receita_do_periodo(self, ocorrencia, mes, ano):
+        """Monta o dicionário de uma receita no período a partir da sua ocorrência no mês"""
+        receita = ocorrencia.registro
+        receita_periodo = receita.para_dict()
+        
+        # Uma receita recorrente é exibida com a data do período solicitado
+        if receita.recorrente:
+            receita_periodo['data'] = f"01/{mes:02d}/{ano}"
+        
+        return receita_periodo
+    
+    def _conta_do_periodo(self, ocorrencia, mes, ano):
+        """Monta o dicionário de uma conta fixa no período a partir da sua ocorrência no mês"""
+        conta = ocorrencia.registro
+        conta_periodo = conta.para_dict()
+        
+        # Uma conta recorrente traz o pagamento do período, já resolvido na ocorrência
+        if conta.recorrente:
+            conta_periodo['pago'] = ocorrencia.pago
+            if ocorrencia.pago and ocorrencia.pagamento.get('data_pagamento'):
+                conta_periodo['data_pagamento'] = ocorrencia.pagamento['data_pagamento']
             
-            return contas_filtradas
+            # Adicionando o mês e ano para referência
+            conta_periodo['mes'] = mes
+            conta_periodo['ano'] = ano
         
-        return contas
+        return conta_periodo
+    
+    # Consultas compostas
+    def consulta(self):
+        """Retorna uma consulta sem filtros, a ser refinada por encadeamento (ex.: consulta().tipo('gasto').categoria('Lazer'))"""
+        return Consulta(self)
+    
+    def _planejar_consulta(self, consulta, tipo):
+        """Escolhe o índice mais barato para um tipo da consulta: retorna (índice, função que retorna os candidatos ou None se percorrer os meses)"""
+        nome = TIPOS_AGRUPAMENTO[tipo]
+        if consulta.inicio is not None and (nome != 'gastos' or self._consultar_no_armazenamento(nome)):
+            # Receitas e contas de um intervalo vêm das ocorrências de cada mês; sem a coleção em memória,
+            # os gastos de cada mês vêm do próprio armazenamento
+            return 'mes', None
+        
+        # Cada opção é (índice, quantidade estimada de candidatos, função que retorna os candidatos); a escolha usa
+        # só as estimativas, e apenas os candidatos do índice escolhido são levantados
+        colecao = self._obter_colecao(nome)
+        # Os candidatos de 'todos' são uma cópia, para a consulta sob demanda não depender de a coleção ficar parada
+        opcoes = [('todos', len(colecao), lambda: list(colecao.values()))]
+        if consulta.ids is not None:
+            opcoes.append(('id', len(consulta.ids), lambda: [colecao[i] for i in consulta.ids if i in colecao]))
+        elif consulta.textos:
+            textos = self._textos[nome]
+            opcoes.append(('texto', textos.estimar(consulta.textos[0]), lambda: textos.buscar(consulta.textos[0])))
+        if consulta.inicio is not None:
+            tamanho = sum(
+                len(grupo) for (ano, mes), grupo in self._indices['gastos'].grupos.items()
+                if consulta.inicio <= ano * 12 + mes <= consulta.fim
+            )
+            opcoes.append(('mes', tamanho, None))
+        if consulta.categorias is not None and nome == 'gastos' and self._colunas_gastos is not None:
+            colunas = self._colunas_gastos
+            opcoes.append((
+                'categoria', colunas.contar_categorias(consulta.categorias),
+                lambda: colunas.registros_das_categorias(consulta.categorias)
+            ))
+        
+        indice, _, obter_candidatos = min(opcoes, key=itemgetter(1))
+        return indice, obter_candidatos
+    
+    def _executar_consulta(self, consulta, tipo):
+        """Percorre, sob demanda, os registros de um tipo que passam nos filtros da consulta"""
+        nome = TIPOS_AGRUPAMENTO[tipo]
+        indice, obter_candidatos = self._planejar_consulta(consulta, tipo)
+        
+        if indice == 'mes':
+            for ordinal in range(consulta.inicio, consulta.fim + 1):
+                mes, ano = (ordinal - 1) % 12 + 1, (ordinal - 1) // 12
+                if nome == 'gastos':
+                    for gasto in self._registros_do_periodo('gastos', mes, ano):
+                        if consulta.aceita(gasto):
+                            yield gasto.para_dict()
+                    continue
+                
+                # As receitas e contas aparecem em cada mês em que ocorrem, com os dados do período
+                para_dict_do_periodo = self._receita_do_periodo if nome == 'receitas' else self._conta_do_periodo
+                for ocorrencia in self._ocorrencias_do_periodo(nome, mes, ano):
+                    if consulta.aceita(ocorrencia.registro):
+                        yield para_dict_do_periodo(ocorrencia, mes, ano)
+            return
+        
+        candidatos = obter_candidatos()
+        if consulta.inicio is None:
+            # Sem intervalo, cada registro aparece uma vez, na ordem da coleção
+            for registro in (candidatos if indice == 'todos' else sorted(candidatos, key=_ordem_id)):
+                if consulta.aceita(registro):
+                    yield registro.para_dict()
+            return
+        
+        # Gastos do intervalo localizados por outro índice saem na ordem dos meses, como no índice mensal
+        selecionados = []
+        for gasto in candidatos:
+            periodo = gasto.periodo
+            if periodo is None or not consulta.inicio <= periodo[0] * 12 + periodo[1] <= consulta.fim:
+                continue
+            if consulta.aceita(gasto):
+                selecionados.append(gasto)
+        selecionados.sort(key=lambda gasto: (gasto.periodo, _ordem_id(gasto)))
+        for gasto in selecionados:
+            yield gasto.para_dict()
     
     def calcular_total_gastos(self, gastos=None):
         """Calcula o total de gastos"""
         if gastos is None:
-            gastos = self.obter_gastos()
+            # Sem uma lista informada, a soma é feita nas colunas ou à medida que os gastos são lidos
+            return para_reais(self._total_dos_gastos())
         
-        total = 0
-        for gasto in gastos:
-            total += float(gasto['valor'])
-        
-        return total
+        # Somando em centavos inteiros para não acumular erros de arredondamento
+        return para_reais(sum(_centavos(gasto) for gasto in gastos))
+    
+    def _total_dos_gastos(self):
+        """Retorna a soma de todos os gastos em centavos, pelas colunas, pelos registros ou lendo o armazenamento"""
+        gastos = self._colecao_em_cache('gastos', self.armazenamento.assinatura('gastos'))
+        if gastos is None:
+            # Sem a coleção em memória, os valores são somados à medida que os gastos são lidos, sem carregá-los
+            return sum(para_centavos(gasto.get('valor')) for gasto in self.iterar_gastos())
+        if self._colunas_gastos is not None:
+            return self._colunas_gastos.total()
+        return sum(gasto.centavos for gasto in gastos.values())
     
     def calcular_total_receitas(self, receitas=None):
         """Calcula o total de receitas"""
         if receitas is None:
-            receitas = self.obter_receitas()
-        
-        total = 0
-        for receita in receitas:
-            total += float(receita['valor'])
+            receitas = self._obter_colecao('receitas').values()
         
-        return total
+        # Somando em centavos inteiros para não acumular erros de arredondamento
+        return para_reais(sum(_centavos(receita) for receita in receitas))
     
     def calcular_total_contas_fixas(self, contas=None):
         """Calcula o total de contas fixas"""
         if contas is None:
-            contas = self.obter_contas_fixas()
-        
-        total = 0
-        for conta in contas:
-            total += float(conta['valor'])
+            contas = self._obter_colecao('contas_fixas').values()
         
-        return total
+        # Somando em centavos inteiros para não acumular erros de arredondamento
+        return para_reais(sum(_centavos(conta) for conta in contas))
+    
+    def calcular_total_contas_fixas_com_parcelas(self, mes, ano):
+        """Calcula o total cobrado no mês pelas contas fixas, considerando parcelas e juros (usado pelas abas)"""
+        total, _, _ = self._contas_do_mes(mes, ano)
+        return para_reais(total)
+    
+    def _contas_do_mes(self, mes, ano):
+        """Retorna (total em centavos, pagas, pendentes) das contas fixas do mês, a única fonte do total das contas"""
+        # O resumo mensal soma em cada mês a parcela cobrada nas parceladas e é mantido a cada alteração,
+        # então as abas, o saldo e o resumo mensal mostram o mesmo total
+        return self._resumo_da_colecao('contas_fixas', mes, ano).contas_do_mes(mes, ano)
     
     def calcular_saldo(self, mes=None, ano=None):
         """Calcula o saldo (receitas - gastos - contas fixas)"""
         if mes is not None and ano is not None:
-            gastos = self.obter_gastos_por_periodo(mes, ano)
-            receitas = self.obter_receitas_por_periodo(mes, ano)
-            contas_fixas = self.obter_contas_fixas_por_periodo(mes, ano)
+            # Os totais do mês vêm prontos do resumo mensal
+            total_gastos, _ = self._resumo_da_colecao('gastos', mes, ano).gastos_do_mes(mes, ano)
+            total_receitas = self._resumo_da_colecao('receitas', mes, ano).receitas_do_mes(mes, ano)
+            total_contas_fixas, _, _ = self._contas_do_mes(mes, ano)
         else:
-            gastos = self.obter_gastos()
-            receitas = self.obter_receitas()
-            contas_fixas = self.obter_contas_fixas()
+            # Os totais usam os registros tipados diretamente, sem montar os dicionários das telas
+            total_gastos = self._total_dos_gastos()
+            total_receitas = sum(receita.centavos for receita in self._obter_colecao('receitas').values())
+            total_contas_fixas = sum(conta.centavos for conta in self._obter_colecao('contas_fixas').values())
         
-        total_gastos = self.calcular_total_gastos(gastos)
-        total_receitas = self.calcular_total_receitas(receitas)
-        total_contas_fixas = self.calcular_total_contas_fixas(contas_fixas)
+        # O saldo é calculado em centavos e convertido para reais apenas no final
+        return para_reais(total_receitas - total_gastos - total_contas_fixas)
+    
+    def obter_resumo_mensal(self, mes, ano):
+        """Retorna os totais de um mês sem percorrer os registros: gastos, receitas, contas fixas e contas pagas/pendentes"""
+        total_gastos, por_categoria = self._resumo_da_colecao('gastos', mes, ano).gastos_do_mes(mes, ano)
+        total_receitas = self._resumo_da_colecao('receitas', mes, ano).receitas_do_mes(mes, ano)
+        total_contas_fixas, pagos, pendentes = self._contas_do_mes(mes, ano)
         
-        return total_receitas - total_gastos - total_contas_fixas
+        return {
+            'total_gastos': para_reais(total_gastos),
+            'total_receitas': para_reais(total_receitas),
+            'total_contas_fixas': para_reais(total_contas_fixas),
+            'por_categoria': {categoria: para_reais(centavos) for categoria, centavos in por_categoria.items()},
+            'pagos': pagos,
+            'pendentes': pendentes
+        }
     
     def obter_gastos_por_categoria(self, mes=None, ano=None):
         """Retorna um dicionário com os gastos agrupados por categoria"""
+        # Todas as categorias aparecem, mesmo sem gastos
+        gastos_por_categoria = {categoria: para_reais(0) for categoria in self.categorias}
+        
+        # O mês e o ano só filtram quando informados juntos; o agrupamento fica guardado até a próxima alteração
+        filtro = {'tipo': 'gasto'}
         if mes is not None and ano is not None:
-            gastos = self.obter_gastos_por_periodo(mes, ano)
-        else:
-            gastos = self.obter_gastos()
+            filtro.update(mes=mes, ano=ano)
+        for (categoria,), valores in self.agrupar(('categoria',), filtro).items():
+            gastos_por_categoria[categoria] = valores['soma']
+        
+        return gastos_por_categoria
+    
+    def obter_gastos_por_mes_e_categoria(self, mes_inicio, ano_inicio, mes_fim, ano_fim):
+        """Retorna os gastos de um intervalo de meses como uma matriz (meses x categorias) em reais"""
+        gastos = self._obter_colecao('gastos')
+        inicio = ano_inicio * 12 + mes_inicio
+        fim = ano_fim * 12 + mes_fim
+        meses = [((ordinal - 1) % 12 + 1, (ordinal - 1) // 12) for ordinal in range(inicio, fim + 1)]
         
-        gastos_por_categoria = {}
-        for categoria in self.categorias:
-            gastos_por_categoria[categoria] = 0
+        if self._colunas_gastos is not None:
+            # Uma única passada vetorizada sobre as colunas preenche todas as células do intervalo
+            matriz = self._colunas_gastos.matriz(inicio, fim)
+            return {'meses': meses, 'categorias': list(self._colunas_gastos.categorias), 'valores': matriz / 100}
         
-        for gasto in gastos:
-            categoria = gasto['categoria']
-            valor = float(gasto['valor'])
+        # Sem o NumPy, a matriz é montada em listas, com as categorias na mesma ordem das colunas
+        categorias = list(self.categorias)
+        for gasto in gastos.values():
+            if gasto.categoria not in categorias:
+                categorias.append(gasto.categoria)
+        posicoes = {categoria: posicao for posicao, categoria in enumerate(categorias)}
+        matriz = [[0] * len(categorias) for _ in meses]
+        for gasto in gastos.values():
+            periodo = gasto.periodo
+            if periodo is not None and inicio <= periodo[0] * 12 + periodo[1] <= fim:
+                matriz[periodo[0] * 12 + periodo[1] - inicio][posicoes[gasto.categoria]] += gasto.centavos
+        return {
+            'meses': meses,
+            'categorias': categorias,
+            'valores': [[centavos / 100 for centavos in linha] for linha in matriz]
+        }
+    
+    def agrupar(self, dimensoes, filtro=None):
+        """Agrupa gastos, receitas e contas fixas por categoria, mes, ano e/ou tipo, com soma, quantidade, maior e menor valor"""
+        dimensoes = tuple(dimensoes)
+        
+        # Filtro {dimensão: valor}; um valor None não filtra
+        filtro = {dimensao: valor for dimensao, valor in (filtro or {}).items() if valor is not None}
+        desconhecidas = (set(dimensoes) | set(filtro)) - set(DIMENSOES)
+        if desconhecidas:
+            raise ValueError(f"Dimensão desconhecida: {', '.join(sorted(desconhecidas))}")
+        
+        tipos = [tipo for tipo in TIPOS_AGRUPAMENTO if filtro.get('tipo', tipo) == tipo]
+        
+        # Receitas e contas fixas sem ano no filtro são agrupadas nos meses disponíveis, que dependem do mês atual
+        mes_atual = None
+        if 'ano' not in filtro and any(tipo != 'gasto' for tipo in tipos):
+            hoje = datetime.date.today()
+            mes_atual = hoje.year * 12 + hoje.month
+        
+        # O resultado fica guardado até a próxima alteração das coleções envolvidas, feita aqui ou por outro processo
+        chave = (dimensoes, tuple(sorted(filtro.items())))
+        versao = self._versao_agrupamento(tipos, mes_atual)
+        em_cache = self._agrupamentos.get(chave)
+        if em_cache is None or em_cache[0] != versao:
+            resultado = self._calcular_agrupamento(dimensoes, filtro, tipos)
             
-            if categoria in gastos_por_categoria:
-                gastos_por_categoria[categoria] += valor
+            # A versão é lida de novo porque o cálculo pode ter recarregado as coleções
+            if len(self._agrupamentos) >= 256:
+                self._agrupamentos.clear()
+            em_cache = (self._versao_agrupamento(tipos, mes_atual), resultado)
+            self._agrupamentos[chave] = em_cache
+        
+        # As telas recebem cópias, para que alterá-las não afete o resultado guardado
+        return {grupo: dict(valores) for grupo, valores in em_cache[1].items()}
+    
+    def _versao_agrupamento(self, tipos, mes_atual):
+        """Retorna a versão dos dados de que depende um agrupamento"""
+        versoes = []
+        for tipo in tipos:
+            nome = TIPOS_AGRUPAMENTO[tipo]
+            versoes.append((self._versoes[nome], self.armazenamento.assinatura(nome)))
+        return (tuple(versoes), mes_atual)
+    
+    def _calcular_agrupamento(self, dimensoes, filtro, tipos):
+        """Calcula um agrupamento em uma única passada por tipo (os gastos, direto nas colunas)"""
+        agrupamento = Agrupamento()
+        mes, ano, categoria = filtro.get('mes'), filtro.get('ano'), filtro.get('categoria')
+        
+        if 'gasto' in tipos:
+            gastos = self._obter_colecao('gastos')
+            if self._colunas_gastos is not None:
+                # Os gastos são agregados de uma vez nas colunas, já filtrados
+                grupos = self._colunas_gastos.agrupar(
+                    por_mes='mes' in dimensoes or 'ano' in dimensoes,
+                    por_categoria='categoria' in dimensoes,
+                    mes=mes, ano=ano, categoria=categoria
+                )
+                for (ordinal, categoria_gasto), valores in grupos.items():
+                    agrupamento.juntar(_chave_do_grupo(dimensoes, 'gasto', ordinal, categoria_gasto), *valores)
             else:
-                gastos_por_categoria[categoria] = valor
+                # Sem o NumPy, cada gasto que passa no filtro é acumulado no seu grupo
+                for gasto in gastos.values():
+                    periodo = gasto.periodo
+                    if (mes is not None or ano is not None) and periodo is None:
+                        continue
+                    if ((mes is not None and periodo[1] != mes) or (ano is not None and periodo[0] != ano)
+                            or (categoria is not None and gasto.categoria != categoria)):
+                        continue
+                    ordinal = periodo[0] * 12 + periodo[1] if periodo is not None else None
+                    agrupamento.adicionar(_chave_do_grupo(dimensoes, 'gasto', ordinal, gasto.categoria), gasto.centavos)
         
-        return gastos_por_categoria
+        # Receitas e contas fixas não têm categoria, então não passam em um filtro de categoria
+        tipos_recorrentes = [tipo for tipo in tipos if tipo != 'gasto']
+        if tipos_recorrentes and categoria is None:
+            # Os meses são os do ano filtrado ou, sem ano, os meses disponíveis nos dados
+            if ano is not None:
+                ordinais = [ano * 12 + mes_do_ano for mes_do_ano in range(1, 13)]
+            else:
+                ordinais = [
+                    ano_disponivel * 12 + mes_disponivel
+                    for mes_disponivel, ano_disponivel in self.obter_meses_anos_disponiveis()
+                ]
+            if mes is not None:
+                ordinais = [ordinal for ordinal in ordinais if (ordinal - 1) % 12 + 1 == mes]
+            
+            # Cada ocorrência contribui com o valor cobrado no mês (a parcela, nas contas parceladas)
+            for tipo in tipos_recorrentes:
+                nome = TIPOS_AGRUPAMENTO[tipo]
+                for ordinal in ordinais:
+                    for ocorrencia in self._ocorrencias_do_periodo(nome, (ordinal - 1) % 12 + 1, (ordinal - 1) // 12):
+                        agrupamento.adicionar(_chave_do_grupo(dimensoes, tipo, ordinal, None), ocorrencia.centavos)
+        
+        return agrupamento.resultado()
     
-    def _gerar_id(self, lista):
-        """Gera um ID único para um novo item"""
-        if not lista:
-            return 1
+    def obter_serie(self, inicio, fim, granularidade='mes'):
+        """Retorna as séries de receitas, gastos, contas fixas, saldo e gastos por categoria entre dois (mes, ano)"""
+        if granularidade not in ('mes', 'ano'):
+            raise ValueError(f"Granularidade desconhecida: {granularidade}")
         
-        # Encontrando o maior ID existente
-        maior_id = 0
-        for item in lista:
-            if 'id' in item and item['id'] > maior_id:
-                maior_id = item['id']
+        # Os totais de cada mês vêm do resumo mensal, que cobre o intervalo inteiro sem percorrer os registros
+        # (as contas parceladas entram com a parcela do mês, como no histórico, na visão geral e no agrupamento)
+        resumos = {nome: self._resumo_da_colecao(nome) for nome in self.arquivos}
+        
+        periodos = []
+        receitas, gastos, contas_fixas = [], [], []
+        por_categoria = {categoria: [] for categoria in self.categorias}
+        for ordinal in range(inicio[1] * 12 + inicio[0], fim[1] * 12 + fim[0] + 1):
+            ano, mes = (ordinal - 1) // 12, (ordinal - 1) % 12 + 1
+            
+            # Cada mês abre um novo ponto da série; por ano, só o primeiro mês de cada ano
+            periodo = (mes, ano) if granularidade == 'mes' else ano
+            if not periodos or periodos[-1] != periodo:
+                periodos.append(periodo)
+                for serie in (receitas, gastos, contas_fixas, *por_categoria.values()):
+                    serie.append(0)
+            
+            total_gastos, categorias = resumos['gastos'].gastos_do_mes(mes, ano)
+            receitas[-1] += resumos['receitas'].receitas_do_mes(mes, ano)
+            gastos[-1] += total_gastos
+            contas_fixas[-1] += resumos['contas_fixas'].contas_do_mes(mes, ano)[0]
+            for categoria, centavos in categorias.items():
+                if categoria not in por_categoria:
+                    # Categoria que ainda não apareceu começa zerada nos pontos anteriores
+                    por_categoria[categoria] = [0] * len(periodos)
+                por_categoria[categoria][-1] += centavos
         
-        # Retornando o próximo ID
-        return maior_id + 1
+        # As somas são feitas em centavos e convertidas para reais apenas no final
+        saldo = [receita - gasto - conta for receita, gasto, conta in zip(receitas, gastos, contas_fixas)]
+        return {
+            'periodos': periodos,
+            'receitas': [para_reais(centavos) for centavos in receitas],
+            'gastos': [para_reais(centavos) for centavos in gastos],
+            'contas_fixas': [para_reais(centavos) for centavos in contas_fixas],
+            'saldo': [para_reais(centavos) for centavos in saldo],
+            'por_categoria': {
+                categoria: [para_reais(centavos) for centavos in serie] for categoria, serie in por_categoria.items()
+            }
+        }
+    
+    def _gerar_id(self, nome):
+        """Gera um ID único para um novo item da coleção (que já deve estar carregada)"""
+        novo_id = self._proximo_id[nome]
+        self._proximo_id[nome] = novo_id + 1
+        return novo_id
     
     def obter_meses_anos_disponiveis(self):
         """Retorna uma lista de tuplas (mes, ano) disponíveis nos dados"""
-        gastos = self.obter_gastos()
-        receitas = self.obter_receitas()
-        contas_fixas = self.obter_contas_fixas()
+        # Os meses vêm dos índices; o resultado só é refeito quando algum mês ou vigência muda (ou o mês atual vira)
+        hoje = datetime.date.today()
+        mes_atual = hoje.year * 12 + hoje.month
+        for nome in self.arquivos:
+            self._obter_colecao(nome)
+        chave = (mes_atual, tuple(self._indices[nome].versao for nome in self.arquivos))
+        if self._meses_disponiveis is not None and self._meses_disponiveis[0] == chave:
+            return list(self._meses_disponiveis[1])
         
-        meses_anos = set()
+        # Meses dos gastos, das receitas pontuais e das contas fixas de um mês/ano específico
+        ordinais = set()
+        for nome in self.arquivos:
+            ordinais.update(ano * 12 + mes for ano, mes in self._indices[nome].periodos())
         
-        # Adicionando meses/anos dos gastos
-        for gasto in gastos:
-            data = dt.strptime(gasto['data'], "%d/%m/%Y")
-            meses_anos.add((data.month, data.year))
-        
-        # Adicionando meses/anos das receitas
-        for receita in receitas:
-            if receita.get('recorrente', False):
-                # Para receitas recorrentes, adicionamos todos os meses entre a data de início e fim
-                data_inicio = dt.strptime(receita['data_inicio'], "%d/%m/%Y")
-                
-                # Se tiver data de fim, usamos ela, senão usamos a data atual
-                if 'data_fim' in receita and receita['data_fim']:
-                    data_fim = dt.strptime(receita['data_fim'], "%d/%m/%Y")
-                else:
-                    data_fim = dt.now()
-                
-                # Adicionando todos os meses entre data_inicio e data_fim
-                data_atual = data_inicio
-                while data_atual <= data_fim:
-                    meses_anos.add((data_atual.month, data_atual.year))
-                    
-                    # Avançando para o próximo mês
-                    if data_atual.month == 12:
-                        data_atual = dt(data_atual.year + 1, 1, 1)
-                    else:
-                        data_atual = dt(data_atual.year, data_atual.month + 1, 1)
-            else:
-                # Para receitas não recorrentes, adicionamos apenas o mês/ano da data
-                data = dt.strptime(receita['data'], "%d/%m/%Y")
-                meses_anos.add((data.month, data.year))
-        
-        # Adicionando meses/anos das contas fixas
-        for conta in contas_fixas:
-            if conta.get('recorrente', False):
-                # Para contas recorrentes, adicionamos todos os meses entre a data de início e fim
-                data_inicio = dt.strptime(conta['data_inicio'], "%d/%m/%Y")
-                
-                # Se tiver data de fim, usamos ela, senão usamos a data atual
-                if 'data_fim' in conta and conta['data_fim']:
-                    data_fim = dt.strptime(conta['data_fim'], "%d/%m/%Y")
-                else:
-                    data_fim = dt.now()
-                
-                # Adicionando todos os meses entre data_inicio e data_fim
-                data_atual = data_inicio
-                while data_atual <= data_fim:
-                    meses_anos.add((data_atual.month, data_atual.year))
-                    
-                    # Avançando para o próximo mês
-                    if data_atual.month == 12:
-                        data_atual = dt(data_atual.year + 1, 1, 1)
-                    else:
-                        data_atual = dt(data_atual.year, data_atual.month + 1, 1)
-            else:
-                # Para contas não recorrentes, adicionamos apenas o mês/ano especificado
-                meses_anos.add((conta['mes'], conta['ano']))
+        # Vigências das receitas e contas recorrentes; sem data de fim, vão até o mês atual
+        intervalos = []
+        for nome in ('receitas', 'contas_fixas'):
+            for inicio, fim in self._indices[nome].recorrentes.limites:
+                intervalos.append((inicio, mes_atual if fim == FIM_ABERTO else fim))
+        
+        # Os intervalos sobrepostos são unidos antes de gerar os meses, para que cada mês seja gerado uma vez
+        for inicio, fim in unir_intervalos(intervalos):
+            ordinais.update(range(inicio, fim + 1))
         
-        # Ordenando por ano e mês
-        return sorted(list(meses_anos), key=lambda x: (x[1], x[0]))
+        # Ordenando por ano e mês (ordem dos ordinais)
+        meses_anos = [((ordinal - 1) % 12 + 1, (ordinal - 1) // 12) for ordinal in sorted(ordinais)]
+        self._meses_disponiveis = (chave, meses_anos)
+        return list(meses_anos)
     
     def obter_dados_para_historico(self, mes, ano):
         """Retorna todos os dados (gastos, receitas, contas fixas) para um determinado mês/ano"""
-        gastos = self.obter_gastos_por_periodo(mes, ano)
-        receitas = self.obter_receitas_por_periodo(mes, ano)
-        contas_fixas = self.obter_contas_fixas_por_periodo(mes, ano)
+        return self.obter_historico(mes, ano)['dados']
+    
+    def obter_historico(self, mes, ano):
+        """Retorna as linhas do histórico de um mês/ano e os totais do resumo, montados em uma única passada"""
+        data_padrao = f"01/{mes:02d}/{ano}"
+        primeiro_dia = datetime.date(ano, mes, 1).toordinal()
         
-        # Preparando os dados para exibição
-        dados_historico = []
+        # Cada linha é guardada com a sua chave de ordenação (ordinal do dia), calculada uma única vez
+        linhas = []
+        total_gastos = 0
+        total_receitas = 0
         
-        # Adicionando gastos
-        for gasto in gastos:
-            dados_historico.append({
+        # Adicionando gastos (os registros tipados já trazem o ordinal da data e o valor em centavos)
+        for gasto in self._registros_do_periodo('gastos', mes, ano):
+            total_gastos += gasto.centavos
+            linhas.append((gasto.dia, {
                 'tipo': 'Gasto',
-                'descricao': gasto['descricao'],
-                'categoria': gasto['categoria'],
-                'valor': gasto['valor'],
-                'data': gasto['data'],
+                'descricao': gasto.descricao,
+                'categoria': gasto.categoria,
+                'valor': gasto.valor,
+                'data': gasto.data,
                 'status': '-'
-            })
+            }))
         
-        # Adicionando receitas
-        for receita in receitas:
-            recorrente = receita.get('recorrente', False)
-            status = 'Recorrente' if recorrente else '-'
+        # Adicionando receitas (as recorrentes aparecem no primeiro dia do mês)
+        for ocorrencia in self._ocorrencias_do_periodo('receitas', mes, ano):
+            receita = ocorrencia.registro
+            total_receitas += ocorrencia.centavos
+            if receita.recorrente:
+                data, dia = data_padrao, primeiro_dia
+            else:
+                data, dia = receita.data, receita.dia
             
-            dados_historico.append({
+            linhas.append((dia, {
                 'tipo': 'Receita',
-                'descricao': receita['descricao'],
+                'descricao': receita.descricao,
                 'categoria': 'Receita',
-                'valor': receita['valor'],
-                'data': receita.get('data', f"01/{mes:02d}/{ano}"),
-                'status': status
-            })
+                'valor': receita.valor,
+                'data': data,
+                'status': 'Recorrente' if receita.recorrente else '-'
+            }))
         
         # Adicionando contas fixas
-        for conta in contas_fixas:
-            status = 'Pago' if conta.get('pago', False) else 'Pendente'
-            recorrente = conta.get('recorrente', False)
+        for ocorrencia in self._ocorrencias_do_periodo('contas_fixas', mes, ano):
+            conta = ocorrencia.registro
+            
+            # Os campos são lidos do registro, sem montar o dicionário completo da conta
+            recorrente = conta.recorrente
+            if recorrente:
+                # Uma conta recorrente usa o pagamento do período, já resolvido na ocorrência
+                pago = ocorrencia.pago
+                data_pagamento = ocorrencia.pagamento.get('data_pagamento') if pago else None
+                data = data_pagamento or conta.obter('data_pagamento', data_padrao)
+            else:
+                pago = conta.obter('pago', False)
+                data = conta.obter('data_pagamento', data_padrao)
+            
+            status = 'Pago' if pago else 'Pendente'
             if recorrente:
                 status += ' (Recorrente)'
                 
-            data = conta.get('data_pagamento', f"01/{mes:02d}/{ano}")
-            
-            # Verificando se é uma conta parcelada
-            parcelado = conta.get('parcelado', False)
+            dia = primeiro_dia if data == data_padrao else ordinal_data(data)
             
             # Criando um dicionário com os dados da conta
             conta_historico = {
                 'tipo': 'Conta Fixa',
-                'descricao': conta['descricao'],
+                'descricao': conta.descricao,
                 'categoria': 'Conta Fixa',
-                'valor': conta['valor'],
+                'valor': conta.valor,
                 'data': data,
                 'status': status
             }
             
             # Adicionando informações de parcelamento se aplicável
-            if parcelado:
+            if conta.parcelado:
                 conta_historico['parcelado'] = True
-                conta_historico['num_parcelas'] = conta.get('num_parcelas', 1)
+                conta_historico['num_parcelas'] = conta.obter('num_parcelas', 1)
                 
-                # Adicionando data de início para cálculo da parcela atual
-                if 'data_inicio' in conta:
-                    conta_historico['data_inicio'] = conta['data_inicio']
+                # Adicionando data de início e a parcela do mês, já calculada na ocorrência
+                if 'data_inicio' in conta.forma:
+                    conta_historico['data_inicio'] = conta.data_inicio
+                conta_historico['parcela_atual'] = ocorrencia.parcela
+                conta_historico['valor_parcela'] = para_reais(parcelamento_da_conta(conta).valor(ocorrencia.parcela or 1))
                 
                 # Adicionando informação de juros, se existir
-                if 'valor_com_juros' in conta and conta['valor_com_juros']:
-                    conta_historico['valor_com_juros'] = conta['valor_com_juros']
+                if conta.valor_com_juros:
+                    conta_historico['valor_com_juros'] = conta.valor_com_juros
                     # O valor original é o valor sem juros
-                    conta_historico['valor_sem_juros'] = conta['valor']
+                    conta_historico['valor_sem_juros'] = conta.valor
             
-            dados_historico.append(conta_historico)
+            linhas.append((dia, conta_historico))
+        
+        # Ordenando por data (a ordenação é estável, então a ordem entre gastos, receitas e contas se mantém)
+        linhas.sort(key=lambda linha: linha[0] if linha[0] is not None else _SEM_DATA)
         
-        # Ordenando por data
-        return sorted(dados_historico, key=lambda x: dt.strptime(x['data'], "%d/%m/%Y") if isinstance(x['data'], str) else x['data'])
+        return {
+            'dados': [linha for _, linha in linhas],
+            'total_gastos': para_reais(total_gastos),
+            'total_receitas': para_reais(total_receitas),
+            # O total das contas fixas é o mesmo exibido na Visão Geral (e guardado para ela)
+            'total_contas_fixas': self.calcular_total_contas_fixas_com_parcelas(mes, ano)
+        }
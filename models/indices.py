@@ -0,0 +1,279 @@
+"""
+Módulo de índices em memória usados pelo gerenciador de dados
+"""
+from bisect import bisect_left, bisect_right
+
+class IndiceMensal:
+    """Agrupa registros por (ano, mes) para que a consulta de um mês percorra apenas os registros dele"""
+
+    def __init__(self, chave_periodo):
+        """Inicializa o índice com a função que extrai (ano, mes) de um registro (ou None)"""
+        self.chave_periodo = chave_periodo
+        self.grupos = {}
+        # Incrementada sempre que um mês ganha o primeiro registro ou perde o último (ou o índice é reconstruído)
+        self.versao = 0
+
+    def reconstruir(self, registros):
+        """Reconstrói o índice a partir de todos os registros"""
+        grupos = {}
+        chave_periodo = self.chave_periodo
+        for registro in registros:
+            chave = chave_periodo(registro)
+            if chave is not None:
+                grupos.setdefault(chave, {})[id(registro)] = registro
+        self.grupos = grupos
+        self.versao += 1
+
+    def adicionar(self, registro):
+        """Inclui um registro no grupo do seu mês"""
+        chave = self.chave_periodo(registro)
+        if chave is not None:
+            if chave not in self.grupos:
+                self.versao += 1
+            self.grupos.setdefault(chave, {})[id(registro)] = registro
+
+    def remover(self, registro):
+        """Retira um registro do grupo do seu mês"""
+        chave = self.chave_periodo(registro)
+        grupo = self.grupos.get(chave)
+        if grupo is not None:
+            grupo.pop(id(registro), None)
+            if not grupo:
+                del self.grupos[chave]
+                self.versao += 1
+
+    def obter(self, mes, ano):
+        """Retorna os registros de um mês/ano na ordem em que foram incluídos"""
+        return list(self.grupos.get((ano, mes), {}).values())
+
+    def periodos(self):
+        """Retorna os (ano, mes) que possuem registros"""
+        return self.grupos.keys()
+
+# Ordinal usado como fim dos intervalos sem data de término
+FIM_ABERTO = float('inf')
+
+# Alterações aplicadas na árvore (além do tamanho dela na montagem) antes de ela ser remontada balanceada
+ALTERACOES_MINIMAS_REMONTAGEM = 64
+
+class _NoIntervalos:
+    """Nó de uma árvore de intervalos centrada"""
+
+    __slots__ = ('centro', 'por_inicio', 'inicios', 'por_fim', 'fins', 'esquerda', 'direita')
+
+    def __init__(self, itens):
+        """Constrói o nó (e seus filhos) a partir de uma lista de (inicio, fim, registro)"""
+        # O centro é a mediana dos pontos de início, o que mantém a árvore balanceada
+        inicios = sorted(inicio for inicio, _, _ in itens)
+        self.centro = inicios[len(inicios) // 2]
+
+        esquerda, direita, no_centro = [], [], []
+        for item in itens:
+            if item[1] < self.centro:
+                esquerda.append(item)
+            elif item[0] > self.centro:
+                direita.append(item)
+            else:
+                no_centro.append(item)
+
+        # Os intervalos que contêm o centro ficam ordenados pelas duas extremidades, com as chaves ao lado para a busca binária
+        self.por_inicio = sorted(no_centro, key=lambda item: item[0])
+        self.inicios = [item[0] for item in self.por_inicio]
+        self.por_fim = sorted(no_centro, key=lambda item: -item[1])
+        self.fins = [-item[1] for item in self.por_fim]
+        self.esquerda = _NoIntervalos(esquerda) if esquerda else None
+        self.direita = _NoIntervalos(direita) if direita else None
+
+    def inserir(self, item):
+        """Inclui um intervalo que contém o centro do nó, mantendo as duas ordenações"""
+        posicao = bisect_right(self.inicios, item[0])
+        self.inicios.insert(posicao, item[0])
+        self.por_inicio.insert(posicao, item)
+        posicao = bisect_right(self.fins, -item[1])
+        self.fins.insert(posicao, -item[1])
+        self.por_fim.insert(posicao, item)
+
+    def retirar(self, item):
+        """Retira um intervalo do nó, localizando-o pela busca binária nas duas ordenações"""
+        for chaves, lista, chave in ((self.inicios, self.por_inicio, item[0]), (self.fins, self.por_fim, -item[1])):
+            posicao = bisect_left(chaves, chave)
+            while lista[posicao] is not item:
+                posicao += 1
+            del chaves[posicao]
+            del lista[posicao]
+
+class IndiceIntervalos:
+    """Índice de intervalos de meses (ordinal ano * 12 + mês) que responde quais registros estão ativos em um mês"""
+
+    def __init__(self, vigencia):
+        """Inicializa o índice com a função que extrai (inicio, fim) de um registro (ou None)"""
+        self.vigencia = vigencia
+        self.itens = {}
+        self._arvore = None
+        # Alterações aplicadas na árvore desde a montagem e limite delas antes de remontá-la
+        self._alteracoes = 0
+        self._limite_alteracoes = 0
+        # Quantidade de registros com cada intervalo (inicio, fim) distinto
+        self.limites = {}
+        # Incrementada sempre que um intervalo distinto aparece ou desaparece (ou o índice é reconstruído)
+        self.versao = 0
+
+    def reconstruir(self, registros):
+        """Reconstrói o índice a partir de todos os registros"""
+        self.itens = {}
+        self._arvore = None
+        self.limites = {}
+        self.versao += 1
+        for registro in registros:
+            self.adicionar(registro)
+
+    def adicionar(self, registro):
+        """Inclui um registro recorrente no índice"""
+        intervalo = self.vigencia(registro)
+        if intervalo is None:
+            return
+
+        inicio, fim = intervalo
+        if fim is None:
+            fim = FIM_ABERTO
+        elif fim < inicio:
+            # Intervalo invertido nunca está ativo
+            return
+
+        self.remover(registro)
+        item = (inicio, fim, registro)
+        self.itens[id(registro)] = item
+        self._alterar_arvore(item, True)
+        self._contar((inicio, fim), 1)
+
+    def remover(self, registro):
+        """Retira um registro do índice"""
+        item = self.itens.pop(id(registro), None)
+        if item is not None:
+            self._alterar_arvore(item, False)
+            self._contar(item[:2], -1)
+
+    def _alterar_arvore(self, item, incluir):
+        """Inclui ou retira um intervalo da árvore já montada, descendo até o nó cujo centro ele contém"""
+        if self._arvore is None:
+            # Sem árvore montada, ela é montada já com o intervalo na próxima consulta
+            return
+
+        # A árvore é remontada (balanceada) depois de tantas alterações quanto o tamanho que ela tinha,
+        # o que mantém as alterações em O(log n) amortizado
+        self._alteracoes += 1
+        if self._alteracoes > self._limite_alteracoes:
+            self._arvore = None
+            return
+
+        inicio, fim, _ = item
+        pai, lado, no = None, None, self._arvore
+        while no is not None:
+            if fim < no.centro:
+                pai, lado, no = no, 'esquerda', no.esquerda
+            elif inicio > no.centro:
+                pai, lado, no = no, 'direita', no.direita
+            elif incluir:
+                no.inserir(item)
+                return
+            else:
+                no.retirar(item)
+                return
+
+        # Nenhum nó contém o intervalo: ele passa a ser uma nova folha
+        setattr(pai, lado, _NoIntervalos([item]))
+
+    def _contar(self, limite, sinal):
+        """Atualiza a quantidade de registros com um intervalo, mudando a versão quando ele aparece ou desaparece"""
+        quantidade = self.limites.get(limite, 0) + sinal
+        if quantidade:
+            self.limites[limite] = quantidade
+        else:
+            del self.limites[limite]
+        if quantidade == (1 if sinal > 0 else 0):
+            self.versao += 1
+
+    def ativos(self, ordinal):
+        """Retorna os registros cujo intervalo contém o ordinal do mês, em O(log n + k)"""
+        # A árvore é montada na primeira consulta e depois alterada a cada inclusão ou remoção
+        if self._arvore is None:
+            if not self.itens:
+                return []
+            self._arvore = _NoIntervalos(list(self.itens.values()))
+            self._alteracoes = 0
+            self._limite_alteracoes = max(ALTERACOES_MINIMAS_REMONTAGEM, len(self.itens))
+
+        encontrados = []
+        no = self._arvore
+        while no is not None:
+            if ordinal < no.centro:
+                # Intervalos do nó que começam até o mês
+                for inicio, _, registro in no.por_inicio:
+                    if inicio > ordinal:
+                        break
+                    encontrados.append(registro)
+                no = no.esquerda
+            elif ordinal > no.centro:
+                # Intervalos do nó que terminam a partir do mês
+                for _, fim, registro in no.por_fim:
+                    if fim < ordinal:
+                        break
+                    encontrados.append(registro)
+                no = no.direita
+            else:
+                encontrados.extend(registro for _, _, registro in no.por_inicio)
+                break
+
+        return encontrados
+
+    def __len__(self):
+        """Retorna a quantidade de registros recorrentes no índice"""
+        return len(self.itens)
+
+class IndicePeriodo:
+    """Combina o índice mensal dos registros pontuais com o índice de intervalos dos recorrentes"""
+
+    def __init__(self, chave_periodo, vigencia):
+        """Inicializa os dois índices com as funções que classificam cada registro"""
+        self.pontuais = IndiceMensal(chave_periodo)
+        self.recorrentes = IndiceIntervalos(vigencia)
+
+    def reconstruir(self, registros):
+        """Reconstrói os dois índices a partir de todos os registros"""
+        self.pontuais.reconstruir(registros)
+        self.recorrentes.reconstruir(registros)
+
+    def adicionar(self, registro):
+        """Inclui um registro no índice correspondente"""
+        self.pontuais.adicionar(registro)
+        self.recorrentes.adicionar(registro)
+
+    def remover(self, registro):
+        """Retira um registro dos índices"""
+        self.pontuais.remover(registro)
+        self.recorrentes.remover(registro)
+
+    def obter(self, mes, ano):
+        """Retorna os registros pontuais do mês e os recorrentes ativos nele"""
+        return self.pontuais.obter(mes, ano) + self.recorrentes.ativos(ano * 12 + mes)
+
+    def periodos(self):
+        """Retorna os (ano, mes) que possuem registros pontuais"""
+        return self.pontuais.periodos()
+
+    @property
+    def versao(self):
+        """Versão dos meses cobertos pelos registros, que muda apenas quando eles mudam"""
+        return (self.pontuais.versao, self.recorrentes.versao)
+
+def unir_intervalos(intervalos):
+    """Une intervalos (inicio, fim) inclusivos de ordinais de mês, retornando-os ordenados e sem sobreposição"""
+    unidos = []
+    for inicio, fim in sorted(intervalos):
+        if unidos and inicio <= unidos[-1][1] + 1:
+            # Intervalo que se sobrepõe (ou encosta) no anterior é absorvido por ele
+            if fim > unidos[-1][1]:
+                unidos[-1][1] = fim
+        else:
+            unidos.append([inicio, fim])
+    return [tuple(intervalo) for intervalo in unidos]
@@ -0,0 +1,125 @@
+"""
+Módulo com a fila de vencimentos das contas fixas não pagas, usada nos lembretes de contas pendentes
+"""
+import calendar
+import datetime
+import heapq
+from itertools import count
+
+from models.registros import vigencia_ativa
+
+# Chave das contas sem data limite válida, que são avisadas na primeira verificação do mês
+_SEM_VENCIMENTO = datetime.datetime.min
+
+def vencimento(conta, ordinal):
+    """Retorna a data limite da conta no mês (ordinal ano * 12 + mês) ou None se ela não tiver uma data válida"""
+    data_limite = conta.obter('data_limite')
+    if not data_limite or not isinstance(data_limite, str):
+        return None
+
+    ano, mes = divmod(ordinal - 1, 12)
+    mes += 1
+    try:
+        if data_limite.isdigit():
+            # Apenas o dia: a conta vence nesse dia de cada mês (limitado ao último dia do mês)
+            dia = int(data_limite)
+            if not 1 <= dia <= 31:
+                return None
+            return datetime.datetime(ano, mes, min(dia, calendar.monthrange(ano, mes)[1]))
+        return datetime.datetime.strptime(data_limite, "%d/%m/%Y")
+    except ValueError:
+        return None
+
+def _vence_no_mes(conta, ordinal):
+    """Indica se a conta (pontual ou recorrente) é cobrada no mês"""
+    vigencia = vigencia_ativa(conta)
+    if vigencia is not None:
+        return vigencia[0] <= ordinal and (vigencia[1] is None or ordinal <= vigencia[1])
+    periodo = conta.periodo
+    return periodo is not None and periodo[0] * 12 + periodo[1] == ordinal
+
+def _paga_no_mes(conta, ordinal):
+    """Indica se a conta está paga no mês: pelo histórico, se for recorrente, ou pelo campo "pago" do registro"""
+    if conta.recorrente:
+        ano, mes = divmod(ordinal - 1, 12)
+        return f"{mes + 1:02d}/{ano}" in (conta.historico_pagamentos or {})
+    return bool(conta.obter('pago'))
+
+class FilaVencimentos:
+    """Ocorrências não pagas das contas fixas nos meses carregados, em um heap ordenado pela data limite"""
+
+    def __init__(self):
+        """Inicializa a fila vazia, sem nenhum mês carregado"""
+        # Entradas [data limite (chave), sequência, conta ou None se descartada, ordinal do mês, data limite ou None]
+        self.heap = []
+        # id do registro -> entradas da conta ainda na fila
+        self.entradas = {}
+        # Meses (ordinais) cujas ocorrências estão na fila
+        self.meses = set()
+        # (ID da conta, mês, data limite) já retirados, para que cada ocorrência seja avisada uma única vez
+        self.avisadas = set()
+        # Quantidade de entradas do heap que não foram descartadas
+        self.validas = 0
+        self._sequencia = count()
+
+    def reconstruir(self, registros):
+        """Refaz a fila dos meses já carregados a partir de todas as contas"""
+        self.heap = []
+        self.entradas = {}
+        self.validas = 0
+        for registro in registros:
+            self.adicionar(registro)
+
+    def carregar_mes(self, ordinal, registros):
+        """Inclui na fila as ocorrências não pagas de um mês, a partir das contas cobradas nele"""
+        if ordinal in self.meses:
+            return
+        self.meses.add(ordinal)
+        for registro in registros:
+            self._incluir(registro, ordinal)
+
+    def adicionar(self, conta):
+        """Inclui as ocorrências não pagas de uma conta nos meses carregados"""
+        for ordinal in self.meses:
+            if _vence_no_mes(conta, ordinal):
+                self._incluir(conta, ordinal)
+
+    def remover(self, conta):
+        """Descarta as ocorrências de uma conta (as entradas saem do heap quando chegam ao topo)"""
+        for entrada in self.entradas.pop(id(conta), ()):
+            entrada[2] = None
+            self.validas -= 1
+
+        # Com muitas entradas descartadas, o heap é refeito apenas com as válidas
+        if len(self.heap) > 64 and len(self.heap) > 2 * self.validas:
+            self.heap = [entrada for entrada in self.heap if entrada[2] is not None]
+            heapq.heapify(self.heap)
+
+    def _incluir(self, conta, ordinal):
+        """Coloca a ocorrência de uma conta no heap se ela não estiver paga nem já tiver sido avisada"""
+        if _paga_no_mes(conta, ordinal):
+            return
+        data = vencimento(conta, ordinal)
+        if (conta.id, ordinal, data) in self.avisadas:
+            return
+        entrada = [data or _SEM_VENCIMENTO, next(self._sequencia), conta, ordinal, data]
+        heapq.heappush(self.heap, entrada)
+        self.entradas.setdefault(id(conta), []).append(entrada)
+        self.validas += 1
+
+    def retirar(self, limite):
+        """Retira e retorna as ocorrências (conta, ordinal do mês, data limite) que vencem antes do limite"""
+        retiradas = []
+        while self.heap and self.heap[0][0] < limite:
+            entrada = heapq.heappop(self.heap)
+            _, _, conta, ordinal, data = entrada
+            if conta is None:
+                continue
+            entradas = self.entradas[id(conta)]
+            entradas.remove(entrada)
+            if not entradas:
+                del self.entradas[id(conta)]
+            self.validas -= 1
+            self.avisadas.add((conta.id, ordinal, data))
+            retiradas.append((conta, ordinal, data))
+        return retiradas
@@ -0,0 +1,123 @@
+"""
+Módulo com o mapa de pagamentos das contas fixas em bits (um inteiro por conta), usado nas consultas de vários meses
+"""
+from models.registros import periodo_chave_pagamento, vigencia_ativa
+
+# Mês (ordinal ano * 12 + mês) do bit 0; meses anteriores não são representados
+ORIGEM = 1900 * 12 + 1
+
+def _faixa(inicio, fim):
+    """Retorna a máscara com os bits dos meses entre inicio e fim (inclusive)"""
+    inicio = max(inicio, ORIGEM)
+    if fim < inicio:
+        return 0
+    return ((1 << (fim - inicio + 1)) - 1) << (inicio - ORIGEM)
+
+def _meses(mascara):
+    """Percorre, em ordem, os ordinais dos meses com bit ligado na máscara"""
+    while mascara:
+        bit = mascara & -mascara
+        yield ORIGEM + bit.bit_length() - 1
+        mascara ^= bit
+
+def _bit(chave):
+    """Retorna o bit do mês de uma chave "MM/AAAA" do histórico ou 0 se ela for inválida ou anterior à origem"""
+    periodo = periodo_chave_pagamento(chave)
+    if periodo is None:
+        return 0
+    ordinal = periodo[0] * 12 + periodo[1]
+    return 1 << (ordinal - ORIGEM) if ordinal >= ORIGEM else 0
+
+class MapaPagamentos:
+    """Meses pagos de cada conta fixa em um inteiro usado como conjunto de bits, ao lado dos meses em que ela vence"""
+
+    def __init__(self):
+        """Inicializa o mapa vazio"""
+        # id do registro -> [registro, primeiro mês, último mês (None se não tiver fim), bits dos meses pagos]
+        self.contas = {}
+
+    def reconstruir(self, registros):
+        """Reconstrói o mapa a partir de todas as contas"""
+        self.contas = {}
+        for registro in registros:
+            self.adicionar(registro)
+
+    def adicionar(self, conta):
+        """Inclui uma conta com os pagamentos do seu histórico"""
+        vigencia = vigencia_ativa(conta)
+        if vigencia is None:
+            if conta.recorrente or conta.periodo is None or not all(type(parte) is int for parte in conta.periodo):
+                return
+            # Conta de um mês/ano específico vence só nele
+            ordinal = conta.periodo[0] * 12 + conta.periodo[1]
+            vigencia = (ordinal, ordinal)
+
+        pagos = 0
+        for chave in conta.historico_pagamentos or ():
+            pagos |= _bit(chave)
+        self.contas[id(conta)] = [conta, vigencia[0], vigencia[1], pagos]
+
+    def remover(self, conta):
+        """Retira uma conta do mapa"""
+        self.contas.pop(id(conta), None)
+
+    def marcar(self, conta, chave, pago):
+        """Liga ou desliga o bit do mês de uma chave "MM/AAAA" após um pagamento ser registrado ou desfeito"""
+        entrada = self.contas.get(id(conta))
+        if entrada is None:
+            return
+        if pago:
+            entrada[3] |= _bit(chave)
+        else:
+            entrada[3] &= ~_bit(chave)
+
+    def _vencimentos(self, entrada, inicio, fim):
+        """Retorna a máscara dos meses entre inicio e fim em que a conta vence"""
+        _, vigencia_inicio, vigencia_fim, _ = entrada
+        if vigencia_fim is not None:
+            fim = min(fim, vigencia_fim)
+        return _faixa(max(inicio, vigencia_inicio), fim)
+
+    def pendentes(self, inicio, fim):
+        """Retorna as ocorrências (registro, ordinal do mês) não pagas entre inicio e fim"""
+        encontradas = []
+        for entrada in self.contas.values():
+            for ordinal in _meses(self._vencimentos(entrada, inicio, fim) & ~entrada[3]):
+                encontradas.append((entrada[0], ordinal))
+        return encontradas
+
+    def pendentes_por_mes(self, inicio, fim):
+        """Retorna a quantidade de contas não pagas em cada mês (ordinal) entre inicio e fim"""
+        quantidades = dict.fromkeys(range(inicio, fim + 1), 0)
+        for entrada in self.contas.values():
+            for ordinal in _meses(self._vencimentos(entrada, inicio, fim) & ~entrada[3]):
+                quantidades[ordinal] += 1
+        return quantidades
+
+    def sequencia(self, conta, ordinal):
+        """Retorna quantos meses seguidos, terminando no mês informado, a conta venceu e foi paga"""
+        entrada = self.contas.get(id(conta))
+        if entrada is None or ordinal < ORIGEM:
+            return 0
+
+        # Meses pagos em que a conta vence, até o mês informado; a sequência acaba no primeiro bit desligado
+        ate = _faixa(ORIGEM, ordinal)
+        em_dia = entrada[3] & self._vencimentos(entrada, ORIGEM, ordinal)
+        falhas = ~em_dia & ate
+        if not falhas:
+            return ordinal - ORIGEM + 1
+        return ordinal - ORIGEM - (falhas.bit_length() - 1)
+
+    def maior_sequencia(self, conta):
+        """Retorna a maior quantidade de meses seguidos em que a conta venceu e foi paga"""
+        entrada = self.contas.get(id(conta))
+        if entrada is None:
+            return 0
+
+        # A cada passo, cada sequência de bits ligados perde um bit; o número de passos é o tamanho da maior
+        em_dia = entrada[3] & self._vencimentos(entrada, ORIGEM, ORIGEM + entrada[3].bit_length())
+        tamanho = 0
+        while em_dia:
+            em_dia &= em_dia >> 1
+            tamanho += 1
+        return tamanho
@@ -0,0 +1,87 @@
+"""
+Módulo com o cronograma das contas parceladas: data da última parcela, parcela de cada mês e valor de cada parcela
+"""
+import calendar
+from functools import lru_cache
+
+from models.registros import ordinal_data, ordinal_mes
+
+def data_final(data_inicio, num_parcelas):
+    """Retorna a data da última parcela (data de início avançada num_parcelas - 1 meses) em tempo constante"""
+    meses = max(num_parcelas - 1, 0)
+    ano, mes = divmod(data_inicio.year * 12 + data_inicio.month - 1 + meses, 12)
+    mes += 1
+
+    # O dia é limitado ao último dia de cada mês do caminho, e o limite se mantém nos meses seguintes
+    # (31/01 em 3 parcelas termina em 28/03); só dias acima de 28 são afetados, e no máximo 23 meses são verificados
+    dia = data_inicio.day
+    if dia > 28 and meses:
+        if meses >= 24:
+            # Dois fevereiros seguidos nunca são ambos bissextos
+            dia = 28
+        else:
+            ano_atual, mes_atual = data_inicio.year, data_inicio.month
+            for _ in range(meses):
+                ano_atual, mes_atual = (ano_atual + 1, 1) if mes_atual == 12 else (ano_atual, mes_atual + 1)
+                dia = min(dia, calendar.monthrange(ano_atual, mes_atual)[1])
+
+    return data_inicio.replace(year=ano, month=mes, day=dia)
+
+class Parcelamento:
+    """Cronograma de uma conta parcelada; o centavo que sobra da divisão vai para as primeiras parcelas"""
+
+    __slots__ = ('inicio', 'num_parcelas', 'total', 'valor_parcela', 'resto')
+
+    def __init__(self, inicio, num_parcelas, total):
+        """Inicializa o cronograma a partir do mês (ordinal) da primeira parcela, da quantidade e do total em centavos"""
+        self.inicio = inicio
+        self.num_parcelas = num_parcelas
+        self.total = total
+        self.valor_parcela, self.resto = divmod(total, num_parcelas)
+
+    @property
+    def fim(self):
+        """Retorna o mês (ordinal) da última parcela ou None se o início for desconhecido"""
+        if self.inicio is None:
+            return None
+        return self.inicio + self.num_parcelas - 1
+
+    def parcela(self, ordinal):
+        """Retorna o número da parcela cobrada no mês (1 a num_parcelas) ou None fora do parcelamento"""
+        if self.inicio is None:
+            return None
+        numero = ordinal - self.inicio + 1
+        return numero if 1 <= numero <= self.num_parcelas else None
+
+    def valor(self, numero=1):
+        """Retorna o valor em centavos de uma parcela"""
+        return self.valor_parcela + (1 if numero <= self.resto else 0)
+
+    def valor_no_mes(self, ordinal):
+        """Retorna o valor em centavos cobrado no mês; sem início conhecido, todo mês cobra uma parcela"""
+        if self.inicio is None:
+            return self.valor()
+        numero = self.parcela(ordinal)
+        return self.valor(numero) if numero is not None else 0
+
+@lru_cache(maxsize=4096)
+def _parcelamento(inicio, num_parcelas, total):
+    """Retorna o cronograma compartilhado por todas as contas com os mesmos termos"""
+    return Parcelamento(inicio, num_parcelas, total)
+
+def parcelamento_da_conta(conta):
+    """Retorna o cronograma de uma conta fixa (registro tipado) parcelada ou None se ela não for parcelada"""
+    if not conta.parcelado:
+        return None
+
+    try:
+        num_parcelas = max(int(conta.num_parcelas or 1), 1)
+    except (TypeError, ValueError):
+        num_parcelas = 1
+
+    # O total das parcelas inclui os juros, se houver
+    total = conta.centavos_com_juros if conta.centavos_com_juros is not None else conta.centavos
+
+    # As parcelas contam a partir do mês da data de início (também em uma conta parcelada não recorrente)
+    inicio = conta.inicio if conta.inicio is not None else ordinal_mes(ordinal_data(conta.data_inicio))
+    return _parcelamento(inicio, num_parcelas, total)
@@ -0,0 +1,126 @@
+"""
+Módulo com as ocorrências mensais das receitas e contas fixas, materializadas para as consultas por período
+"""
+from models.parcelamento import parcelamento_da_conta
+from models.registros import ContaFixa, vigencia_ativa
+
+# Meses materializados antes e depois do mês consultado sempre que o horizonte precisa crescer
+MARGEM_HORIZONTE = 12
+
+# Distância (em meses) a partir da qual um mês fora do horizonte é calculado na hora, sem estendê-lo
+DISTANCIA_MAXIMA = 120
+
+class Ocorrencia:
+    """Ocorrência de um registro em um mês: valor cobrado, número da parcela e pagamento registrado"""
+
+    __slots__ = ('registro', 'ordinal', 'centavos', 'parcela', 'pagamento')
+
+    def __init__(self, registro, ordinal, centavos, parcela=None, pagamento=None):
+        """Inicializa a ocorrência de um registro no mês (ordinal ano * 12 + mês)"""
+        self.registro = registro
+        self.ordinal = ordinal
+        self.centavos = centavos
+        self.parcela = parcela
+        self.pagamento = pagamento
+
+    @property
+    def pago(self):
+        """Indica se há pagamento registrado para o mês da ocorrência"""
+        return self.pagamento is not None
+
+def criar_ocorrencia(registro, ordinal):
+    """Cria a ocorrência de uma receita ou conta fixa (pontual ou recorrente) no mês informado"""
+    if not isinstance(registro, ContaFixa):
+        return Ocorrencia(registro, ordinal, registro.centavos)
+
+    # O pagamento do mês fica no histórico sob a chave "MM/AAAA"
+    pagamento = None
+    if registro.historico_pagamentos:
+        ano, mes = divmod(ordinal - 1, 12)
+        pagamento = registro.historico_pagamentos.get(f"{mes + 1:02d}/{ano}")
+
+    # Uma conta parcelada cobra no mês apenas a parcela correspondente (com juros, se houver)
+    parcelamento = parcelamento_da_conta(registro)
+    if parcelamento is None:
+        return Ocorrencia(registro, ordinal, registro.centavos, None, pagamento)
+    return Ocorrencia(registro, ordinal, parcelamento.valor_no_mes(ordinal), parcelamento.parcela(ordinal), pagamento)
+
+class TabelaOcorrencias:
+    """Ocorrências dos registros recorrentes em cada mês de um horizonte que é estendido sob demanda"""
+
+    def __init__(self, margem=MARGEM_HORIZONTE):
+        """Inicializa a tabela vazia, sem nenhum mês materializado"""
+        self.margem = margem
+        # Registros recorrentes com vigência válida (id do registro -> registro)
+        self.registros = {}
+        # Ordinal do mês -> {id do registro: ocorrência}
+        self.meses = {}
+        # Primeiro e último mês materializados (None enquanto nenhum mês foi consultado)
+        self.inicio = None
+        self.fim = None
+
+    def reconstruir(self, registros):
+        """Reconstrói a tabela a partir de todos os registros; os meses voltam a ser materializados sob demanda"""
+        self.registros = {}
+        self.meses = {}
+        self.inicio = None
+        self.fim = None
+        for registro in registros:
+            self.adicionar(registro)
+
+    def adicionar(self, registro):
+        """Inclui um registro recorrente, materializando suas ocorrências nos meses do horizonte"""
+        if vigencia_ativa(registro) is None:
+            return
+        self.registros[id(registro)] = registro
+        if self.inicio is not None:
+            self._materializar(registro, self.inicio, self.fim)
+
+    def remover(self, registro):
+        """Retira um registro e suas ocorrências"""
+        if self.registros.pop(id(registro), None) is None or self.inicio is None:
+            return
+        for ordinal in self._meses_ativos(registro, self.inicio, self.fim):
+            self.meses[ordinal].pop(id(registro), None)
+
+    def obter(self, ordinal):
+        """Retorna as ocorrências de um mês, estendendo o horizonte se ele ainda não tiver sido materializado"""
+        if self.inicio is not None and not self.inicio - DISTANCIA_MAXIMA <= ordinal <= self.fim + DISTANCIA_MAXIMA:
+            # Um mês muito distante não materializa todos os meses até ele
+            return [
+                criar_ocorrencia(registro, ordinal) for registro in self.registros.values()
+                if self._meses_ativos(registro, ordinal, ordinal)
+            ]
+        self._estender(ordinal)
+        return list(self.meses[ordinal].values())
+
+    def _estender(self, ordinal):
+        """Materializa os meses que faltam entre o horizonte atual e o mês consultado, com uma margem"""
+        if self.inicio is None:
+            inicio, fim = ordinal - self.margem, ordinal + self.margem
+        elif ordinal < self.inicio:
+            inicio, fim = ordinal - self.margem, self.inicio - 1
+        elif ordinal > self.fim:
+            inicio, fim = self.fim + 1, ordinal + self.margem
+        else:
+            return
+
+        for mes in range(inicio, fim + 1):
+            self.meses[mes] = {}
+        for registro in self.registros.values():
+            self._materializar(registro, inicio, fim)
+        self.inicio = inicio if self.inicio is None else min(self.inicio, inicio)
+        self.fim = fim if self.fim is None else max(self.fim, fim)
+
+    def _meses_ativos(self, registro, inicio, fim):
+        """Retorna os meses entre inicio e fim em que o registro está vigente"""
+        vigencia_inicio, vigencia_fim = vigencia_ativa(registro)
+        if vigencia_fim is not None:
+            fim = min(fim, vigencia_fim)
+        return range(max(inicio, vigencia_inicio), fim + 1)
+
+    def _materializar(self, registro, inicio, fim):
+        """Cria as ocorrências de um registro nos meses entre inicio e fim"""
+        chave = id(registro)
+        for ordinal in self._meses_ativos(registro, inicio, fim):
+            self.meses[ordinal][chave] = criar_ocorrencia(registro, ordinal)
@@ -0,0 +1,248 @@
+"""
+Módulo com os registros tipados (gastos, receitas e contas fixas) mantidos em memória pelo gerenciador de dados
+"""
+import datetime
+from functools import lru_cache
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Formas (sequência de chaves) já vistas; registros com as mesmas chaves compartilham a mesma tupla
+_formas = {}
+
+def compartilhar_forma(chaves):
+    """Retorna a tupla de chaves compartilhada equivalente a `chaves`"""
+    return _formas.setdefault(chaves, chaves)
+
+def para_centavos(valor):
+    """Converte um valor (número ou texto como "189.90") em centavos inteiros; valores inválidos valem 0"""
+    try:
+        return int((Decimal(str(valor)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError, TypeError):
+        return 0
+
+def para_reais(centavos):
+    """Converte centavos inteiros no valor em reais"""
+    return centavos / 100
+
+def ordinal_data(data):
+    """Converte uma data DD/MM/AAAA no ordinal do dia (date.toordinal) ou None se ela for inválida"""
+    try:
+        dia, mes, ano = data.split('/')
+        return datetime.date(int(ano), int(mes), int(dia)).toordinal()
+    except (AttributeError, ValueError):
+        return None
+
+@lru_cache(maxsize=None)
+def periodo_do_dia(dia):
+    """Retorna o (ano, mes) do ordinal de um dia; a mesma tupla é reaproveitada para todos os dias do mês"""
+    if dia is None:
+        return None
+    data = datetime.date.fromordinal(dia)
+    return _periodo(data.year, data.month)
+
+@lru_cache(maxsize=None)
+def _periodo(ano, mes):
+    """Retorna a tupla (ano, mes) compartilhada"""
+    return (ano, mes)
+
+def periodo_data(data):
+    """Retorna o (ano, mes) de uma data DD/MM/AAAA ou None se ela for inválida"""
+    return periodo_do_dia(ordinal_data(data))
+
+def periodo_chave_pagamento(chave):
+    """Converte a chave "MM/AAAA" do histórico de pagamentos em (ano, mes), apenas se ela estiver no formato exato"""
+    try:
+        mes, ano = (int(parte) for parte in chave.split('/'))
+    except (AttributeError, ValueError):
+        return None
+    if f"{mes:02d}/{ano}" != chave or not 1 <= mes <= 12:
+        return None
+    return (ano, mes)
+
+def vigencia_ativa(registro):
+    """Retorna a vigência (inicio, fim) de um registro recorrente ativo em algum mês, senão None"""
+    vigencia = registro.vigencia
+    if vigencia is None:
+        return None
+    inicio, fim = vigencia
+    if fim is not None and fim < inicio:
+        # Intervalo invertido nunca está ativo (como no índice de intervalos)
+        return None
+    return vigencia
+
+def definir_em_lote(registros, campo, valores):
+    """Atribui a cada registro o valor correspondente de um campo guardado em slot"""
+    for registro, valor in zip(registros, valores):
+        setattr(registro, campo, valor)
+
+def ordinal_mes(dia):
+    """Converte o ordinal de um dia no ordinal do mês (ano * 12 + mês)"""
+    if dia is None:
+        return None
+    data = datetime.date.fromordinal(dia)
+    return data.year * 12 + data.month
+
+class Registro:
+    """Base dos registros: os campos conhecidos ficam em slots e os demais em um dicionário à parte"""
+
+    __slots__ = ('forma', 'extras', 'id', 'descricao', 'valor', 'centavos')
+
+    # Chaves do dicionário guardadas diretamente nos slots
+    CAMPOS = ('id', 'descricao', 'valor')
+
+    # Slots derivados que não são guardados no snapshot binário, e sim recalculados por `restaurar`
+    RECALCULADOS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        """Prepara o conjunto de campos de cada tipo de registro"""
+        super().__init_subclass__(**kwargs)
+        cls._campos = frozenset(cls.CAMPOS)
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Cria o registro a partir do dicionário usado pelas telas e pelo armazenamento"""
+        registro = cls.__new__(cls)
+        for campo in cls.CAMPOS:
+            setattr(registro, campo, dados.get(campo))
+
+        extras = {chave: valor for chave, valor in dados.items() if chave not in cls._campos}
+        registro.extras = extras or None
+        registro.forma = compartilhar_forma(tuple(dados))
+        registro._preparar()
+        return registro
+
+    def _preparar(self):
+        """Calcula os campos derivados (centavos e ordinais de datas)"""
+        self.centavos = para_centavos(self.valor)
+
+    @classmethod
+    def restaurar(cls, registros):
+        """Recalcula, para registros lidos do snapshot binário, os slots listados em RECALCULADOS"""
+        pass
+
+    def para_dict(self):
+        """Retorna o registro como dicionário, com as chaves na ordem original"""
+        campos = self._campos
+        extras = self.extras
+        return {
+            chave: getattr(self, chave) if chave in campos else extras[chave]
+            for chave in self.forma
+        }
+
+    def obter(self, chave, padrao=None):
+        """Retorna um campo como o `get` do dicionário do registro, sem montá-lo"""
+        if chave not in self.forma:
+            return padrao
+        return getattr(self, chave) if chave in self._campos else self.extras[chave]
+
+    def definir(self, campo, valor):
+        """Altera (ou inclui) um campo guardado em slot"""
+        setattr(self, campo, valor)
+        if campo not in self.forma:
+            self.forma = compartilhar_forma(self.forma + (campo,))
+
+    @property
+    def periodo(self):
+        """Retorna o (ano, mes) do registro pontual ou None"""
+        return None
+
+    @property
+    def vigencia(self):
+        """Retorna o intervalo (inicio, fim) em ordinais de mês do registro recorrente ou None"""
+        return None
+
+class Gasto(Registro):
+    """Gasto com valor em centavos e data convertida em ordinal"""
+
+    # O período (ano, mes) fica em um slot, calculado junto com o ordinal da data
+    __slots__ = ('categoria', 'data', 'dia', 'periodo')
+
+    CAMPOS = Registro.CAMPOS + ('categoria', 'data')
+
+    RECALCULADOS = ('periodo',)
+
+    def _preparar(self):
+        """Calcula os centavos, o ordinal da data e o período"""
+        self.centavos = para_centavos(self.valor)
+        self.dia = ordinal_data(self.data)
+        self.periodo = periodo_do_dia(self.dia)
+
+    @classmethod
+    def restaurar(cls, registros):
+        """Recalcula o período dos gastos a partir do ordinal da data"""
+        definir_em_lote(registros, 'periodo', [periodo_do_dia(registro.dia) for registro in registros])
+
+class _Recorrente(Registro):
+    """Base das receitas e contas que podem se repetir entre uma data de início e uma de fim"""
+
+    __slots__ = ('recorrente', 'data_inicio', 'data_fim', 'inicio', 'fim')
+
+    CAMPOS = Registro.CAMPOS + ('recorrente', 'data_inicio', 'data_fim')
+
+    def _preparar(self):
+        """Calcula os centavos e os ordinais de mês da vigência"""
+        self.centavos = para_centavos(self.valor)
+        if self.recorrente:
+            self.inicio = ordinal_mes(ordinal_data(self.data_inicio))
+            # Sem data de fim (ou com uma data inválida), o item continua ativo indefinidamente
+            self.fim = ordinal_mes(ordinal_data(self.data_fim)) if self.data_fim else None
+        else:
+            self.inicio = None
+            self.fim = None
+
+    @property
+    def vigencia(self):
+        """Retorna o intervalo (inicio, fim) em ordinais de mês ou None se não for recorrente"""
+        if not self.recorrente or self.inicio is None:
+            return None
+        return (self.inicio, self.fim)
+
+class Receita(_Recorrente):
+    """Receita pontual (com data) ou recorrente (com vigência)"""
+
+    # O período (ano, mes) de uma receita não recorrente fica em um slot
+    __slots__ = ('data', 'dia', 'periodo')
+
+    CAMPOS = _Recorrente.CAMPOS + ('data',)
+
+    RECALCULADOS = ('periodo',)
+
+    def _preparar(self):
+        """Calcula os centavos, a vigência, o ordinal da data e o período"""
+        super()._preparar()
+        self.dia = ordinal_data(self.data)
+        self.periodo = None if self.recorrente else periodo_do_dia(self.dia)
+
+    @classmethod
+    def restaurar(cls, registros):
+        """Recalcula o período das receitas não recorrentes a partir do ordinal da data"""
+        definir_em_lote(registros, 'periodo', [
+            None if registro.recorrente else periodo_do_dia(registro.dia) for registro in registros
+        ])
+
+class ContaFixa(_Recorrente):
+    """Conta fixa de um mês/ano específico ou recorrente (opcionalmente parcelada)"""
+
+    __slots__ = ('mes', 'ano', 'parcelado', 'num_parcelas', 'valor_com_juros', 'centavos_com_juros',
+                 'historico_pagamentos')
+
+    CAMPOS = _Recorrente.CAMPOS + ('mes', 'ano', 'parcelado', 'num_parcelas', 'valor_com_juros',
+                                   'historico_pagamentos')
+
+    def _preparar(self):
+        """Calcula os centavos (com e sem juros) e a vigência"""
+        super()._preparar()
+        self.centavos_com_juros = para_centavos(self.valor_com_juros) if self.valor_com_juros else None
+
+    @property
+    def periodo(self):
+        """Retorna o (ano, mes) de uma conta fixa não recorrente"""
+        if self.recorrente or self.mes is None or self.ano is None:
+            return None
+        return (self.ano, self.mes)
+
+# Tipo de registro de cada coleção
+TIPOS_POR_COLECAO = {
+    'gastos': Gasto,
+    'receitas': Receita,
+    'contas_fixas': ContaFixa
+}
@@ -0,0 +1,261 @@
+"""
+Módulo com o resumo mensal (totais por mês) mantido pelo gerenciador de dados a cada alteração
+"""
+import os
+import json
+from bisect import bisect_right
+
+from models.parcelamento import parcelamento_da_conta
+from models.registros import periodo_chave_pagamento, vigencia_ativa
+
+# Versão do formato do arquivo em que o resumo é persistido
+VERSAO_FORMATO = 2
+
+# Quantidade de valores guardados por mês e por variação de cada coleção:
+# gastos: [total, quantidade]; receitas: [total]; contas fixas: [total, quantidade, pagas] por mês e [total, quantidade]
+# por variação (as contas pagas no mês incluem as recorrentes, cujo total e quantidade vêm das variações)
+_CAMPOS_MES = {'gastos': 2, 'receitas': 1, 'contas_fixas': 3}
+_CAMPOS_VARIACAO = {'gastos': 0, 'receitas': 1, 'contas_fixas': 2}
+
+def normalizar_versao(versao):
+    """Converte a versão dos arquivos para a forma em que ela é gravada em JSON (tuplas viram listas)"""
+    return json.loads(json.dumps(versao))
+
+class _Variacoes:
+    """Soma de valores que valem em um intervalo de meses, guardada como variações nos meses de início e fim"""
+
+    def __init__(self, campos):
+        """Inicializa as variações com a quantidade de valores de cada uma"""
+        self.campos = campos
+        self.deltas = {}
+        self._acumulados = None
+
+    def somar(self, inicio, fim, valores):
+        """Soma os valores a todos os meses (ordinais) entre inicio e fim; sem fim, até o último mês"""
+        self._variar(inicio, valores, 1)
+        if fim is not None:
+            self._variar(fim + 1, valores, -1)
+
+    def _variar(self, ordinal, valores, sinal):
+        """Acumula uma variação em um mês, descartando-a quando ela se anula"""
+        delta = self.deltas.setdefault(ordinal, [0] * self.campos)
+        for posicao, valor in enumerate(valores):
+            delta[posicao] += sinal * valor
+        if not any(delta):
+            del self.deltas[ordinal]
+        self._acumulados = None
+
+    def no_mes(self, ordinal):
+        """Retorna a soma dos valores em vigor em um mês, com uma busca binária nas somas acumuladas"""
+        # As somas acumuladas são refeitas apenas na primeira consulta após uma alteração
+        if self._acumulados is None:
+            ordinais = sorted(self.deltas)
+            somas = []
+            atual = [0] * self.campos
+            for mes in ordinais:
+                atual = [soma + delta for soma, delta in zip(atual, self.deltas[mes])]
+                somas.append(atual)
+            self._acumulados = (ordinais, somas)
+
+        ordinais, somas = self._acumulados
+        posicao = bisect_right(ordinais, ordinal)
+        return somas[posicao - 1] if posicao else [0] * self.campos
+
+class ResumoMensal:
+    """Totais em centavos de cada mês e de cada coleção, atualizados por deltas a cada alteração dos registros"""
+
+    def __init__(self):
+        """Inicializa o resumo vazio"""
+        # Versão dos arquivos de cada coleção a que o resumo corresponde (quando foi lido de um arquivo)
+        self.versoes = {}
+        self.meses = {}
+        self.variacoes = {}
+        self.categorias = {}
+        for nome in _CAMPOS_MES:
+            self.limpar(nome)
+
+    def limpar(self, nome):
+        """Descarta os totais de uma coleção"""
+        # (ano, mes) -> valores dos registros pontuais (e das contas pagas) no mês
+        self.meses[nome] = {}
+        self.variacoes[nome] = _Variacoes(_CAMPOS_VARIACAO[nome])
+        if nome == 'gastos':
+            # (ano, mes) -> {categoria: [centavos, quantidade]}
+            self.categorias = {}
+        self.versoes[nome] = None
+
+    def reconstruir(self, nome, registros):
+        """Refaz os totais de uma coleção a partir de todos os seus registros"""
+        self.limpar(nome)
+        for registro in registros:
+            self.adicionar(nome, registro)
+
+    def adicionar(self, nome, registro):
+        """Soma a contribuição de um registro aos totais"""
+        self._aplicar(nome, registro, 1)
+
+    def remover(self, nome, registro):
+        """Subtrai a contribuição de um registro dos totais"""
+        self._aplicar(nome, registro, -1)
+
+    def _somar_mes(self, nome, periodo, valores):
+        """Soma valores aos totais de um mês, descartando o mês quando ele fica zerado"""
+        totais = self.meses[nome].setdefault(periodo, [0] * _CAMPOS_MES[nome])
+        for posicao, valor in enumerate(valores):
+            totais[posicao] += valor
+        if not any(totais):
+            del self.meses[nome][periodo]
+
+    def _aplicar(self, nome, registro, sinal):
+        """Soma (sinal 1) ou subtrai (sinal -1) a contribuição de um registro"""
+        # Alterados em memória, os totais deixam de corresponder à versão gravada da coleção
+        self.versoes[nome] = None
+        if nome == 'gastos':
+            self._aplicar_gasto(registro, sinal)
+        elif nome == 'receitas':
+            self._aplicar_receita(registro, sinal)
+        else:
+            self._aplicar_conta(registro, sinal)
+
+    def _aplicar_gasto(self, gasto, sinal):
+        """Atualiza o total, a quantidade e a soma por categoria do mês do gasto"""
+        periodo = gasto.periodo
+        if periodo is None:
+            return
+
+        self._somar_mes('gastos', periodo, (sinal * gasto.centavos, sinal))
+        categorias = self.categorias.setdefault(periodo, {})
+        soma = categorias.setdefault(gasto.categoria, [0, 0])
+        soma[0] += sinal * gasto.centavos
+        soma[1] += sinal
+        if not soma[1]:
+            del categorias[gasto.categoria]
+            if not categorias:
+                del self.categorias[periodo]
+
+    def _aplicar_receita(self, receita, sinal):
+        """Atualiza o total do mês da receita ou, se for recorrente, de todos os meses da vigência"""
+        intervalo = vigencia_ativa(receita)
+        if intervalo is not None:
+            self.variacoes['receitas'].somar(*intervalo, (sinal * receita.centavos,))
+        elif receita.periodo is not None:
+            self._somar_mes('receitas', receita.periodo, (sinal * receita.centavos,))
+
+    def _aplicar_conta(self, conta, sinal):
+        """Atualiza total, quantidade e contas pagas do mês da conta ou, se for recorrente, da vigência"""
+        # Uma conta parcelada soma em cada mês apenas a parcela cobrada (com juros), como nas ocorrências
+        parcelamento = parcelamento_da_conta(conta)
+        intervalo = vigencia_ativa(conta)
+        if intervalo is not None:
+            if parcelamento is None:
+                self.variacoes['contas_fixas'].somar(*intervalo, (sinal * conta.centavos, sinal))
+            else:
+                self.variacoes['contas_fixas'].somar(*intervalo, (0, sinal))
+                self._somar_parcelas(parcelamento, intervalo, sinal)
+
+            # Cada pagamento registrado em um mês da vigência conta como conta paga naquele mês
+            inicio, fim = intervalo
+            for chave in conta.historico_pagamentos or ():
+                periodo = periodo_chave_pagamento(chave)
+                if periodo is None:
+                    continue
+                ordinal = periodo[0] * 12 + periodo[1]
+                if inicio <= ordinal and (fim is None or ordinal <= fim):
+                    self._somar_mes('contas_fixas', periodo, (0, 0, sinal))
+        elif conta.periodo is not None:
+            # Uma conta não recorrente é exibida como paga apenas pelo campo "pago" do próprio registro
+            paga = 1 if (conta.extras or {}).get('pago') else 0
+            ano, mes = conta.periodo
+            centavos = conta.centavos
+            if parcelamento is not None:
+                # Um mês/ano que não é numérico nunca é consultado; a parcela só é calculada nos válidos
+                numerico = type(ano) is int and type(mes) is int
+                centavos = parcelamento.valor_no_mes(ano * 12 + mes) if numerico else parcelamento.valor()
+            self._somar_mes('contas_fixas', conta.periodo, (sinal * centavos, sinal, sinal * paga))
+
+    def _somar_parcelas(self, parcelamento, intervalo, sinal):
+        """Soma às variações as parcelas cobradas nos meses da vigência (o centavo do resto vai nas primeiras)"""
+        inicio, fim = intervalo
+        if parcelamento.inicio is None:
+            # Sem início conhecido, todo mês da vigência cobra uma parcela
+            self.variacoes['contas_fixas'].somar(inicio, fim, (sinal * parcelamento.valor(), 0))
+            return
+
+        primeira = max(inicio, parcelamento.inicio)
+        ultima = parcelamento.fim if fim is None else min(fim, parcelamento.fim)
+        if primeira > ultima:
+            return
+        self.variacoes['contas_fixas'].somar(primeira, ultima, (sinal * parcelamento.valor_parcela, 0))
+        ultima_com_resto = min(ultima, parcelamento.inicio + parcelamento.resto - 1)
+        if primeira <= ultima_com_resto:
+            self.variacoes['contas_fixas'].somar(primeira, ultima_com_resto, (sinal, 0))
+
+    def gastos_do_mes(self, mes, ano):
+        """Retorna (total em centavos, {categoria: centavos}) dos gastos de um mês"""
+        total, _ = self.meses['gastos'].get((ano, mes), (0, 0))
+        categorias = self.categorias.get((ano, mes), {})
+        return total, {categoria: soma[0] for categoria, soma in categorias.items()}
+
+    def receitas_do_mes(self, mes, ano):
+        """Retorna o total em centavos das receitas de um mês, incluindo as recorrentes"""
+        (pontuais,) = self.meses['receitas'].get((ano, mes), (0,))
+        (recorrentes,) = self.variacoes['receitas'].no_mes(ano * 12 + mes)
+        return pontuais + recorrentes
+
+    def contas_do_mes(self, mes, ano):
+        """Retorna (total em centavos, pagas, pendentes) das contas fixas de um mês, incluindo as recorrentes"""
+        total, quantidade, pagas = self.meses['contas_fixas'].get((ano, mes), (0, 0, 0))
+        total_recorrentes, quantidade_recorrentes = self.variacoes['contas_fixas'].no_mes(ano * 12 + mes)
+        quantidade += quantidade_recorrentes
+        return total + total_recorrentes, pagas, quantidade - pagas
+
+    def versao_valida(self, nome, versao):
+        """Indica se os totais de uma coleção correspondem à versão atual dos seus arquivos"""
+        return self.versoes.get(nome) is not None and self.versoes[nome] == normalizar_versao(versao)
+
+def gravar_resumo(caminho, resumo):
+    """Grava o resumo e a versão dos arquivos de cada coleção em um arquivo JSON"""
+    colecoes = {}
+    for nome in _CAMPOS_MES:
+        colecoes[nome] = {
+            'versao': resumo.versoes.get(nome),
+            'meses': [[ano, mes, *valores] for (ano, mes), valores in resumo.meses[nome].items()],
+            'variacoes': [[ordinal, *delta] for ordinal, delta in resumo.variacoes[nome].deltas.items()]
+        }
+    # As categorias vão como listas, para que uma categoria ausente (None) não vire o texto "null"
+    colecoes['gastos']['categorias'] = [
+        [ano, mes, [[categoria, *soma] for categoria, soma in categorias.items()]]
+        for (ano, mes), categorias in resumo.categorias.items()
+    ]
+
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'versao_formato': VERSAO_FORMATO, 'colecoes': colecoes}, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+def carregar_resumo(caminho):
+    """Lê o resumo gravado; se o arquivo não existir ou for inválido, retorna um resumo vazio (sem versões)"""
+    resumo = ResumoMensal()
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        if dados.get('versao_formato') != VERSAO_FORMATO:
+            return resumo
+
+        for nome, colecao in dados['colecoes'].items():
+            if nome not in _CAMPOS_MES:
+                continue
+            meses = {(linha[0], linha[1]): list(linha[2:]) for linha in colecao['meses']}
+            variacoes = _Variacoes(_CAMPOS_VARIACAO[nome])
+            variacoes.deltas = {linha[0]: list(linha[1:]) for linha in colecao['variacoes']}
+            if nome == 'gastos':
+                resumo.categorias = {
+                    (linha[0], linha[1]): {soma[0]: list(soma[1:]) for soma in linha[2]}
+                    for linha in colecao['categorias']
+                }
+            resumo.meses[nome] = meses
+            resumo.variacoes[nome] = variacoes
+            resumo.versoes[nome] = colecao['versao']
+    except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return ResumoMensal()
+    return resumo
@@ -0,0 +1,254 @@
+"""
+Módulo do snapshot binário das coleções, usado para acelerar a carga dos dados na inicialização
+"""
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+from array import array
+
+from models.registros import compartilhar_forma, definir_em_lote
+
+# Identificação e versão do formato do arquivo
+MARCA = b'CGSB'
+VERSAO_FORMATO = 3
+
+# Cabeçalho: marca, versão do formato, ordem dos bytes (0 = little, 1 = big), crc32 e tamanho do corpo,
+# completado até 24 bytes para que os blocos do corpo fiquem alinhados em 8 bytes também no arquivo
+_CABECALHO = struct.Struct('<4sHBxIQ4x')
+
+# Ordem dos bytes desta máquina; um snapshot gravado em outra ordem é descartado
+_ORDEM_LOCAL = 0 if sys.byteorder == 'little' else 1
+
+# Tipo de cada valor das colunas; reais guardam os bits do double e textos e estruturas JSON a posição na tabela de textos
+_NULO, _LOGICO, _INTEIRO, _REAL, _TEXTO, _JSON = range(6)
+
+# Limites de um inteiro guardado diretamente na coluna (int64)
+_MENOR_INTEIRO = -2 ** 63
+_MAIOR_INTEIRO = 2 ** 63 - 1
+
+# Conversão dos bits de um double para o int64 guardado na coluna
+_DOUBLE = struct.Struct('<d')
+_INT64 = struct.Struct('<q')
+
+def _colunas(tipo):
+    """Retorna os slots de um tipo de registro que são guardados no snapshot"""
+    slots = [nome for classe in reversed(tipo.__mro__) for nome in classe.__dict__.get('__slots__', ())]
+    return [nome for nome in slots if nome not in tipo.RECALCULADOS]
+
+def _alinhar(tamanho):
+    """Arredonda um tamanho para o próximo múltiplo de 8 bytes"""
+    return (tamanho + 7) & ~7
+
+def _preencher(partes, tamanho):
+    """Acrescenta bytes nulos para que o próximo bloco comece alinhado em 8 bytes"""
+    if _alinhar(tamanho) != tamanho:
+        partes.append(bytes(_alinhar(tamanho) - tamanho))
+
+class _TabelaTextos:
+    """Tabela de textos sem repetição, montada durante a gravação"""
+
+    def __init__(self):
+        """Inicializa a tabela vazia"""
+        self.posicoes = {}
+
+    def codigo(self, texto):
+        """Retorna a posição de um texto na tabela, incluindo-o se necessário"""
+        posicao = self.posicoes.get(texto)
+        if posicao is None:
+            posicao = self.posicoes[texto] = len(self.posicoes)
+        return posicao
+
+    def codificar(self, valor):
+        """Retorna o par (tipo, valor int64) que representa um valor de um slot"""
+        if valor is None:
+            return _NULO, 0
+        if valor is True or valor is False:
+            return _LOGICO, int(valor)
+        if type(valor) is int and _MENOR_INTEIRO <= valor <= _MAIOR_INTEIRO:
+            return _INTEIRO, valor
+        if type(valor) is float:
+            return _REAL, _INT64.unpack(_DOUBLE.pack(valor))[0]
+        if type(valor) is str:
+            return _TEXTO, self.codigo(valor)
+        # Dicionários, listas e inteiros muito grandes
+        return _JSON, self.codigo(json.dumps(valor, ensure_ascii=False))
+
+def gravar_snapshot(caminho, tipo, registros, versao):
+    """Grava os registros tipados de uma coleção no snapshot, associado à versão atual dos arquivos"""
+    registros = list(registros)
+    colunas = _colunas(tipo)
+    textos = _TabelaTextos()
+    formas = {}
+
+    # Cada coluna é um array com o tipo de cada valor seguido de um array int64 com os valores
+    blocos_colunas = []
+    for nome in colunas:
+        tipos = array('B')
+        valores = array('q')
+        for registro in registros:
+            valor = getattr(registro, nome)
+            if nome == 'forma':
+                tipos.append(_INTEIRO)
+                valores.append(formas.setdefault(valor, len(formas)))
+            else:
+                codigo_tipo, valor = textos.codificar(valor)
+                tipos.append(codigo_tipo)
+                valores.append(valor)
+        blocos_colunas.append((tipos, valores))
+
+    # Tabela de textos: posições (em caracteres) de cada texto dentro de um único bloco UTF-8
+    lista_textos = list(textos.posicoes)
+    deslocamentos = array('q', [0])
+    for texto in lista_textos:
+        deslocamentos.append(deslocamentos[-1] + len(texto))
+    bloco_textos = ''.join(lista_textos).encode('utf-8')
+
+    metadados = json.dumps({
+        'tipo': tipo.__name__,
+        'versao': versao,
+        'quantidade': len(registros),
+        'colunas': colunas,
+        'formas': [list(forma) for forma in formas],
+        'textos': len(lista_textos),
+        'bytes_textos': len(bloco_textos)
+    }, ensure_ascii=False).encode('utf-8')
+
+    partes = [struct.pack('<I', len(metadados)), metadados]
+    _preencher(partes, 4 + len(metadados))
+    partes.append(deslocamentos.tobytes())
+    partes.append(bloco_textos)
+    _preencher(partes, len(bloco_textos))
+    for tipos, valores in blocos_colunas:
+        partes.append(tipos.tobytes())
+        _preencher(partes, len(tipos))
+        partes.append(valores.tobytes())
+
+    corpo = b''.join(partes)
+    cabecalho = _CABECALHO.pack(MARCA, VERSAO_FORMATO, _ORDEM_LOCAL, zlib.crc32(corpo), len(corpo))
+
+    # Arquivo temporário movido para o lugar, para que o snapshot nunca fique pela metade
+    temporario = caminho + ".tmp"
+    with open(temporario, 'wb') as f:
+        f.write(cabecalho)
+        f.write(corpo)
+    os.replace(temporario, caminho)
+
+def carregar_snapshot(caminho, tipo, versao):
+    """Carrega os registros do snapshot ou retorna None se ele não existir, estiver corrompido ou desatualizado"""
+    try:
+        with open(caminho, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                return _ler(mapa, tipo, versao)
+    except (OSError, ValueError, KeyError, IndexError, TypeError, OverflowError, struct.error):
+        # Inclui arquivo vazio, JSON e UTF-8 inválidos (ValueError), blocos truncados e valores fora do esperado
+        # (datas fora do calendário, por exemplo); em todos os casos a carga volta ao JSON
+        return None
+
+def _lista(visao, posicao, formato, quantidade):
+    """Lê `quantidade` valores no formato do módulo array a partir de `posicao`; retorna a lista e a nova posição"""
+    tamanho = quantidade * struct.calcsize(formato)
+    if posicao + tamanho > len(visao):
+        raise ValueError("Snapshot truncado")
+    with visao[posicao:posicao + tamanho] as parte, parte.cast(formato) as valores:
+        return valores.tolist(), posicao + tamanho
+
+def _ler(mapa, tipo, versao):
+    """Interpreta o conteúdo do snapshot mapeado em memória"""
+    if len(mapa) < _CABECALHO.size:
+        return None
+    marca, versao_formato, ordem, crc, tamanho = _CABECALHO.unpack_from(mapa, 0)
+    if marca != MARCA or versao_formato != VERSAO_FORMATO or ordem != _ORDEM_LOCAL:
+        return None
+    if len(mapa) != _CABECALHO.size + tamanho:
+        return None
+
+    with memoryview(mapa) as visao:
+        with visao[_CABECALHO.size:] as corpo:
+            if zlib.crc32(corpo) != crc:
+                return None
+
+        posicao = _CABECALHO.size
+        (tamanho_metadados,) = struct.unpack_from('<I', mapa, posicao)
+        metadados = json.loads(mapa[posicao + 4:posicao + 4 + tamanho_metadados].decode('utf-8'))
+        posicao += _alinhar(4 + tamanho_metadados)
+
+        # A versão gravada passa por JSON; a atual é comparada da mesma forma (tuplas viram listas)
+        if (metadados['tipo'] != tipo.__name__ or metadados['colunas'] != _colunas(tipo)
+                or metadados['versao'] != json.loads(json.dumps(versao))):
+            return None
+
+        quantidade = metadados['quantidade']
+        deslocamentos, posicao = _lista(visao, posicao, 'q', metadados['textos'] + 1)
+        bloco_textos = mapa[posicao:posicao + metadados['bytes_textos']].decode('utf-8')
+        posicao += _alinhar(metadados['bytes_textos'])
+        textos = [bloco_textos[inicio:fim] for inicio, fim in zip(deslocamentos, deslocamentos[1:])]
+        formas = [compartilhar_forma(tuple(forma)) for forma in metadados['formas']]
+
+        # Os registros são criados vazios e preenchidos coluna a coluna
+        registros = [tipo.__new__(tipo) for _ in range(quantidade)]
+        for nome in metadados['colunas']:
+            tipos, posicao = _lista(visao, posicao, 'B', quantidade)
+            posicao = _alinhar(posicao)
+            inicio_valores = posicao
+            valores, posicao = _lista(visao, posicao, 'q', quantidade)
+
+            if nome == 'forma':
+                valores = [formas[valor] for valor in valores]
+            else:
+                # Os mesmos 8 bytes lidos como double, só quando a coluna possui números reais
+                reais = _lista(visao, inicio_valores, 'd', quantidade)[0] if _REAL in tipos else valores
+                valores = _decodificar(tipos, valores, reais, textos)
+            definir_em_lote(registros, nome, valores)
+
+    tipo.restaurar(registros)
+    return registros
+
+def _valor(tipo, valor, real, textos):
+    """Converte um único valor de uma coluna de volta para objeto Python"""
+    if tipo == _NULO:
+        return None
+    if tipo == _LOGICO:
+        return bool(valor)
+    if tipo == _INTEIRO:
+        return valor
+    if tipo == _REAL:
+        return real
+    if tipo == _TEXTO:
+        return textos[valor]
+    # Estruturas JSON são decodificadas uma vez por registro, para que cada um tenha sua própria cópia
+    return json.loads(textos[valor])
+
+def _decodificar(tipos, valores, reais, textos):
+    """Converte os valores de uma coluna de volta para objetos Python"""
+    quantidade = len(tipos)
+
+    # A coluna é convertida de uma vez pelo tipo predominante e só as exceções são tratadas uma a uma
+    contagens = {tipo: tipos.count(tipo) for tipo in set(tipos)}
+    predominante = max(contagens, key=contagens.get) if contagens else _NULO
+    excecoes = []
+    if len(contagens) > 1:
+        excecoes = [posicao for posicao, tipo in enumerate(tipos) if tipo != predominante]
+    if predominante == _TEXTO and excecoes:
+        # As posições das exceções não apontam necessariamente para a tabela de textos
+        valores_textos = list(valores)
+        for posicao in excecoes:
+            valores_textos[posicao] = 0
+        resultado = [textos[valor] for valor in valores_textos]
+    elif predominante == _TEXTO:
+        resultado = [textos[valor] for valor in valores]
+    elif predominante == _INTEIRO:
+        resultado = valores
+    elif predominante == _REAL:
+        resultado = reais
+    elif predominante == _NULO:
+        resultado = [None] * quantidade
+    else:
+        resultado = [_valor(tipo, valor, real, textos) for tipo, valor, real in zip(tipos, valores, reais)]
+        excecoes = []
+
+    for posicao in excecoes:
+        resultado[posicao] = _valor(tipos[posicao], valores[posicao], reais[posicao], textos)
+    return resultado
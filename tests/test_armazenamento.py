@@ -0,0 +1,116 @@
+"""
+Testes do armazenamento em arquivos JSON e da leitura dos gastos em blocos
+"""
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from models.armazenamento import TAMANHO_BLOCO, iterar_json
+from models.data_manager import DataManager
+
+class TestIterarJson(unittest.TestCase):
+    """A leitura em blocos devolve os mesmos itens do json.load, inclusive os que atravessam o fim de um bloco"""
+
+    def setUp(self):
+        """Cria o diretório temporário e o gerador de itens"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.arquivo = os.path.join(self.diretorio.name, "dados_gastos.json")
+        self.aleatorio = random.Random(11)
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def gravar(self, itens):
+        """Grava a lista e retorna o texto gravado e a posição (inicio, fim) de cada item"""
+        partes, posicoes, posicao = ['[\n  '], [], 2
+        for indice, item in enumerate(itens):
+            texto = json.dumps(item, ensure_ascii=False)
+            separador = ',\n  ' if indice < len(itens) - 1 else '\n]'
+            posicoes.append((posicao + 2, posicao + 2 + len(texto)))
+            partes.append(texto + separador)
+            posicao += len(texto) + len(separador)
+        conteudo = ''.join(partes)
+        with open(self.arquivo, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        return conteudo, posicoes
+
+    def gerar(self, quantidade):
+        """Gera gastos com descrições acentuadas de tamanhos variados, valores em texto, inteiros e reais"""
+        return [
+            {
+                'descricao': "Açaí " * self.aleatorio.randint(1, 40), 'id': gasto_id,
+                'valor': self.aleatorio.choice(["189.90", 30, 12.5, 0.1]),
+                'categoria': 'Alimentação', 'data': f"{gasto_id % 28 + 1:02d}/03/2026"
+            }
+            for gasto_id in range(1, quantidade + 1)
+        ]
+
+    def test_varios_blocos(self):
+        """Um arquivo de vários blocos de 64 KB, com itens atravessando o fim de um bloco, é lido por inteiro"""
+        itens = self.gerar(2000)
+        # Um item maior que um bloco inteiro
+        itens[700]['observacao'] = "x" * (TAMANHO_BLOCO + 123)
+        conteudo, posicoes = self.gravar(itens)
+
+        self.assertGreater(len(conteudo), 3 * TAMANHO_BLOCO)
+        atravessam = [inicio for inicio, fim in posicoes if inicio // TAMANHO_BLOCO != (fim - 1) // TAMANHO_BLOCO]
+        self.assertGreaterEqual(len(atravessam), 3)
+
+        self.assertEqual(list(iterar_json(self.arquivo)), json.loads(conteudo))
+
+    def test_blocos_pequenos(self):
+        """Com blocos de qualquer tamanho, inclusive um número terminando no fim de um bloco, o resultado é o mesmo"""
+        itens = [1234, -5.75, "texto, com [colchetes]", {'a': [1, 2, {'b': None}]}, True, 10, 0.1] + self.gerar(5)
+        conteudo, _ = self.gravar(itens)
+        for tamanho_bloco in range(1, 60):
+            with self.subTest(tamanho_bloco=tamanho_bloco):
+                self.assertEqual(list(iterar_json(self.arquivo, tamanho_bloco)), itens)
+
+    def test_arquivo_truncado_ou_ausente(self):
+        """Um arquivo truncado é lido até o último item completo, e um arquivo ausente não tem itens"""
+        itens = self.gerar(300)
+        conteudo, posicoes = self.gravar(itens)
+        with open(self.arquivo, 'w', encoding='utf-8') as f:
+            f.write(conteudo[:posicoes[250][0] + 10])
+        self.assertEqual(list(iterar_json(self.arquivo, 4096)), itens[:250])
+        self.assertEqual(list(iterar_json(os.path.join(self.diretorio.name, "ausente.json"))), [])
+
+class TestGastosSemCache(unittest.TestCase):
+    """Sem a coleção em memória, os gastos do mês e o total são calculados lendo o arquivo, sem carregá-lo"""
+
+    def setUp(self):
+        """Grava gastos de vários meses com outro gerenciador, para que o testado não os tenha em memória"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        gravador = DataManager(data_dir=self.diretorio.name)
+        aleatorio = random.Random(2)
+        gravador.adicionar_gastos([
+            {
+                'descricao': 'Gasto', 'valor': aleatorio.choice(["189.90", 30, 12.5]), 'categoria': 'Lazer',
+                'data': f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/2026"
+            }
+            for _ in range(500)
+        ])
+        self.esperado = {
+            'total': gravador.calcular_total_gastos(),
+            'meses': [gravador.obter_gastos_por_periodo(mes, 2026) for mes in range(1, 13)]
+        }
+        self.data_manager = DataManager(data_dir=self.diretorio.name)
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def test_sem_carregar_a_colecao(self):
+        """Os resultados são os mesmos da coleção em memória, e a coleção continua sem ser carregada"""
+        with mock.patch.object(self.data_manager.armazenamento, 'carregar', side_effect=AssertionError("coleção carregada")):
+            self.assertEqual(self.data_manager.calcular_total_gastos(), self.esperado['total'])
+            self.assertEqual([self.data_manager.obter_gastos_por_periodo(mes, 2026) for mes in range(1, 13)],
+                             self.esperado['meses'])
+        self.assertNotIn('gastos', self.data_manager._cache)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Testes do armazenamento em JSON com journal de operações
+"""
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from models.armazenamento_journal import ArmazenamentoJournal
+
+class TestJournal(unittest.TestCase):
+    """Reaplicação do journal após uma interrupção, compactação em segundo plano e linha truncada"""
+
+    def setUp(self):
+        """Cria o snapshot inicial em um diretório temporário"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.arquivo = os.path.join(self.diretorio.name, "dados_contas_fixas.json")
+        self.esperado = [
+            {'descricao': f"Conta {i}", 'valor': 10.0 * i, 'recorrente': True, 'id': i} for i in range(1, 6)
+        ]
+        with open(self.arquivo, 'w', encoding='utf-8') as f:
+            json.dump(self.esperado, f)
+        self.proximo_id = 6
+        self.aleatorio = random.Random(7)
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def abrir(self, limite_operacoes=200):
+        """Abre o armazenamento sobre o snapshot do teste"""
+        return ArmazenamentoJournal({'contas_fixas': self.arquivo}, limite_operacoes)
+
+    def gerar_operacao(self):
+        """Gera uma operação aleatória e a aplica à lista esperada, mantida à parte"""
+        tipo = self.aleatorio.choice(('adicionar', 'atualizar', 'excluir', 'pagar') if self.esperado else ('adicionar',))
+        if tipo == 'adicionar':
+            registro = {'descricao': f"Conta {self.proximo_id}", 'valor': 1.0, 'recorrente': True, 'id': self.proximo_id}
+            self.proximo_id += 1
+            self.esperado.append(registro)
+            return {'op': 'adicionar', 'registro': dict(registro)}
+
+        posicao = self.aleatorio.randrange(len(self.esperado))
+        registro = self.esperado[posicao]
+        if tipo == 'atualizar':
+            registro = dict(registro, valor=self.aleatorio.randint(1, 999) / 10)
+            self.esperado[posicao] = registro
+            return {'op': 'atualizar', 'registro': dict(registro)}
+        if tipo == 'excluir':
+            del self.esperado[posicao]
+            return {'op': 'excluir', 'id': registro['id']}
+
+        chave = f"{self.aleatorio.randint(1, 12):02d}/2026"
+        pagamento = {'pago': True, 'data_pagamento': f"05/{chave}"}
+        registro.setdefault('historico_pagamentos', {})[chave] = pagamento
+        return {'op': 'pagar', 'id': registro['id'], 'chave': chave, 'pagamento': dict(pagamento)}
+
+    def registrar(self, armazenamento, quantidade):
+        """Grava uma operação por vez no journal"""
+        for _ in range(quantidade):
+            armazenamento.registrar('contas_fixas', [self.gerar_operacao()], None)
+
+    def conferir(self, armazenamento):
+        """Compara a coleção carregada e percorrida com a lista esperada"""
+        self.assertEqual(armazenamento.carregar('contas_fixas'), self.esperado)
+        self.assertEqual(list(armazenamento.iterar('contas_fixas')), self.esperado)
+
+    def test_journal_reaplicado_ao_reabrir(self):
+        """As operações que ficaram só no journal (sem fechar o aplicativo) são reaplicadas ao reabrir"""
+        self.registrar(self.abrir(), 50)
+        self.assertTrue(os.path.exists(self.arquivo + ".log"))
+        self.conferir(self.abrir())
+
+    def test_compactacao_a_cada_limite(self):
+        """A cada `limite_operacoes` operações o journal é incorporado ao snapshot em segundo plano"""
+        armazenamento = self.abrir(limite_operacoes=10)
+        for quantidade in (10, 10, 10, 5):
+            # Aguardando cada compactação, que não recomeça enquanto a anterior estiver em andamento
+            self.registrar(armazenamento, quantidade)
+            armazenamento.fechar()
+
+        # Restam no journal apenas as operações posteriores à última compactação
+        self.assertFalse(os.path.exists(self.arquivo + ".log.1"))
+        with open(self.arquivo + ".log", encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 5)
+        self.conferir(self.abrir())
+
+    def test_compactacao_interrompida(self):
+        """Um journal separado para compactação e não incorporado (processo encerrado) é reaplicado ao reabrir"""
+        self.registrar(self.abrir(), 20)
+
+        # A compactação separa o journal ativo e é interrompida antes de gravar o novo snapshot
+        os.replace(self.arquivo + ".log", self.arquivo + ".log.1")
+        armazenamento = self.abrir(limite_operacoes=10)
+        self.registrar(armazenamento, 4)
+        self.conferir(self.abrir())
+
+        # A próxima compactação incorpora primeiro o journal que sobrou
+        self.registrar(armazenamento, 8)
+        armazenamento.fechar()
+        self.assertFalse(os.path.exists(self.arquivo + ".log.1"))
+        self.conferir(self.abrir())
+
+    def test_ultima_linha_truncada(self):
+        """Uma última linha gravada pela metade é ignorada, e as operações anteriores continuam valendo"""
+        self.registrar(self.abrir(), 12)
+        with open(self.arquivo + ".log", 'a', encoding='utf-8') as f:
+            f.write('{"op": "excluir", "i')
+        self.conferir(self.abrir())
+
+        # As operações gravadas depois dela não se juntam à linha incompleta
+        self.registrar(self.abrir(), 6)
+        self.conferir(self.abrir())
+
+if __name__ == '__main__':
+    unittest.main()
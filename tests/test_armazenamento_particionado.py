@@ -0,0 +1,116 @@
+"""
+Testes da migração e da gravação dos gastos particionados por mês
+"""
+import json
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+from models import armazenamento_particionado
+from models.armazenamento_particionado import ArmazenamentoParticionado, particao_gasto
+from models.data_manager import DataManager
+
+class TestParticionado(unittest.TestCase):
+    """As partições e o manifesto reproduzem o arquivo único, e cada alteração regrava apenas o mês afetado"""
+
+    def setUp(self):
+        """Grava o arquivo único de gastos (com meses embaralhados e datas inválidas) em um diretório temporário"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        aleatorio = random.Random(4)
+        self.gastos = []
+        for gasto_id in range(1, 401):
+            data = f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/{aleatorio.randint(2024, 2026)}"
+            self.gastos.append({
+                'descricao': f"Gasto {gasto_id}", 'valor': aleatorio.choice(["189.90", 30, 12.5]),
+                'categoria': aleatorio.choice(['Alimentação', 'Lazer']),
+                'data': data if gasto_id % 50 else 'sem data', 'id': gasto_id
+            })
+
+        self.data_manager = DataManager(data_dir=self.diretorio.name)
+        with open(self.data_manager.gastos_file, 'w', encoding='utf-8') as f:
+            json.dump(self.gastos, f, indent=4, ensure_ascii=False)
+        with open(self.data_manager.gastos_file, 'rb') as f:
+            self.conteudo_original = f.read()
+        self.diretorio_particoes = os.path.join(self.diretorio.name, "gastos")
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def test_migracao_reproduz_o_arquivo_unico(self):
+        """Juntas, as partições listadas no manifesto têm exatamente os gastos do arquivo único, na mesma ordem"""
+        armazenamento = ArmazenamentoParticionado(self.data_manager.arquivos, self.diretorio_particoes)
+
+        with open(os.path.join(self.diretorio_particoes, "manifesto.json"), encoding='utf-8') as f:
+            manifesto = json.load(f)
+        self.assertEqual(manifesto['particoes'], dict(sorted(Counter(map(particao_gasto, self.gastos)).items())))
+        self.assertEqual(
+            sorted(os.listdir(self.diretorio_particoes)),
+            sorted([particao + ".json" for particao in manifesto['particoes']] + ["manifesto.json"])
+        )
+
+        # Cada partição tem só os gastos do seu mês
+        juntos = []
+        for particao in manifesto['particoes']:
+            with open(os.path.join(self.diretorio_particoes, particao + ".json"), encoding='utf-8') as f:
+                gastos = json.load(f)
+            self.assertEqual({particao_gasto(gasto) for gasto in gastos}, {particao})
+            juntos.extend(gastos)
+        self.assertEqual(sorted(juntos, key=lambda gasto: gasto['id']), self.gastos)
+
+        self.assertEqual(armazenamento.carregar('gastos'), self.gastos)
+        self.assertEqual(list(armazenamento.iterar('gastos')), self.gastos)
+
+        # O arquivo único é mantido como estava
+        with open(self.data_manager.gastos_file, 'rb') as f:
+            self.assertEqual(f.read(), self.conteudo_original)
+
+    def test_ordem_igual_a_do_json(self):
+        """O gerenciador devolve os gastos na mesma ordem (a dos IDs) com o armazenamento JSON e o particionado"""
+        particionado = DataManager(data_dir=self.diretorio.name, armazenamento="particionado")
+        self.assertEqual(particionado.obter_gastos(), self.data_manager.obter_gastos())
+        self.assertEqual(particionado.obter_gastos_por_periodo(), self.gastos)
+
+        # Um gasto que muda para um mês anterior continua na posição do seu ID
+        for data_manager in (particionado, self.data_manager):
+            data_manager.atualizar_gasto(300, dict(self.gastos[299], data='01/01/2024'))
+        self.assertEqual(DataManager(data_dir=self.diretorio.name, armazenamento="particionado").obter_gastos(),
+                         self.data_manager.obter_gastos())
+        self.assertEqual(list(particionado.iterar_gastos()), self.data_manager.obter_gastos())
+
+    def test_alteracao_regrava_apenas_o_mes(self):
+        """atualizar_gasto regrava só a partição do gasto (e as duas, se ele mudar de mês), além do manifesto"""
+        data_manager = DataManager(data_dir=self.diretorio.name, armazenamento="particionado")
+        data_manager.obter_gastos()
+        gasto = dict(self.gastos[10])
+        particao = particao_gasto(gasto)
+        manifesto = os.path.join(self.diretorio_particoes, "manifesto.json")
+
+        def gravados(alteracao):
+            """Retorna os arquivos gravados pela alteração"""
+            gravar = armazenamento_particionado._gravar_json
+            with mock.patch.object(armazenamento_particionado, '_gravar_json', wraps=gravar) as gravar_json:
+                alteracao()
+            return sorted(chamada.args[0] for chamada in gravar_json.call_args_list)
+
+        self.assertEqual(
+            gravados(lambda: data_manager.atualizar_gasto(gasto['id'], dict(gasto, valor=1.5))),
+            sorted([os.path.join(self.diretorio_particoes, particao + ".json"), manifesto])
+        )
+
+        nova = dict(gasto, data='15/06/2030')
+        self.assertEqual(
+            gravados(lambda: data_manager.atualizar_gasto(gasto['id'], nova)),
+            sorted([
+                os.path.join(self.diretorio_particoes, particao + ".json"),
+                os.path.join(self.diretorio_particoes, "2030-06.json"),
+                manifesto
+            ])
+        )
+        self.assertEqual(data_manager.obter_gastos_por_periodo(6, 2030), [nova])
+
+if __name__ == '__main__':
+    unittest.main()
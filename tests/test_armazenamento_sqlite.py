@@ -0,0 +1,64 @@
+"""
+Testes da migração dos arquivos JSON para o banco SQLite
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from models.armazenamento_sqlite import ArmazenamentoSQLite, migrar_json_para_sqlite
+
+class TestMigracaoSQLite(unittest.TestCase):
+    """Migração dos arquivos JSON com IDs repetidos ou ausentes"""
+
+    def setUp(self):
+        """Cria os arquivos JSON em um diretório temporário"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.arquivos = {}
+        gastos = [
+            {'descricao': 'mercado', 'valor': '100', 'data': '01/03/2026', 'categoria': 'Alimentação', 'id': 1},
+            {'descricao': 'padaria', 'valor': '15', 'data': '02/03/2026', 'categoria': 'Alimentação', 'id': 1},
+            {'descricao': 'ônibus', 'valor': '5', 'data': '03/03/2026', 'categoria': 'Transporte'},
+            {'descricao': 'cinema', 'valor': '40', 'data': '04/03/2026', 'categoria': 'Lazer', 'id': 2}
+        ]
+        for nome, dados in (('gastos', gastos), ('receitas', []), ('contas_fixas', [])):
+            caminho = os.path.join(self.diretorio.name, f"{nome}.json")
+            with open(caminho, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, ensure_ascii=False)
+            self.arquivos[nome] = caminho
+        self.banco = os.path.join(self.diretorio.name, "dados.db")
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def test_id_repetido_e_ausente_sao_renumerados(self):
+        """Nenhum registro é descartado e os renumerados recebem IDs novos, informados na importação"""
+        totais = migrar_json_para_sqlite(self.arquivos, self.banco)
+        self.assertEqual(totais['gastos'], 4)
+
+        armazenamento = ArmazenamentoSQLite(self.banco)
+        try:
+            gastos = armazenamento.carregar('gastos')
+        finally:
+            armazenamento.fechar()
+
+        self.assertEqual(
+            sorted(gasto['descricao'] for gasto in gastos),
+            ['cinema', 'mercado', 'padaria', 'ônibus']
+        )
+        self.assertEqual(len({gasto['id'] for gasto in gastos}), 4)
+        ids = {gasto['descricao']: gasto['id'] for gasto in gastos}
+        self.assertEqual((ids['mercado'], ids['cinema']), (1, 2))
+        self.assertEqual((ids['padaria'], ids['ônibus']), (3, 4))
+
+    def test_renumerados_sao_informados(self):
+        """A importação registra a posição, o ID antigo e o ID novo de cada registro renumerado"""
+        armazenamento = ArmazenamentoSQLite(self.banco, self.arquivos)
+        try:
+            self.assertEqual(armazenamento.renumerados, {'gastos': [(1, 1, 3), (2, None, 4)]})
+        finally:
+            armazenamento.fechar()
+
+if __name__ == '__main__':
+    unittest.main()
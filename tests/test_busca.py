@@ -0,0 +1,156 @@
+"""
+Testes da busca por descrição: normalização dos textos, índice de trigramas e ordenação por recência
+"""
+import datetime
+import random
+import tempfile
+import unittest
+
+from models.busca import IndiceTexto, normalizar_texto
+from models.data_manager import DataManager
+
+PALAVRAS = ['Açaí', 'acai', 'Pão', 'PAO', 'Farmácia', 'farmacia', 'Água', 'Mercado', 'São João', 'Uber', 'ônibus', 'Café']
+
+class Registro:
+    """Registro mínimo com a descrição indexada"""
+
+    def __init__(self, descricao):
+        """Guarda a descrição do registro"""
+        self.descricao = descricao
+
+class TestNormalizarTexto(unittest.TestCase):
+    """A normalização tira os acentos, passa para minúsculas e junta os espaços"""
+
+    def test_acentos_maiusculas_e_espacos(self):
+        """Textos acentuados e sem acento ficam iguais"""
+        self.assertEqual(normalizar_texto("  Açaí   na   PRAÇA "), "acai na praca")
+        self.assertEqual(normalizar_texto("São João"), normalizar_texto("sao joao"))
+        self.assertEqual(normalizar_texto("ÔNIBUS"), "onibus")
+        self.assertEqual(normalizar_texto("Straße"), "strasse")
+        self.assertEqual(normalizar_texto(None), "")
+        self.assertEqual(normalizar_texto(12), "")
+
+class TestIndiceTexto(unittest.TestCase):
+    """O índice encontra os mesmos registros que procurar a consulta em cada descrição normalizada"""
+
+    def setUp(self):
+        """Cria o índice com descrições acentuadas e sem acento"""
+        self.aleatorio = random.Random(9)
+        self.indice = IndiceTexto()
+        self.registros = [self.gerar() for _ in range(200)]
+        self.indice.reconstruir(self.registros)
+
+    def gerar(self):
+        """Gera um registro com uma descrição de uma a três palavras"""
+        return Registro(" ".join(self.aleatorio.choice(PALAVRAS) for _ in range(self.aleatorio.randint(1, 3))))
+
+    def conferir(self, consulta):
+        """Compara a busca com a procura direta nas descrições e confere a estimativa"""
+        normalizada = normalizar_texto(consulta)
+        esperados = {id(registro) for registro in self.registros if normalizada and normalizada in normalizar_texto(registro.descricao)}
+        encontrados = self.indice.buscar(consulta)
+        self.assertEqual(len(encontrados), len(esperados))
+        self.assertEqual({id(registro) for registro in encontrados}, esperados)
+        self.assertGreaterEqual(self.indice.estimar(consulta), len(encontrados))
+
+    def consultas(self):
+        """Consultas com e sem acento, curtas (menos de três caracteres), com espaços e sem resultado"""
+        return ['açaí', 'ACAI', 'acaí', 'pao', 'Pão', 'farmác', 'sao jo', 'SÃO JOÃO', 'a', 'ã', 'pã', 'ca', ' ',
+                '', 'ai pa', 'xyz', 'ônibus', 'onib']
+
+    def test_consultas(self):
+        """Acentos e maiúsculas na consulta ou na descrição não mudam o resultado, inclusive em consultas curtas"""
+        for consulta in self.consultas():
+            with self.subTest(consulta=consulta):
+                self.conferir(consulta)
+        self.assertEqual(len(self.indice.buscar('acai')), len(self.indice.buscar('Açaí')))
+        self.assertEqual(self.indice.buscar(''), [])
+
+    def test_alteracoes(self):
+        """Após inclusões e remoções (antes e depois da primeira busca) o índice continua em sincronia"""
+        for passo in range(600):
+            if self.aleatorio.random() < 0.5 or not self.registros:
+                registro = self.gerar()
+                self.registros.append(registro)
+                self.indice.adicionar(registro)
+            else:
+                registro = self.registros.pop(self.aleatorio.randrange(len(self.registros)))
+                self.indice.remover(registro)
+            if passo % 25 == 0:
+                with self.subTest(passo=passo):
+                    self.conferir(self.aleatorio.choice(self.consultas()))
+
+        for consulta in self.consultas():
+            self.conferir(consulta)
+
+class TestBuscaNoGerenciador(unittest.TestCase):
+    """A busca do gerenciador acompanha as alterações das coleções e ordena os resultados do mais recente ao mais antigo"""
+
+    def setUp(self):
+        """Cria gastos, receitas e contas fixas com descrições acentuadas em datas variadas"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.data_manager = DataManager(data_dir=self.diretorio.name)
+        for dia, descricao in ((5, 'Pão de queijo'), (20, 'Padaria'), (12, 'Café e pão')):
+            self.data_manager.adicionar_gasto({
+                'descricao': descricao, 'valor': 10.0, 'categoria': 'Alimentação', 'data': f"{dia:02d}/01/2020"
+            })
+        self.data_manager.adicionar_receita({
+            'descricao': 'Venda de pão', 'valor': 100.0, 'recorrente': True, 'data_inicio': '01/01/2019'
+        })
+        self.data_manager.adicionar_conta_fixa({
+            'descricao': 'Pão diário', 'valor': 50.0, 'recorrente': True, 'data_inicio': '01/01/2018',
+            'data_fim': '31/03/2019', 'data_limite': '10'
+        })
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def descricoes(self, texto, limite=200):
+        """Retorna (tipo, descrição) dos resultados da busca, na ordem retornada"""
+        return [(resultado['tipo'], resultado['descricao']) for resultado in self.data_manager.buscar(texto, limite)]
+
+    def test_ordem_por_recencia(self):
+        """A receita em vigor vale pelo mês atual, os gastos pela data e a conta encerrada pelo seu último mês"""
+        esperado = [
+            ('Receita', 'Venda de pão'),
+            ('Gasto', 'Café e pão'),
+            ('Gasto', 'Pão de queijo'),
+            ('Conta Fixa', 'Pão diário')
+        ]
+        self.assertEqual(self.descricoes('pao'), esperado)
+        self.assertEqual(self.descricoes('PÃO'), esperado)
+        self.assertEqual(self.descricoes('pão', limite=2), esperado[:2])
+
+        # Um gasto com data futura passa à frente da receita em vigor
+        ano_seguinte = datetime.date.today().year + 1
+        self.data_manager.adicionar_gasto({
+            'descricao': 'Pãozinho', 'valor': 1.0, 'categoria': 'Alimentação', 'data': f"01/01/{ano_seguinte}"
+        })
+        self.assertEqual(self.descricoes('pao')[0], ('Gasto', 'Pãozinho'))
+
+    def test_consulta_curta(self):
+        """Consultas de um ou dois caracteres procuram em todas as descrições"""
+        self.assertEqual(len(self.descricoes('ã')), 5)
+        self.assertEqual(len(self.descricoes('PÁ')), 5)
+        self.assertEqual(self.descricoes('qu'), [('Gasto', 'Pão de queijo')])
+        self.assertEqual(self.descricoes(''), [])
+
+    def test_sincronia_com_as_alteracoes(self):
+        """Registros alterados e excluídos saem da busca pela descrição antiga e entram pela nova"""
+        self.data_manager.atualizar_gasto(2, {'descricao': 'Farmácia', 'valor': 10.0, 'categoria': 'Saúde', 'data': '20/01/2020'})
+        self.assertEqual(self.descricoes('padaria'), [])
+        self.assertEqual(self.descricoes('farmacia'), [('Gasto', 'Farmácia')])
+
+        self.data_manager.atualizar_receita(1, {'descricao': 'Aluguel recebido', 'valor': 100.0, 'recorrente': True, 'data_inicio': '01/01/2019'})
+        self.data_manager.excluir_gasto(1)
+        self.data_manager.excluir_conta_fixa(1)
+        self.assertEqual(self.descricoes('pao'), [('Gasto', 'Café e pão')])
+        self.assertEqual(self.descricoes('aluguel'), [('Receita', 'Aluguel recebido')])
+
+        # Atualizar a conta excluída não a traz de volta à busca
+        self.data_manager.atualizar_conta_fixa(1, {'descricao': 'Pão', 'valor': 1.0, 'recorrente': True, 'data_inicio': '01/01/2018'})
+        self.assertEqual(self.descricoes('pao'), [('Gasto', 'Café e pão')])
+
+if __name__ == '__main__':
+    unittest.main()
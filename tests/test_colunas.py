@@ -0,0 +1,85 @@
+"""
+Testes dos totais dos gastos com e sem as colunas NumPy
+"""
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from models.colunas import COLUNAS_DISPONIVEIS
+from models.data_manager import DataManager
+
+CATEGORIAS = ['Alimentação', 'Transporte', 'Lazer', 'Pets']
+
+class TestSemNumPy(unittest.TestCase):
+    """Sem o NumPy o aplicativo abre e os totais, relatórios e agrupamentos são somados nos registros"""
+
+    def setUp(self):
+        """Cria dois gerenciadores com os mesmos gastos, um deles sem as colunas"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.aleatorio = random.Random(3)
+        self.com_colunas = DataManager(data_dir=self.diretorio.name)
+        with mock.patch('models.data_manager.COLUNAS_DISPONIVEIS', False):
+            self.sem_colunas = DataManager(data_dir=self.diretorio.name)
+        self.assertIsNone(self.sem_colunas._colunas_gastos)
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def gerar(self):
+        """Gera um gasto aleatório, às vezes com data inválida"""
+        data = f"{self.aleatorio.randint(1, 28):02d}/{self.aleatorio.randint(1, 12):02d}/{self.aleatorio.randint(2025, 2026)}"
+        return {
+            'descricao': 'Gasto', 'valor': self.aleatorio.randint(1, 50000) / 100,
+            'categoria': self.aleatorio.choice(CATEGORIAS),
+            'data': data if self.aleatorio.random() > 0.05 else '31/02/2026'
+        }
+
+    def consultar(self, data_manager):
+        """Retorna os totais, a matriz e os agrupamentos calculados pelo gerenciador (que relê o que o outro gravou)"""
+        matriz = data_manager.obter_gastos_por_mes_e_categoria(11, 2025, 3, 2026)
+        return {
+            'total': data_manager.calcular_total_gastos(),
+            'saldo': data_manager.calcular_saldo(),
+            'por_categoria': data_manager.obter_gastos_por_categoria(),
+            'matriz': (matriz['meses'], matriz['categorias'], [[float(valor) for valor in linha] for linha in matriz['valores']]),
+            'agrupamentos': [
+                data_manager.agrupar(dimensoes, filtro)
+                for dimensoes in [(), ('categoria',), ('mes', 'ano'), ('ano', 'categoria', 'tipo')]
+                for filtro in [None, {'ano': 2026}, {'mes': 3}, {'categoria': 'Pets', 'tipo': 'gasto'}]
+            ],
+            'categoria': data_manager.consulta().tipo('gasto').categoria('Pets').lista()
+        }
+
+    @unittest.skipUnless(COLUNAS_DISPONIVEIS, "NumPy não instalado")
+    def test_mesmos_resultados(self):
+        """Os resultados sem as colunas são os mesmos das colunas, também após alterações"""
+        self.com_colunas.adicionar_gastos([self.gerar() for _ in range(300)])
+        self.assertEqual(self.consultar(self.sem_colunas), self.consultar(self.com_colunas))
+
+        for gasto_id in range(1, 300, 7):
+            self.sem_colunas.atualizar_gasto(gasto_id, self.gerar())
+            self.sem_colunas.excluir_gasto(gasto_id + 1)
+        self.assertEqual(self.consultar(self.com_colunas), self.consultar(self.sem_colunas))
+
+    def test_importacao_sem_numpy(self):
+        """O gerenciador de dados é importado e usado normalmente quando o NumPy não pode ser importado"""
+        codigo = (
+            "import sys, tempfile\n"
+            "sys.modules['numpy'] = None\n"
+            "from models.data_manager import DataManager\n"
+            "data_manager = DataManager(data_dir=tempfile.mkdtemp())\n"
+            "data_manager.adicionar_gasto({'descricao': 'Mercado', 'valor': 12.5, 'categoria': 'Alimentação', 'data': '05/03/2026'})\n"
+            "assert data_manager._colunas_gastos is None\n"
+            "assert data_manager.calcular_total_gastos() == 12.5\n"
+            "assert data_manager.obter_gastos_por_mes_e_categoria(3, 2026, 3, 2026)['valores'][0][0] == 12.5\n"
+        )
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, '-c', codigo], check=True, cwd=raiz)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Testes do planejamento e da execução das consultas compostas
+"""
+import tempfile
+import unittest
+from unittest import mock
+
+from models.busca import IndiceTexto
+from models.data_manager import DataManager
+
+class TestPlanoConsulta(unittest.TestCase):
+    """A escolha do índice usa apenas estimativas, e só os candidatos do índice escolhido são levantados"""
+
+    def setUp(self):
+        """Cria o gerenciador de dados em um diretório temporário com gastos de duas categorias"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.data_manager = DataManager(data_dir=self.diretorio.name)
+        for dia in range(1, 21):
+            self.data_manager.adicionar_gasto({
+                'descricao': 'Uber' if dia % 2 else 'Mercado', 'valor': 10.0 * dia,
+                'categoria': 'Transporte' if dia % 2 else 'Alimentação', 'data': f"{dia:02d}/03/2026"
+            })
+        self.data_manager.adicionar_gasto({
+            'descricao': 'Uber', 'valor': 30.0, 'categoria': 'Lazer', 'data': '21/03/2026'
+        })
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def test_plano_nao_executa_a_busca_de_texto(self):
+        """O plano compara as estimativas sem buscar no índice de texto, mesmo quando escolhe a busca"""
+        with mock.patch.object(IndiceTexto, 'buscar', side_effect=AssertionError("busca executada no plano")):
+            self.assertEqual(self.data_manager.consulta().tipo('gasto').texto('uber').categoria('Lazer').plano(),
+                             {'gasto': 'categoria'})
+            self.assertEqual(self.data_manager.consulta().tipo('gasto').texto('merc').categoria('Transporte', 'Alimentação').plano(),
+                             {'gasto': 'texto'})
+
+    def test_candidatos_apenas_do_indice_escolhido(self):
+        """Com a categoria escolhida, a busca de texto não é executada e o resultado continua filtrado pelo texto"""
+        with mock.patch.object(IndiceTexto, 'buscar', side_effect=AssertionError("busca executada")):
+            gastos = self.data_manager.consulta().tipo('gasto').texto('uber').categoria('Lazer').lista()
+        self.assertEqual([(gasto['descricao'], gasto['categoria']) for gasto in gastos], [('Uber', 'Lazer')])
+
+        gastos = self.data_manager.consulta().tipo('gasto').texto('merc').categoria('Transporte', 'Alimentação').lista()
+        self.assertEqual(len(gastos), 10)
+
+    def test_alteracao_durante_a_consulta(self):
+        """Uma consulta por todos os registros percorre uma cópia, e alterar os dados no meio dela não a interrompe"""
+        consulta = self.data_manager.consulta().tipo('gasto')
+        self.assertEqual(consulta.plano(), {'gasto': 'todos'})
+        vistos = []
+        for gasto in consulta:
+            if not vistos:
+                self.data_manager.adicionar_gasto({
+                    'descricao': 'Padaria', 'valor': 5.0, 'categoria': 'Alimentação', 'data': '22/03/2026'
+                })
+                self.data_manager.excluir_gasto(gasto['id'])
+            vistos.append(gasto['id'])
+        self.assertEqual(len(vistos), 21)
+
+if __name__ == '__main__':
+    unittest.main()
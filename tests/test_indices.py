@@ -0,0 +1,89 @@
+"""
+Testes do índice de intervalos das receitas e contas fixas recorrentes
+"""
+import random
+import unittest
+
+from models.indices import IndiceIntervalos
+
+class Recorrente:
+    """Registro mínimo com a vigência (inicio, fim) em ordinais de mês; fim None é uma vigência sem término"""
+
+    def __init__(self, inicio, fim):
+        """Guarda a vigência do registro"""
+        self.vigencia = (inicio, fim)
+
+def vigencia(registro):
+    """Retorna a vigência do registro"""
+    return registro.vigencia
+
+class TestIndiceIntervalos(unittest.TestCase):
+    """O índice responde o mesmo que um filtro direto pela vigência, com a árvore alterada a cada gravação"""
+
+    def setUp(self):
+        """Cria o índice com registros de vigências variadas"""
+        self.aleatorio = random.Random(5)
+        self.indice = IndiceIntervalos(vigencia)
+        self.registros = [self.gerar() for _ in range(300)]
+        self.indice.reconstruir(self.registros)
+
+    def gerar(self):
+        """Gera um registro com vigência aleatória, às vezes sem término ou invertida"""
+        inicio = self.aleatorio.randint(24000, 24300)
+        sorteio = self.aleatorio.random()
+        if sorteio < 0.2:
+            return Recorrente(inicio, None)
+        if sorteio < 0.25:
+            return Recorrente(inicio, inicio - 3)
+        return Recorrente(inicio, inicio + self.aleatorio.randint(0, 60))
+
+    def conferir(self, ordinal):
+        """Compara os ativos no mês com o filtro direto pela vigência de todos os registros"""
+        esperados = {
+            id(registro) for registro in self.registros
+            if registro.vigencia[0] <= ordinal and (registro.vigencia[1] is None or ordinal <= registro.vigencia[1])
+        }
+        ativos = self.indice.ativos(ordinal)
+        self.assertEqual(len(ativos), len(esperados))
+        self.assertEqual({id(registro) for registro in ativos}, esperados)
+
+    def test_inclusoes_e_remocoes_misturadas(self):
+        """Após inclusões, remoções e alterações de vigência intercaladas com consultas, os ativos continuam corretos"""
+        for passo in range(2000):
+            sorteio = self.aleatorio.random()
+            if sorteio < 0.4 or not self.registros:
+                registro = self.gerar()
+                self.registros.append(registro)
+                self.indice.adicionar(registro)
+            elif sorteio < 0.7:
+                registro = self.registros.pop(self.aleatorio.randrange(len(self.registros)))
+                self.indice.remover(registro)
+            else:
+                # Alterar a vigência é retirar o registro e incluí-lo de novo
+                registro = self.aleatorio.choice(self.registros)
+                self.indice.remover(registro)
+                registro.vigencia = self.gerar().vigencia
+                self.indice.adicionar(registro)
+
+            if passo % 7 == 0:
+                with self.subTest(passo=passo):
+                    self.conferir(self.aleatorio.randint(23990, 24380))
+
+        for ordinal in range(23990, 24380, 3):
+            self.conferir(ordinal)
+
+    def test_gravacao_altera_a_arvore_existente(self):
+        """Uma gravação seguida de consulta (como ao trocar de aba) altera a árvore montada, sem remontá-la"""
+        self.conferir(24150)
+        arvore = self.indice._arvore
+        for _ in range(20):
+            registro = self.gerar()
+            self.registros.append(registro)
+            self.indice.adicionar(registro)
+            self.conferir(registro.vigencia[0])
+            self.indice.remover(self.registros.pop(0))
+            self.conferir(24150)
+        self.assertIs(self.indice._arvore, arvore)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Testes das consultas de pendências e sequências de pagamento das contas fixas
+"""
+import datetime
+import random
+import tempfile
+import unittest
+
+from models.data_manager import DataManager
+
+def mes_da_data(data):
+    """Converte uma data DD/MM/AAAA no ordinal do mês (ano * 12 + mês)"""
+    data = datetime.datetime.strptime(data, "%d/%m/%Y")
+    return data.year * 12 + data.month
+
+def vence(conta, ordinal):
+    """Indica se a conta vence no mês, olhando apenas para as datas e o mês/ano do dicionário"""
+    if conta.get('recorrente'):
+        if mes_da_data(conta['data_inicio']) > ordinal:
+            return False
+        return not conta.get('data_fim') or ordinal <= mes_da_data(conta['data_fim'])
+    return conta.get('ano', 0) * 12 + conta.get('mes', 0) == ordinal
+
+def paga(conta, ordinal):
+    """Indica se o mês está no histórico de pagamentos da conta"""
+    return f"{(ordinal - 1) % 12 + 1:02d}/{(ordinal - 1) // 12}" in (conta.get('historico_pagamentos') or {})
+
+class TestPendenciasESequencias(unittest.TestCase):
+    """As consultas pelo mapa de bits respondem o mesmo que um laço sobre o historico_pagamentos de cada conta"""
+
+    def setUp(self):
+        """Cria contas recorrentes (com e sem fim) e de um mês só, com vigências começando e terminando em anos diferentes"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.data_manager = DataManager(data_dir=self.diretorio.name)
+        self.aleatorio = random.Random(6)
+        for numero in range(1, 41):
+            inicio = self.aleatorio.randint(2024 * 12 + 1, 2026 * 12 + 12)
+            conta = {'descricao': f"Conta {numero}", 'valor': 100.0, 'data_limite': '10'}
+            sorteio = self.aleatorio.random()
+            if sorteio < 0.2:
+                conta.update(recorrente=False, mes=(inicio - 1) % 12 + 1, ano=(inicio - 1) // 12)
+            else:
+                conta.update(recorrente=True, data_inicio=self.data(inicio, 15))
+                if sorteio < 0.6:
+                    conta['data_fim'] = self.data(inicio + self.aleatorio.randint(0, 18), 28)
+            self.data_manager.adicionar_conta_fixa(conta)
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    @staticmethod
+    def data(ordinal, dia):
+        """Monta a data DD/MM/AAAA de um dia do mês (ordinal)"""
+        return f"{dia:02d}/{(ordinal - 1) % 12 + 1:02d}/{(ordinal - 1) // 12}"
+
+    def alternar_pagamentos(self, quantidade):
+        """Marca e desmarca pagamentos ao acaso, concentrados na virada de 2025 para 2026"""
+        contas = self.data_manager.obter_contas_fixas()
+        for _ in range(quantidade):
+            conta = self.aleatorio.choice(contas)
+            ordinal = self.aleatorio.choice([
+                self.aleatorio.randint(2024 * 12 + 1, 2027 * 12 + 12), 2025 * 12 + 12, 2026 * 12 + 1
+            ])
+            mes, ano = (ordinal - 1) % 12 + 1, (ordinal - 1) // 12
+            self.data_manager.marcar_conta_como_paga(conta['id'], mes, ano, status_pago=self.aleatorio.random() < 0.6)
+
+    def conferir(self, inicio, fim):
+        """Compara as pendências entre dois (mes, ano) e as sequências de pagamento com o laço sobre o histórico"""
+        contas = self.data_manager.obter_contas_fixas()
+        ordinais = range(inicio[1] * 12 + inicio[0], fim[1] * 12 + fim[0] + 1)
+
+        pendentes = [
+            {'id': conta['id'], 'descricao': conta['descricao'], 'mes': (ordinal - 1) % 12 + 1, 'ano': (ordinal - 1) // 12}
+            for ordinal in ordinais
+            for conta in contas
+            if vence(conta, ordinal) and not paga(conta, ordinal)
+        ]
+        self.assertEqual(self.data_manager.obter_contas_pendentes(inicio, fim), pendentes)
+
+        quantidades = {((ordinal - 1) % 12 + 1, (ordinal - 1) // 12): 0 for ordinal in ordinais}
+        for pendente in pendentes:
+            quantidades[(pendente['mes'], pendente['ano'])] += 1
+        self.assertEqual(self.data_manager.contar_contas_pendentes(inicio, fim), quantidades)
+
+        for conta in contas:
+            em_dia = [vence(conta, ordinal) and paga(conta, ordinal) for ordinal in range(2023 * 12 + 1, 2029 * 12 + 1)]
+            maior = atual = 0
+            for mes_em_dia in em_dia:
+                atual = atual + 1 if mes_em_dia else 0
+                maior = max(maior, atual)
+            for ordinal in ordinais:
+                atual = 0
+                while vence(conta, ordinal - atual) and paga(conta, ordinal - atual):
+                    atual += 1
+                with self.subTest(conta=conta['id'], ordinal=ordinal):
+                    self.assertEqual(
+                        self.data_manager.obter_sequencia_pagamentos(conta['id'], (ordinal - 1) % 12 + 1, (ordinal - 1) // 12),
+                        {'atual': atual, 'maior': maior}
+                    )
+
+    def test_intervalo_na_virada_do_ano(self):
+        """Intervalos que atravessam a virada do ano, antes e depois de pagamentos marcados e desmarcados"""
+        self.conferir((10, 2025), (3, 2026))
+        for _ in range(5):
+            self.alternar_pagamentos(150)
+            self.conferir((10, 2025), (3, 2026))
+            self.conferir((12, 2024), (1, 2025))
+
+    def test_pagamento_desmarcado(self):
+        """Um mês desmarcado com marcar_conta_como_paga(..., False) volta a ser pendente e interrompe a sequência"""
+        self.data_manager.adicionar_conta_fixa({
+            'descricao': 'Aluguel', 'valor': 1000.0, 'recorrente': True, 'data_inicio': '05/11/2025', 'data_limite': '5'
+        })
+        conta_id = max(conta['id'] for conta in self.data_manager.obter_contas_fixas())
+        for mes, ano in ((11, 2025), (12, 2025), (1, 2026), (2, 2026)):
+            self.data_manager.marcar_conta_como_paga(conta_id, mes, ano)
+        self.assertEqual(self.data_manager.obter_sequencia_pagamentos(conta_id, 2, 2026), {'atual': 4, 'maior': 4})
+
+        self.data_manager.marcar_conta_como_paga(conta_id, 12, 2025, status_pago=False)
+        self.assertEqual(self.data_manager.obter_sequencia_pagamentos(conta_id, 2, 2026), {'atual': 2, 'maior': 2})
+        self.assertIn({'id': conta_id, 'descricao': 'Aluguel', 'mes': 12, 'ano': 2025},
+                      self.data_manager.obter_contas_pendentes((11, 2025), (2, 2026)))
+        self.conferir((11, 2025), (2, 2026))
+
+    def test_vigencia_dentro_do_intervalo(self):
+        """Contas cuja vigência começa ou termina no meio do intervalo consultado só contam nos meses em que vencem"""
+        self.alternar_pagamentos(300)
+        self.conferir((1, 2024), (12, 2027))
+        self.conferir((6, 2025), (6, 2026))
+        self.conferir((3, 2026), (3, 2026))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Testes dos registros tipados: conversão do dicionário para o registro e de volta
+"""
+import unittest
+
+from models.registros import ContaFixa, Gasto, Receita
+
+class TestIdaEVolta(unittest.TestCase):
+    """O dicionário refeito a partir do registro é igual ao original, com o valor no mesmo tipo e as chaves na mesma ordem"""
+
+    # (valor lido, centavos esperados)
+    VALORES = [
+        ("189.90", 18990), ("30", 3000), ("0.1", 10), ("1,50", 0),
+        (30, 3000), (0, 0), (-15, -1500),
+        (189.9, 18990), (0.1, 10), (2.675, 268), (-0.0, 0)
+    ]
+
+    def conferir(self, tipo, dados):
+        """Converte o dicionário em registro e de volta, comparando valor, tipo do valor e ordem das chaves"""
+        registro = tipo.de_dict(dados)
+        refeito = registro.para_dict()
+        self.assertEqual(refeito, dados)
+        self.assertEqual(list(refeito), list(dados))
+        self.assertIs(type(refeito['valor']), type(dados['valor']))
+        self.assertEqual(repr(refeito['valor']), repr(dados['valor']))
+        return registro
+
+    def test_gasto(self):
+        """Gastos com valor em texto, inteiro e real, inclusive um campo desconhecido guardado à parte"""
+        for valor, centavos in self.VALORES:
+            with self.subTest(valor=valor):
+                registro = self.conferir(Gasto, {
+                    'descricao': 'Mercado', 'valor': valor, 'categoria': 'Alimentação',
+                    'data': '05/03/2026', 'observacao': 'feira', 'id': 7
+                })
+                self.assertEqual(registro.centavos, centavos)
+                self.assertEqual(registro.periodo, (2026, 3))
+
+    def test_receita(self):
+        """Receitas pontuais e recorrentes, com e sem data de fim"""
+        for valor, centavos in self.VALORES:
+            with self.subTest(valor=valor):
+                pontual = self.conferir(Receita, {
+                    'descricao': 'Extra', 'valor': valor, 'recorrente': False, 'data': '15/03/2026', 'id': 1
+                })
+                self.assertEqual((pontual.centavos, pontual.periodo, pontual.vigencia), (centavos, (2026, 3), None))
+                recorrente = self.conferir(Receita, {
+                    'descricao': 'Salário', 'valor': valor, 'recorrente': True,
+                    'data_inicio': '01/01/2026', 'data_fim': '01/12/2026', 'id': 2
+                })
+                self.assertEqual(recorrente.vigencia, (2026 * 12 + 1, 2026 * 12 + 12))
+
+    def test_conta_fixa(self):
+        """Contas fixas parceladas com juros e histórico de pagamentos"""
+        for valor, centavos in self.VALORES:
+            with self.subTest(valor=valor):
+                registro = self.conferir(ContaFixa, {
+                    'descricao': 'TV', 'valor': valor, 'valor_com_juros': "1250.00", 'recorrente': True,
+                    'parcelado': True, 'num_parcelas': 10, 'data_inicio': '05/01/2026', 'data_limite': '10',
+                    'historico_pagamentos': {'01/2026': {'pago': True, 'data_pagamento': '05/01/2026'}}, 'id': 3
+                })
+                self.assertEqual((registro.centavos, registro.centavos_com_juros), (centavos, 125000))
+
+    def test_data_invalida_e_campos_ausentes(self):
+        """Datas inválidas e campos ausentes voltam como foram lidos (ausentes continuam ausentes)"""
+        registro = self.conferir(Gasto, {'descricao': 'Sem data', 'valor': "10", 'data': '31/02/2026', 'id': 4})
+        self.assertIsNone(registro.periodo)
+        self.conferir(Gasto, {'valor': 5, 'id': 5})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Testes do resumo mensal de contas fixas parceladas
+"""
+import tempfile
+import unittest
+
+from models.data_manager import DataManager
+
+# Meses conferidos: de um mês antes do parcelamento até alguns meses depois do fim
+MESES = [(mes, ano) for ano in (2025, 2026, 2027) for mes in range(1, 13)]
+
+class TestResumoParcelado(unittest.TestCase):
+    """O resumo mensal soma em cada mês a parcela cobrada, e as abas e o saldo usam esse mesmo total"""
+
+    def setUp(self):
+        """Cria o gerenciador de dados em um diretório temporário com contas parceladas"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.data_manager = DataManager(data_dir=self.diretorio.name)
+        self.data_manager.adicionar_receita({
+            'descricao': 'Salário', 'valor': 3000.0, 'recorrente': True, 'data_inicio': '01/01/2025'
+        })
+        self.data_manager.adicionar_conta_fixa({
+            'descricao': 'TV', 'valor': 1200.0, 'recorrente': True, 'parcelado': True,
+            'num_parcelas': 12, 'data_inicio': '05/01/2026', 'data_fim': '05/12/2026'
+        })
+        # Parcelas com centavo de resto e juros, e vigência maior que o parcelamento
+        self.data_manager.adicionar_conta_fixa({
+            'descricao': 'Geladeira', 'valor': 1000.0, 'valor_com_juros': 1100.0, 'recorrente': True,
+            'parcelado': True, 'num_parcelas': 3, 'data_inicio': '10/11/2025'
+        })
+        self.data_manager.adicionar_conta_fixa({
+            'descricao': 'Psicóloga', 'valor': 500.0, 'recorrente': True, 'data_inicio': '01/04/2025'
+        })
+        self.data_manager.adicionar_conta_fixa({
+            'descricao': 'Curso', 'valor': 90.0, 'recorrente': False, 'parcelado': True,
+            'num_parcelas': 3, 'mes': 3, 'ano': 2026, 'data_inicio': '01/03/2026'
+        })
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def conferir(self, data_manager):
+        """Compara o total com parcelas, o resumo mensal, o histórico e o saldo com as ocorrências em todos os meses"""
+        for mes, ano in MESES:
+            with self.subTest(mes=mes, ano=ano):
+                # O agrupamento soma o valor cobrado em cada ocorrência, sem passar pelo resumo mensal
+                agrupado = data_manager.agrupar(('mes',), {'tipo': 'conta_fixa', 'ano': ano})
+                total = data_manager.calcular_total_contas_fixas_com_parcelas(mes, ano)
+                self.assertEqual(agrupado.get((mes,), {'soma': 0.0})['soma'], total)
+                self.assertEqual(data_manager.obter_historico(mes, ano)['total_contas_fixas'], total)
+                resumo = data_manager.obter_resumo_mensal(mes, ano)
+                self.assertEqual(resumo['total_contas_fixas'], total)
+                saldo = resumo['total_receitas'] - resumo['total_gastos'] - total
+                self.assertAlmostEqual(data_manager.calcular_saldo(mes, ano), saldo, places=2)
+
+    def test_resumo_usa_valor_da_parcela(self):
+        """Uma conta de 1200.00 em 12 parcelas soma 100.00 por mês ao resumo, e nada fora do parcelamento"""
+        self.assertEqual(self.data_manager.obter_resumo_mensal(3, 2026)['total_contas_fixas'], 630.0)
+        self.assertEqual(self.data_manager.obter_resumo_mensal(1, 2027)['total_contas_fixas'], 500.0)
+        self.conferir(self.data_manager)
+
+    def test_resumo_gravado_e_alteracoes(self):
+        """O resumo continua igual ao total com parcelas após gravar, recarregar, alterar e excluir"""
+        self.data_manager.sincronizar()
+        self.conferir(DataManager(data_dir=self.diretorio.name))
+
+        conta = next(conta for conta in self.data_manager.obter_contas_fixas() if conta['descricao'] == 'TV')
+        conta.update(num_parcelas=10, valor_com_juros=1250.0)
+        self.data_manager.atualizar_conta_fixa(conta['id'], conta)
+        self.data_manager.marcar_conta_como_paga(conta['id'], 2, 2026)
+        self.conferir(self.data_manager)
+
+        self.data_manager.excluir_conta_fixa(conta['id'])
+        self.conferir(self.data_manager)
+
+    def test_mes_em_texto_nao_interrompe_o_resumo(self):
+        """Uma conta parcelada com mês e ano em texto é gravada sem erro e não altera os meses consultados"""
+        self.data_manager.adicionar_conta_fixa({
+            'descricao': 'Antiga', 'valor': 60.0, 'recorrente': False, 'parcelado': True,
+            'num_parcelas': 2, 'mes': '3', 'ano': '2026', 'data_inicio': '01/03/2026'
+        })
+        self.assertEqual(self.data_manager.obter_resumo_mensal(3, 2026)['total_contas_fixas'], 630.0)
+        self.conferir(self.data_manager)
+
+    def test_serie_usa_valor_da_parcela(self):
+        """As séries de contas fixas e saldo usam o total com parcelas, como o histórico e o agrupamento"""
+        serie = self.data_manager.obter_serie((1, 2025), (12, 2027))
+        for posicao, (mes, ano) in enumerate(serie['periodos']):
+            with self.subTest(mes=mes, ano=ano):
+                total = self.data_manager.calcular_total_contas_fixas_com_parcelas(mes, ano)
+                self.assertEqual(serie['contas_fixas'][posicao], total)
+                agrupado = self.data_manager.agrupar(('mes',), {'tipo': 'conta_fixa', 'ano': ano})
+                self.assertEqual(agrupado.get((mes,), {'soma': 0.0})['soma'], total)
+                saldo = serie['receitas'][posicao] - serie['gastos'][posicao] - total
+                self.assertAlmostEqual(serie['saldo'][posicao], saldo, places=2)
+
+        # Por ano, cada ponto soma os meses do ano
+        anual = self.data_manager.obter_serie((1, 2026), (12, 2026), 'ano')
+        total_2026 = sum(self.data_manager.calcular_total_contas_fixas_com_parcelas(mes, 2026) for mes in range(1, 13))
+        self.assertAlmostEqual(anual['contas_fixas'][0], total_2026, places=2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Testes do snapshot binário das coleções
+"""
+import json
+import os
+import random
+import struct
+import tempfile
+import unittest
+import zlib
+
+from models import snapshot
+from models.data_manager import DataManager
+from models.registros import ContaFixa, Gasto, Receita
+from models.snapshot import carregar_snapshot, gravar_snapshot
+
+VERSAO = (1760000000000000000, 4096)
+
+GASTOS = [
+    {'descricao': 'Açaí', 'valor': "189.90", 'categoria': 'Alimentação', 'data': '05/03/2026', 'id': 1},
+    {'descricao': 'Uber', 'valor': 30, 'categoria': 'Transporte', 'data': '31/02/2026', 'id': 2},
+    {'descricao': '', 'valor': 12.5, 'categoria': None, 'data': '01/01/2026', 'observacao': {'a': [1, 2]}, 'id': 3},
+    {'valor': 2 ** 70, 'id': 4},
+    {'descricao': 'Cinema', 'valor': -0.0, 'categoria': 'Lazer', 'data': '10/10/2025', 'id': 5}
+]
+RECEITAS = [
+    {'descricao': 'Salário', 'valor': 3000.0, 'recorrente': True, 'data_inicio': '01/01/2026', 'id': 1},
+    {'descricao': 'Extra', 'valor': "50", 'recorrente': False, 'data': '15/03/2026', 'id': 2}
+]
+CONTAS_FIXAS = [
+    {
+        'descricao': 'TV', 'valor': 100, 'valor_com_juros': "1250.00", 'recorrente': True, 'parcelado': True,
+        'num_parcelas': 10, 'data_inicio': '05/01/2026', 'data_limite': '10',
+        'historico_pagamentos': {'01/2026': {'pago': True, 'data_pagamento': '05/01/2026'}}, 'id': 1
+    }
+]
+
+class TestSnapshot(unittest.TestCase):
+    """Ida e volta dos registros, descarte do snapshot corrompido ou desatualizado e volta ao JSON na inicialização"""
+
+    def setUp(self):
+        """Cria o diretório temporário"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.diretorio.name, "dados_gastos.json.bin")
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def gravar(self, tipo=Gasto, dados=GASTOS):
+        """Grava o snapshot dos registros criados a partir dos dicionários e retorna o conteúdo gravado"""
+        gravar_snapshot(self.caminho, tipo, [tipo.de_dict(registro) for registro in dados], VERSAO)
+        with open(self.caminho, 'rb') as f:
+            return f.read()
+
+    def reescrever(self, conteudo):
+        """Substitui o conteúdo do snapshot"""
+        with open(self.caminho, 'wb') as f:
+            f.write(conteudo)
+
+    def test_ida_e_volta(self):
+        """Os registros lidos do snapshot refazem os mesmos dicionários, com os mesmos tipos de valor"""
+        for tipo, dados in ((Gasto, GASTOS), (Receita, RECEITAS), (ContaFixa, CONTAS_FIXAS), (Gasto, [])):
+            with self.subTest(tipo=tipo.__name__, quantidade=len(dados)):
+                self.gravar(tipo, dados)
+                registros = carregar_snapshot(self.caminho, tipo, VERSAO)
+                self.assertEqual([registro.para_dict() for registro in registros], dados)
+                self.assertEqual([repr(registro.para_dict()) for registro in registros], [repr(registro) for registro in dados])
+                self.assertEqual(
+                    [registro.centavos for registro in registros], [tipo.de_dict(registro).centavos for registro in dados]
+                )
+
+    def test_crc_diferente(self):
+        """Um byte alterado no corpo (crc32 diferente) descarta o snapshot"""
+        conteudo = bytearray(self.gravar())
+        for posicao in (snapshot._CABECALHO.size, len(conteudo) // 2, len(conteudo) - 1):
+            with self.subTest(posicao=posicao):
+                alterado = bytearray(conteudo)
+                alterado[posicao] ^= 0xFF
+                self.reescrever(bytes(alterado))
+                self.assertIsNone(carregar_snapshot(self.caminho, Gasto, VERSAO))
+
+    def test_arquivo_truncado_vazio_ou_ausente(self):
+        """Arquivos truncados, vazios, de outro formato ou ausentes são descartados"""
+        conteudo = self.gravar()
+        for alterado in (conteudo[:10], conteudo[:-1], b'', b'[]', conteudo + b'\0'):
+            with self.subTest(tamanho=len(alterado)):
+                self.reescrever(alterado)
+                self.assertIsNone(carregar_snapshot(self.caminho, Gasto, VERSAO))
+        os.remove(self.caminho)
+        self.assertIsNone(carregar_snapshot(self.caminho, Gasto, VERSAO))
+
+    def test_corpo_invalido_com_crc_correto(self):
+        """Um corpo alterado com o crc32 recalculado nunca levanta exceção: o snapshot é lido ou descartado"""
+        conteudo = self.gravar()
+        tamanho_cabecalho = snapshot._CABECALHO.size
+        aleatorio = random.Random(8)
+        for _ in range(500):
+            corpo = bytearray(conteudo[tamanho_cabecalho:])
+            for _ in range(aleatorio.randint(1, 4)):
+                corpo[aleatorio.randrange(len(corpo))] = aleatorio.randrange(256)
+            cabecalho = bytearray(conteudo[:tamanho_cabecalho])
+            struct.pack_into('<I', cabecalho, 8, zlib.crc32(corpo))
+            self.reescrever(bytes(cabecalho + corpo))
+            resultado = carregar_snapshot(self.caminho, Gasto, VERSAO)
+            self.assertTrue(resultado is None or len(resultado) == len(GASTOS))
+
+    def test_outra_versao_dos_arquivos(self):
+        """Um snapshot gravado para outra versão dos arquivos, ou para outro tipo de registro, é descartado"""
+        self.gravar()
+        self.assertIsNotNone(carregar_snapshot(self.caminho, Gasto, list(VERSAO)))
+        self.assertIsNone(carregar_snapshot(self.caminho, Gasto, (VERSAO[0] + 1, VERSAO[1])))
+        self.assertIsNone(carregar_snapshot(self.caminho, Receita, VERSAO))
+
+class TestSnapshotNaInicializacao(unittest.TestCase):
+    """Na inicialização o snapshot só é usado enquanto corresponder aos arquivos, e nunca impede a carga do JSON"""
+
+    def setUp(self):
+        """Grava os dados e os snapshots (ao sincronizar) em um diretório temporário"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        data_manager = DataManager(data_dir=self.diretorio.name)
+        for dados, adicionar in ((GASTOS[:3], data_manager.adicionar_gasto), (RECEITAS, data_manager.adicionar_receita)):
+            for registro in dados:
+                adicionar(dict(registro))
+        data_manager.sincronizar()
+        self.gastos = data_manager.obter_gastos()
+        self.arquivo_snapshot = data_manager.gastos_file + ".bin"
+        self.gastos_file = data_manager.gastos_file
+        self.assertTrue(os.path.exists(self.arquivo_snapshot))
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def test_snapshot_usado(self):
+        """Com os arquivos inalterados, os gastos vêm do snapshot, iguais aos do JSON"""
+        data_manager = DataManager(data_dir=self.diretorio.name)
+        self.assertIsNotNone(data_manager._carregar_snapshot('gastos'))
+        self.assertEqual(data_manager.obter_gastos(), self.gastos)
+
+    def test_snapshot_corrompido(self):
+        """Um snapshot corrompido é ignorado em silêncio e os dados vêm do JSON"""
+        with open(self.arquivo_snapshot, 'r+b') as f:
+            f.seek(40)
+            f.write(b'\xff' * 16)
+        data_manager = DataManager(data_dir=self.diretorio.name)
+        self.assertIsNone(data_manager._carregar_snapshot('gastos'))
+        self.assertEqual(data_manager.obter_gastos(), self.gastos)
+        self.assertEqual(data_manager.calcular_saldo(3, 2026), DataManager(data_dir=self.diretorio.name).calcular_saldo(3, 2026))
+
+    def test_json_alterado_por_fora(self):
+        """Depois de o JSON ser alterado por outro programa, o snapshot (de outra versão) não é mais usado"""
+        gastos = self.gastos + [{'descricao': 'Novo', 'valor': "7", 'categoria': 'Lazer', 'data': '02/03/2026', 'id': 9}]
+        with open(self.gastos_file, 'w', encoding='utf-8') as f:
+            json.dump(gastos, f, indent=4, ensure_ascii=False)
+        data_manager = DataManager(data_dir=self.diretorio.name)
+        self.assertIsNone(data_manager._carregar_snapshot('gastos'))
+        self.assertEqual(data_manager.obter_gastos(), gastos)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+Testes da tabela virtual: janela de linhas materializadas (sem o Tk) e respostas iguais às do Treeview
+"""
+import math
+import random
+import tkinter as tk
+import unittest
+from tkinter import ttk
+
+from views.janela_linhas import MARGEM_LINHAS, JanelaLinhas
+from views.tabela_virtual import TabelaVirtual
+
+class TestJanelaLinhas(unittest.TestCase):
+    """A janela materializada sempre cobre a parte visível, com a margem, e só é refeita perto das bordas"""
+
+    def conferir(self, janela, total, refeita=False):
+        """A parte visível está dentro da janela; logo após refeita, a janela não passa da margem em volta dela"""
+        visiveis = math.ceil(janela.altura)
+        self.assertGreaterEqual(janela.topo, 0)
+        self.assertLessEqual(janela.inicio, janela.topo)
+        self.assertLessEqual(min(janela.topo + visiveis, total), janela.fim)
+        self.assertLessEqual(janela.fim, total)
+        if refeita:
+            self.assertLessEqual(janela.fim - janela.inicio, visiveis + 2 * janela.margem)
+
+    def test_refazer_nas_pontas_e_no_meio(self):
+        """No início e no fim a janela é cortada pela tabela; no meio tem a margem dos dois lados"""
+        janela = JanelaLinhas()
+        self.assertEqual(janela.refazer(10000), range(0, 30 + MARGEM_LINHAS))
+
+        janela.mostrar(5000, 10000)
+        self.assertEqual(janela.refazer(10000), range(5000 - MARGEM_LINHAS, 5030 + MARGEM_LINHAS))
+
+        janela.mostrar(20000, 10000)
+        self.assertEqual(janela.topo, 10000 - 30)
+        self.assertEqual(janela.refazer(10000), range(10000 - 30 - MARGEM_LINHAS, 10000))
+
+        # Tabelas menores que a parte visível ou vazias
+        self.assertEqual(janela.refazer(12), range(0, 12))
+        self.assertEqual(janela.refazer(0), range(0, 0))
+
+    def test_comandos_da_barra(self):
+        """'moveto' é uma fração de todas as linhas; 'scroll' anda em linhas ou em páginas da altura visível"""
+        janela = JanelaLinhas()
+        janela.refazer(1000)
+        self.assertEqual(janela.topo_do_comando(('moveto', '0.5'), 1000), 500)
+        self.assertEqual(janela.topo_do_comando(('scroll', '3', 'units'), 1000), 3)
+        janela.topo = 100
+        self.assertEqual(janela.topo_do_comando(('scroll', '-2', 'pages'), 1000), 40)
+
+    def test_refeita_so_perto_da_borda(self):
+        """Rolando dentro da janela não é preciso refazê-la; ao chegar a meia margem da borda, sim"""
+        janela = JanelaLinhas()
+        janela.mostrar(5000, 10000)
+        janela.refazer(10000)
+        self.assertFalse(janela.mostrar(5000 + MARGEM_LINHAS // 2 - 1, 10000))
+        self.assertTrue(janela.mostrar(5000 + MARGEM_LINHAS // 2 + 1, 10000))
+        self.assertFalse(janela.mostrar(5000 - MARGEM_LINHAS // 2, 10000))
+        self.assertTrue(janela.mostrar(5000 - MARGEM_LINHAS // 2 - 1, 10000))
+
+        # Sem linhas além da borda, não há o que refazer
+        janela.mostrar(10000, 10000)
+        janela.refazer(10000)
+        self.assertFalse(janela.mostrar(10000, 10000))
+
+    def test_acompanhar_o_treeview(self):
+        """As frações da rolagem do Treeview (relativas à janela) viram posição e fração da barra (relativas ao total)"""
+        janela = JanelaLinhas()
+        self.assertEqual(janela.acompanhar(0.0, 1.0, 0), (0, 1))
+
+        janela.mostrar(1000, 2000)
+        janela.refazer(2000)
+        tamanho = janela.fim - janela.inicio
+        barra = janela.acompanhar(MARGEM_LINHAS / tamanho, (MARGEM_LINHAS + 25) / tamanho, 2000)
+        self.assertEqual(janela.topo, 1000)
+        self.assertAlmostEqual(janela.altura, 25)
+        self.assertAlmostEqual(barra[0], 1000 / 2000)
+        self.assertAlmostEqual(barra[1], 1025 / 2000)
+        self.assertEqual(janela.fracao_do_topo(), MARGEM_LINHAS / tamanho)
+
+    def test_rolagem_aleatoria(self):
+        """Em qualquer sequência de rolagens (barra, roda do mouse e redimensionamento) a parte visível está materializada"""
+        aleatorio = random.Random(12)
+        janela = JanelaLinhas(margem=40)
+        total = 5000
+        janela.refazer(total)
+        refeitas = 0
+        for passo in range(3000):
+            sorteio = aleatorio.random()
+            if sorteio < 0.4:
+                comando = aleatorio.choice([
+                    ('moveto', str(aleatorio.random())),
+                    ('scroll', str(aleatorio.randint(-5, 5)), 'units'),
+                    ('scroll', str(aleatorio.choice((-1, 1))), 'pages')
+                ])
+                refazer = janela.mostrar(janela.topo_do_comando(comando, total), total)
+            else:
+                # O Treeview rolou (ou mudou de altura) dentro das linhas materializadas
+                tamanho = janela.fim - janela.inicio
+                altura = aleatorio.randint(5, 40) if sorteio < 0.45 else math.ceil(janela.altura)
+                primeiro = aleatorio.randint(0, max(0, tamanho - altura))
+                janela.acompanhar(primeiro / tamanho, min(tamanho, primeiro + altura) / tamanho, total)
+                refazer = janela.perto_da_borda(total)
+            if refazer:
+                janela.refazer(total)
+                refeitas += 1
+            if passo % 10 == 0 or refazer:
+                with self.subTest(passo=passo):
+                    self.conferir(janela, total, refazer)
+        self.assertGreater(refeitas, 0)
+
+class TestRespostasDoTreeview(unittest.TestCase):
+    """item() devolve valores e tags como o Treeview, para que int(tags[0]) funcione igual nos dois"""
+
+    def criar_tabela(self, linhas):
+        """Cria a tabela sem o Treeview (nenhuma linha materializada), apenas com o modelo das linhas"""
+        tabela = TabelaVirtual.__new__(TabelaVirtual)
+        tabela.linhas = [[tuple(valores), tabela._tags(tags)] for valores, tags in linhas]
+        tabela.janela = JanelaLinhas()
+        return tabela
+
+    def test_tags_e_valores_em_texto(self):
+        """Tags e valores voltam como tupla de textos (ou '' se vazios); no dicionário, como listas convertidas"""
+        tabela = self.criar_tabela([
+            (("Mercado", 10, "R$ 10.00"), (7,)),
+            (("Salário",), ('3', 'Receita', 'pendente')),
+            ((), ())
+        ])
+        self.assertEqual(tabela.item('0', 'tags'), ('7',))
+        self.assertEqual(int(tabela.item('0', 'tags')[0]), 7)
+        self.assertEqual(tabela.item('0', 'values'), ("Mercado", "10", "R$ 10.00"))
+        self.assertEqual(tabela.item('1', 'tags'), ('3', 'Receita', 'pendente'))
+        self.assertEqual(tabela.item('2', 'tags'), '')
+        self.assertEqual(tabela.item('2', 'values'), '')
+
+        self.assertEqual(tabela.item('0')['values'], ["Mercado", 10, "R$ 10.00"])
+        self.assertEqual(tabela.item('1')['tags'], [3, 'Receita', 'pendente'])
+        self.assertEqual(tabela.item('2')['tags'], '')
+
+        # A alteração fora da janela materializada fica só no modelo
+        tabela.item('0', tags=(7, 'pago'))
+        self.assertEqual(tabela.item('0', 'tags'), ('7', 'pago'))
+
+    def test_igual_ao_treeview(self):
+        """Com um display disponível, as respostas são comparadas com as de um Treeview de verdade"""
+        try:
+            raiz = tk.Tk()
+        except tk.TclError:
+            self.skipTest("Sem display para o Tk")
+        self.addCleanup(raiz.destroy)
+        linhas = [(("Mercado", 10, "R$ 10.00"), (7,)), (("Salário",), ('3', 'Receita')), (("",), ())]
+
+        arvore = ttk.Treeview(raiz, columns=('a', 'b', 'c'))
+        tabela = TabelaVirtual(raiz, columns=('a', 'b', 'c'))
+        for valores, tags in linhas:
+            item = arvore.insert('', 'end', values=valores, tags=tags)
+            tabela.insert('', 'end', values=valores, tags=tags)
+            for opcao in ('values', 'tags'):
+                self.assertEqual(tabela.item(str(len(tabela.linhas) - 1), opcao), arvore.item(item, opcao))
+            self.assertEqual(tabela.item(str(len(tabela.linhas) - 1))['tags'], arvore.item(item)['tags'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Testes das transações do gerenciador de dados: uma gravação por coleção e desfazimento em caso de erro
+"""
+import tempfile
+import unittest
+from unittest import mock
+
+from models.data_manager import DataManager
+
+MESES = [(mes, 2026) for mes in range(1, 13)]
+
+class TestTransacao(unittest.TestCase):
+    """Alterações em lote gravam cada coleção alterada uma única vez, e um erro desfaz todas elas"""
+
+    def setUp(self):
+        """Cria o gerenciador de dados em um diretório temporário com gastos, receitas e contas fixas"""
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.data_manager = DataManager(data_dir=self.diretorio.name)
+        for dia in range(1, 11):
+            self.data_manager.adicionar_gasto({
+                'descricao': f"Mercado {dia}", 'valor': 10.0 * dia, 'categoria': 'Alimentação', 'data': f"{dia:02d}/03/2026"
+            })
+        self.data_manager.adicionar_receita({
+            'descricao': 'Salário', 'valor': 3000.0, 'recorrente': True, 'data_inicio': '01/01/2026'
+        })
+        for descricao in ('Aluguel', 'Internet', 'Academia'):
+            self.data_manager.adicionar_conta_fixa({
+                'descricao': descricao, 'valor': 100.0, 'recorrente': True, 'data_inicio': '01/01/2026', 'data_limite': '10'
+            })
+        self.data_manager.marcar_conta_como_paga(1, 2, 2026)
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        self.diretorio.cleanup()
+
+    def estado(self):
+        """Retorna o que as telas consultam: coleções, índices por mês, resumo mensal, busca, colunas e pagamentos"""
+        data_manager = self.data_manager
+        return {
+            'gastos': data_manager.obter_gastos(),
+            'receitas': data_manager.obter_receitas(),
+            'contas_fixas': data_manager.obter_contas_fixas(),
+            'por_mes': [data_manager.obter_gastos_por_periodo(mes, ano) for mes, ano in MESES],
+            'resumo': [data_manager.obter_resumo_mensal(mes, ano) for mes, ano in MESES],
+            'busca': data_manager.consulta().texto('mercado').lista(),
+            'total_gastos': data_manager.calcular_total_gastos(),
+            'por_categoria': data_manager.obter_gastos_por_categoria(3, 2026),
+            'pendentes': data_manager.contar_contas_pendentes((1, 2026), (12, 2026)),
+            'pagas': [data_manager.verificar_conta_paga(conta_id, 3, 2026) for conta_id in (1, 2, 3)]
+        }
+
+    def alterar(self):
+        """Faz alterações em lote nas três coleções"""
+        data_manager = self.data_manager
+        data_manager.adicionar_gastos([
+            {'descricao': f"Feira {dia}", 'valor': 5.0, 'categoria': 'Alimentação', 'data': f"{dia:02d}/04/2026"}
+            for dia in range(1, 21)
+        ])
+        data_manager.atualizar_gasto(1, {'descricao': 'Mercado editado', 'valor': 999.0, 'categoria': 'Lazer', 'data': '01/05/2026'})
+        data_manager.excluir_gasto(2)
+        data_manager.marcar_contas_como_pagas([1, 2, 3], 3, 2026)
+        data_manager.marcar_conta_como_paga(1, 2, 2026, status_pago=False)
+        data_manager.adicionar_receita({'descricao': 'Extra', 'valor': 50.0, 'recorrente': False, 'data': '15/03/2026'})
+
+    def test_uma_gravacao_por_colecao(self):
+        """Dentro da transação nada é gravado; ao final cada coleção alterada é gravada uma única vez"""
+        armazenamento = self.data_manager.armazenamento
+        with mock.patch.object(armazenamento, 'registrar', wraps=armazenamento.registrar) as registrar, \
+                mock.patch.object(armazenamento, 'salvar', wraps=armazenamento.salvar) as salvar:
+            with self.data_manager.transacao():
+                self.alterar()
+                self.assertEqual(registrar.call_count, 0)
+            self.assertEqual(sorted(chamada.args[0] for chamada in registrar.call_args_list),
+                             ['contas_fixas', 'gastos', 'receitas'])
+            # No armazenamento JSON, cada registro regrava o arquivo da coleção uma vez
+            self.assertEqual(sorted(chamada.args[0] for chamada in salvar.call_args_list),
+                             ['contas_fixas', 'gastos', 'receitas'])
+
+        # As operações acumuladas chegam todas ao armazenamento
+        esperado = self.estado()
+        self.assertEqual(DataManager(data_dir=self.diretorio.name).obter_gastos(), esperado['gastos'])
+
+    def test_apis_em_lote_gravam_uma_vez(self):
+        """adicionar_gastos e marcar_contas_como_pagas gravam a coleção uma única vez"""
+        armazenamento = self.data_manager.armazenamento
+        with mock.patch.object(armazenamento, 'registrar', wraps=armazenamento.registrar) as registrar:
+            self.data_manager.adicionar_gastos([
+                {'descricao': 'Feira', 'valor': 5.0, 'categoria': 'Alimentação', 'data': f"{dia:02d}/04/2026"}
+                for dia in range(1, 21)
+            ])
+            self.data_manager.marcar_contas_como_pagas([1, 2, 3], 4, 2026)
+        self.assertEqual([chamada.args[0] for chamada in registrar.call_args_list], ['gastos', 'contas_fixas'])
+        self.assertEqual(len(registrar.call_args_list[0].args[1]), 20)
+
+    def test_erro_no_meio_desfaz_tudo(self):
+        """Uma exceção no meio da transação desfaz as coleções, os índices, o resumo e os pagamentos em memória"""
+        antes = self.estado()
+        with open(self.data_manager.gastos_file, encoding='utf-8') as f:
+            arquivo_antes = f.read()
+
+        with self.assertRaises(RuntimeError):
+            with self.data_manager.transacao():
+                self.alterar()
+                raise RuntimeError("falha no meio da transação")
+
+        self.assertEqual(self.estado(), antes)
+        with open(self.data_manager.gastos_file, encoding='utf-8') as f:
+            self.assertEqual(f.read(), arquivo_antes)
+
+    def test_erro_em_lote_desfaz_o_lote(self):
+        """Um gasto inválido no meio de adicionar_gastos desfaz os gastos já incluídos pelo lote"""
+        antes = self.estado()
+        with self.assertRaises(Exception):
+            self.data_manager.adicionar_gastos([
+                {'descricao': 'Feira', 'valor': 5.0, 'categoria': 'Alimentação', 'data': '01/04/2026'},
+                None
+            ])
+        self.assertEqual(self.estado(), antes)
+
+    def test_erro_ao_gravar_desfaz_a_colecao(self):
+        """Se a gravação final falhar, a coleção volta ao que está no armazenamento"""
+        antes = self.estado()
+        with mock.patch.object(self.data_manager.armazenamento, 'registrar', side_effect=OSError("disco cheio")):
+            with self.assertRaises(OSError):
+                self.data_manager.adicionar_gastos([
+                    {'descricao': 'Feira', 'valor': 5.0, 'categoria': 'Alimentação', 'data': f"{dia:02d}/04/2026"}
+                    for dia in range(1, 6)
+                ])
+        self.assertEqual(self.estado(), antes)
+
+if __name__ == '__main__':
+    unittest.main()
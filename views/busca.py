@@ -0,0 +1,154 @@
+"""
+Módulo de visualização da aba Buscar, com a busca por descrição em todos os períodos
+"""
+import tkinter as tk
+from tkinter import ttk
+
+from views.tabela_virtual import TabelaVirtual
+
+# Tempo (em milissegundos) sem digitação antes de a busca ser feita
+ATRASO_BUSCA_MS = 250
+
+# Quantidade máxima de resultados exibidos
+LIMITE_RESULTADOS = 500
+
+class BuscaFrame(ttk.Frame):
+    """Frame para a aba de Busca"""
+    
+    def __init__(self, parent, data_manager):
+        """Inicializa o frame de Busca"""
+        super().__init__(parent)
+        self.data_manager = data_manager
+        
+        # Busca agendada enquanto o usuário digita
+        self._busca_agendada = None
+        
+        # Configurando o layout
+        self.configure(padding=10)
+        
+        # Criando os widgets
+        self.criar_widgets()
+    
+    def criar_widgets(self):
+        """Cria os widgets do frame"""
+        # Frame para o título
+        titulo_frame = ttk.Frame(self)
+        titulo_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # Título
+        titulo_label = ttk.Label(
+            titulo_frame,
+            text="Buscar Registros",
+            style="Title.TLabel"
+        )
+        titulo_label.pack(side=tk.LEFT)
+        
+        # Frame para a caixa de busca
+        busca_frame = ttk.Frame(self)
+        busca_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # Label para a busca
+        ttk.Label(busca_frame, text="Descrição:").pack(side=tk.LEFT, padx=(0, 5))
+        
+        # Caixa de busca (a busca é refeita a cada digitação, após uma pausa)
+        self.busca_var = tk.StringVar()
+        busca_entry = ttk.Entry(busca_frame, textvariable=self.busca_var, width=40)
+        busca_entry.pack(side=tk.LEFT, padx=(0, 10))
+        busca_entry.bind("<KeyRelease>", self.agendar_busca)
+        busca_entry.bind("<Return>", self.atualizar)
+        
+        # Botão para buscar
+        ttk.Button(
+            busca_frame,
+            text="Buscar",
+            command=self.atualizar,
+            width=10
+        ).pack(side=tk.LEFT)
+        
+        # Quantidade de resultados
+        self.resultados_label = ttk.Label(busca_frame, text="")
+        self.resultados_label.pack(side=tk.RIGHT)
+        
+        # Frame para a tabela
+        tabela_frame = ttk.Frame(self, relief=tk.GROOVE, borderwidth=1)
+        tabela_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        
+        # Criando a tabela (só as linhas visíveis são criadas no Treeview)
+        colunas = ('tipo', 'descricao', 'categoria', 'valor', 'data')
+        self.tabela = TabelaVirtual(
+            tabela_frame,
+            columns=colunas,
+            show='headings',
+            selectmode='browse',
+            style="Treeview"
+        )
+        
+        # Configurando as colunas
+        self.tabela.heading('tipo', text='Tipo')
+        self.tabela.heading('descricao', text='Descrição')
+        self.tabela.heading('categoria', text='Categoria')
+        self.tabela.heading('valor', text='Valor (R$)')
+        self.tabela.heading('data', text='Data / Período')
+        
+        # Configurando a largura das colunas
+        self.tabela.column('tipo', width=100)
+        self.tabela.column('descricao', width=250)
+        self.tabela.column('categoria', width=150)
+        self.tabela.column('valor', width=120)
+        self.tabela.column('data', width=180)
+        
+        # Adicionando a tabela (que já tem a própria scrollbar) ao frame
+        self.tabela.pack(fill=tk.BOTH, expand=True)
+    
+    def agendar_busca(self, event=None):
+        """Agenda a busca para depois de uma pausa na digitação"""
+        if self._busca_agendada is not None:
+            self.after_cancel(self._busca_agendada)
+        self._busca_agendada = self.after(ATRASO_BUSCA_MS, self.atualizar)
+    
+    def atualizar(self, event=None):
+        """Atualiza os resultados da busca"""
+        self._busca_agendada = None
+        
+        # Limpando a tabela
+        self.tabela.limpar()
+        
+        texto = self.busca_var.get().strip()
+        if not texto:
+            self.resultados_label.config(text="")
+            return
+        
+        # Os resultados vêm de todos os períodos, dos mais recentes aos mais antigos
+        resultados = self.data_manager.buscar(texto, LIMITE_RESULTADOS)
+        for registro in resultados:
+            self.tabela.insert(
+                '',
+                'end',
+                values=(
+                    registro['tipo'],
+                    registro.get('descricao', ''),
+                    registro.get('categoria', '-'),
+                    f"R$ {float(registro.get('valor') or 0):.2f}",
+                    self.formatar_data(registro)
+                )
+            )
+        
+        # Informando quantos resultados foram encontrados
+        if len(resultados) >= LIMITE_RESULTADOS:
+            self.resultados_label.config(text=f"Exibindo os {LIMITE_RESULTADOS} resultados mais recentes")
+        else:
+            self.resultados_label.config(text=f"{len(resultados)} resultado(s)")
+    
+    def formatar_data(self, registro):
+        """Formata a data (pontual) ou o período (recorrente) de um resultado"""
+        if registro.get('recorrente'):
+            # Receitas e contas recorrentes valem de uma data de início até a de fim (se houver)
+            if registro.get('data_fim'):
+                return f"{registro.get('data_inicio', '')} a {registro['data_fim']}"
+            return f"Desde {registro.get('data_inicio', '')}"
+        
+        if registro.get('mes') and registro.get('ano'):
+            # Conta fixa de um mês/ano específico
+            return f"{int(registro['mes']):02d}/{registro['ano']}"
+        
+        return registro.get('data', '')
@@ -4,7 +4,8 @@ Módulo de visualização da aba Contas Fixas
 import tkinter as tk
 from tkinter import ttk, messagebox
 import datetime
-import calendar
+
+from views.tabela_virtual import TabelaVirtual
 
 class ContasFixasFrame(ttk.Frame):
     """Frame para a aba de Contas Fixas"""
@@ -98,9 +99,9 @@ class ContasFixasFrame(ttk.Frame):
         tabela_frame = ttk.Frame(main_frame)
         tabela_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
-        # Criando a tabela (Treeview)
+        # Criando a tabela (só as linhas visíveis são criadas no Treeview)
         colunas = ('descricao', 'valor', 'periodo', 'status', 'parcelas', 'data_limite')
-        self.tabela = ttk.Treeview(
+        self.tabela = TabelaVirtual(
             tabela_frame, 
             columns=colunas, 
             show='headings',
@@ -123,13 +124,8 @@ class ContasFixasFrame(ttk.Frame):
         self.tabela.column('parcelas', width=100)
         self.tabela.column('data_limite', width=100)
         
-        # Adicionando a tabela ao frame com scrollbar
-        self.tabela.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tabela_frame, orient=tk.VERTICAL, command=self.tabela.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tabela.configure(yscrollcommand=scrollbar.set)
+        # Adicionando a tabela (que já tem a própria scrollbar) ao frame
+        self.tabela.pack(fill=tk.BOTH, expand=True)
         
         # Adicionando evento de clique duplo para editar
         self.tabela.bind("<Double-1>", self.editar_selecionado)
@@ -177,47 +173,15 @@ class ContasFixasFrame(ttk.Frame):
     def atualizar(self, event=None):
         """Atualiza os dados da tabela"""
         # Limpando a tabela
-        for item in self.tabela.get_children():
-            self.tabela.delete(item)
+        self.tabela.limpar()
         
         try:
             # Obtendo o mês e ano selecionados
             mes = int(self.filtro_mes_var.get())
             ano = int(self.filtro_ano_var.get())
             
-            # Obtendo as contas fixas
-            contas_fixas = self.data_manager.obter_contas_fixas()
-            
-            # Filtrando as contas fixas pelo período selecionado
-            contas_filtradas = []
-            for conta in contas_fixas:
-                # Para contas recorrentes
-                if conta.get('recorrente', False):
-                    # Verificando se a data de início é anterior ou igual ao período selecionado
-                    data_inicio = conta.get('data_inicio', '')
-                    if data_inicio:
-                        try:
-                            data_inicio_obj = datetime.datetime.strptime(data_inicio, "%d/%m/%Y")
-                            data_periodo = datetime.datetime(ano, mes, 1)
-                            
-                            # Verificando se a data de fim é posterior ou igual ao período selecionado
-                            data_fim = conta.get('data_fim', '')
-                            if data_fim:
-                                data_fim_obj = datetime.datetime.strptime(data_fim, "%d/%m/%Y")
-                                if data_inicio_obj <= data_periodo and data_fim_obj >= data_periodo:
-                                    contas_filtradas.append(conta)
-                            else:
-                                # Se não tiver data de fim, considera que a conta ainda está ativa
-                                if data_inicio_obj <= data_periodo:
-                                    contas_filtradas.append(conta)
-                        except ValueError:
-                            # Se houver erro na conversão da data, inclui a conta
-                            contas_filtradas.append(conta)
-                # Para contas não recorrentes
-                else:
-                    # Verificando se o mês e ano correspondem ao período selecionado
-                    if conta.get('mes') == mes and conta.get('ano') == ano:
-                        contas_filtradas.append(conta)
+            # Obtendo as contas fixas do período selecionado (pontuais do mês e recorrentes ativas nele)
+            contas_filtradas = self.data_manager.consulta().tipo('conta_fixa').no_mes(mes, ano)
             
             # Adicionando as contas fixas à tabela
             for conta in contas_filtradas:
@@ -275,7 +239,7 @@ class ContasFixasFrame(ttk.Frame):
                 data_limite = conta.get('data_limite', '-')
                 
                 # Adicionando à tabela
-                self.tabela.insert(
+                item_id = self.tabela.insert(
                     '', 
                     'end', 
                     values=(
@@ -291,7 +255,6 @@ class ContasFixasFrame(ttk.Frame):
                 
                 # Adicionando cor de fundo para contas pagas
                 if pago:
-                    item_id = self.tabela.get_children()[-1]
                     self.tabela.item(item_id, tags=(conta['id'], 'pago'))
                     self.tabela.tag_configure('pago', background='#e6ffe6')  # Verde claro
         except (ValueError, TypeError) as e:
@@ -791,28 +754,8 @@ class ContasFixasFrame(ttk.Frame):
             # Calculando automaticamente a data de fim se for uma conta recorrente parcelada
             if recorrente and not data_fim:
                 try:
-                    # Convertendo a data de início para um objeto datetime
-                    data_inicio_obj = datetime.datetime.strptime(data_inicio, "%d/%m/%Y")
-                    
-                    # Calculando a data de fim (data de início + número de parcelas meses)
-                    data_fim_obj = data_inicio_obj
-                    for _ in range(num_parcelas - 1):  # -1 porque a primeira parcela é na data de início
-                        # Avançando um mês
-                        mes = data_fim_obj.month + 1
-                        ano = data_fim_obj.year
-                        if mes > 12:
-                            mes = 1
-                            ano += 1
-                        
-                        # Ajustando o dia para o último dia do mês se necessário
-                        ultimo_dia = calendar.monthrange(ano, mes)[1]
-                        dia = min(data_fim_obj.day, ultimo_dia)
-                        
-                        # Criando a nova data
-                        data_fim_obj = datetime.datetime(ano, mes, dia)
-                    
-                    # Formatando a data de fim
-                    conta['data_fim'] = data_fim_obj.strftime("%d/%m/%Y")
+                    # Calculando a data de fim (data de início + número de parcelas - 1 meses) pelo cronograma do parcelamento
+                    conta['data_fim'] = self.data_manager.calcular_data_fim_parcelas(data_inicio, num_parcelas)
                     
                 except Exception as e:
                     # Se ocorrer algum erro, apenas não define a data de fim
@@ -830,13 +773,7 @@ class ContasFixasFrame(ttk.Frame):
     def abrir_formulario_editar(self, conta_id):
         """Abre o formulário para editar uma conta fixa existente"""
         # Obtendo a conta
-        contas = self.data_manager.obter_contas_fixas()
-        conta = None
-        
-        for c in contas:
-            if c['id'] == conta_id:
-                conta = c
-                break
+        conta = self.data_manager.obter_conta_fixa(conta_id)
         
         if not conta:
             messagebox.showerror("Erro", "Conta não encontrada!")
@@ -1191,28 +1128,8 @@ class ContasFixasFrame(ttk.Frame):
             # Calculando automaticamente a data de fim se for uma conta recorrente parcelada
             if recorrente and not data_fim:
                 try:
-                    # Convertendo a data de início para um objeto datetime
-                    data_inicio_obj = datetime.datetime.strptime(data_inicio, "%d/%m/%Y")
-                    
-                    # Calculando a data de fim (data de início + número de parcelas meses)
-                    data_fim_obj = data_inicio_obj
-                    for _ in range(num_parcelas - 1):  # -1 porque a primeira parcela é na data de início
-                        # Avançando um mês
-                        mes = data_fim_obj.month + 1
-                        ano = data_fim_obj.year
-                        if mes > 12:
-                            mes = 1
-                            ano += 1
-                        
-                        # Ajustando o dia para o último dia do mês se necessário
-                        ultimo_dia = calendar.monthrange(ano, mes)[1]
-                        dia = min(data_fim_obj.day, ultimo_dia)
-                        
-                        # Criando a nova data
-                        data_fim_obj = datetime.datetime(ano, mes, dia)
-                    
-                    # Formatando a data de fim
-                    conta['data_fim'] = data_fim_obj.strftime("%d/%m/%Y")
+                    # Calculando a data de fim (data de início + número de parcelas - 1 meses) pelo cronograma do parcelamento
+                    conta['data_fim'] = self.data_manager.calcular_data_fim_parcelas(data_inicio, num_parcelas)
                     
                 except Exception as e:
                     # Se ocorrer algum erro, apenas não define a data de fim
@@ -5,6 +5,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import datetime
 
+from views.tabela_virtual import TabelaVirtual
+
 class GastosGeraisFrame(ttk.Frame):
     """Frame para a aba de Gastos Gerais"""
     
@@ -99,9 +101,9 @@ class GastosGeraisFrame(ttk.Frame):
         tabela_frame = ttk.Frame(main_frame, relief=tk.GROOVE, borderwidth=1)
         tabela_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         
-        # Criando a tabela (Treeview)
+        # Criando a tabela (só as linhas visíveis são criadas no Treeview)
         colunas = ('descricao', 'valor', 'categoria', 'data')
-        self.tabela = ttk.Treeview(
+        self.tabela = TabelaVirtual(
             tabela_frame, 
             columns=colunas, 
             show='headings',
@@ -121,13 +123,8 @@ class GastosGeraisFrame(ttk.Frame):
         self.tabela.column('categoria', width=150)
         self.tabela.column('data', width=120)
         
-        # Adicionando a tabela ao frame com scrollbar
-        self.tabela.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tabela_frame, orient=tk.VERTICAL, command=self.tabela.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tabela.configure(yscrollcommand=scrollbar.set)
+        # Adicionando a tabela (que já tem a própria scrollbar) ao frame
+        self.tabela.pack(fill=tk.BOTH, expand=True)
         
         # Adicionando evento de clique duplo para editar
         self.tabela.bind("<Double-1>", self.editar_selecionado)
@@ -164,8 +161,7 @@ class GastosGeraisFrame(ttk.Frame):
     def atualizar(self, event=None):
         """Atualiza os dados da tabela"""
         # Limpando a tabela
-        for item in self.tabela.get_children():
-            self.tabela.delete(item)
+        self.tabela.limpar()
         
         try:
             # Obtendo o mês e ano selecionados
@@ -173,7 +169,7 @@ class GastosGeraisFrame(ttk.Frame):
             ano = int(self.filtro_ano_var.get())
             
             # Obtendo os gastos do período selecionado
-            gastos = self.data_manager.obter_gastos_por_periodo(mes, ano)
+            gastos = self.data_manager.consulta().tipo('gasto').no_mes(mes, ano)
             
             # Adicionando os gastos à tabela
             for gasto in gastos:
@@ -396,13 +392,7 @@ class GastosGeraisFrame(ttk.Frame):
     def abrir_formulario_editar(self, gasto_id):
         """Abre o formulário para editar um gasto existente"""
         # Obtendo o gasto
-        gastos = self.data_manager.obter_gastos()
-        gasto = None
-        
-        for g in gastos:
-            if g['id'] == gasto_id:
-                gasto = g
-                break
+        gasto = self.data_manager.obter_gasto(gasto_id)
         
         if not gasto:
             messagebox.showerror("Erro", "Gasto não encontrado!")
@@ -7,6 +7,8 @@ import datetime
 import os
 import sys
 
+from views.tabela_virtual import TabelaVirtual
+
 class HistoricoFrame(ttk.Frame):
     """Frame para a aba de Histórico"""
     
@@ -90,9 +92,9 @@ class HistoricoFrame(ttk.Frame):
         tabela_frame = ttk.Frame(self)
         tabela_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
-        # Criando a tabela (Treeview)
+        # Criando a tabela (só as linhas visíveis são criadas no Treeview)
         colunas = ('tipo', 'descricao', 'categoria', 'valor', 'data', 'status', 'parcelas')
-        self.tabela = ttk.Treeview(
+        self.tabela = TabelaVirtual(
             tabela_frame, 
             columns=colunas, 
             show='headings',
@@ -117,13 +119,8 @@ class HistoricoFrame(ttk.Frame):
         self.tabela.column('status', width=100)
         self.tabela.column('parcelas', width=80)
         
-        # Adicionando a tabela ao frame com scrollbar
-        self.tabela.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tabela_frame, orient=tk.VERTICAL, command=self.tabela.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tabela.configure(yscrollcommand=scrollbar.set)
+        # Adicionando a tabela (que já tem a própria scrollbar) ao frame
+        self.tabela.pack(fill=tk.BOTH, expand=True)
         
         # Adicionando menu de contexto para contas fixas
         self.tabela.bind("<Button-3>", self.abrir_menu_contexto)
@@ -244,11 +241,11 @@ class HistoricoFrame(ttk.Frame):
             ano = int(self.filtro_ano_var.get())
             
             # Limpando a tabela
-            for item in self.tabela.get_children():
-                self.tabela.delete(item)
+            self.tabela.limpar()
             
-            # Obtendo os dados para o histórico
-            dados_historico = self.data_manager.obter_dados_para_historico(mes, ano)
+            # Obtendo as linhas e os totais do histórico em uma única consulta
+            historico = self.data_manager.obter_historico(mes, ano)
+            dados_historico = historico['dados']
             
             # Adicionando os dados à tabela
             for dado in dados_historico:
@@ -260,45 +257,28 @@ class HistoricoFrame(ttk.Frame):
                 if dado['tipo'] == 'Conta Fixa' and dado.get('parcelado', False):
                     num_parcelas = int(dado.get('num_parcelas', 1))
                     
+                    # O valor da parcela do mês vem calculado pelo cronograma do parcelamento
+                    valor = f"R$ {float(dado['valor_parcela']):.2f}"
+                    
                     # Verificando se tem juros
                     if 'valor_com_juros' in dado:
                         valor_com_juros = float(dado['valor_com_juros'])
                         valor_sem_juros = float(dado['valor_sem_juros'])
                         
-                        # Calculando o valor da parcela com juros
-                        valor_parcela = valor_com_juros / num_parcelas
-                        
                         # Calculando o valor dos juros por parcela
                         juros_total = valor_com_juros - valor_sem_juros
                         juros_por_parcela = juros_total / num_parcelas
                         
-                        # Formatando o valor da parcela
-                        valor = f"R$ {valor_parcela:.2f}"
-                        
                         # Adicionando informação de juros ao status
                         if juros_total > 0:
                             status = dado.get('status', '-')
                             status += f" (Juros: R$ {juros_por_parcela:.2f})"
                             dado['status'] = status
-                    else:
-                        # Calculando o valor da parcela sem juros
-                        valor_parcela = valor_original / num_parcelas
-                        valor = f"R$ {valor_parcela:.2f}"
                     
-                    # Informação de parcelas
-                    if 'data_inicio' in dado:
-                        data_inicio = datetime.datetime.strptime(dado['data_inicio'], "%d/%m/%Y")
-                        mes_inicio = data_inicio.month
-                        ano_inicio = data_inicio.year
-                        
-                        # Calculando o número da parcela atual
-                        meses_passados = (ano - ano_inicio) * 12 + (mes - mes_inicio)
-                        parcela_atual = meses_passados + 1  # Começando em 1, não em 0
-                        
-                        if 1 <= parcela_atual <= num_parcelas:
-                            parcelas_info = f"{parcela_atual}/{num_parcelas}"
-                        else:
-                            parcelas_info = f"{num_parcelas}x"
+                    # Informação de parcelas (a parcela do mês já vem calculada, ou None fora do parcelamento)
+                    parcela_atual = dado.get('parcela_atual')
+                    if parcela_atual is not None:
+                        parcelas_info = f"{parcela_atual}/{num_parcelas}"
                     else:
                         parcelas_info = f"{num_parcelas}x"
                 else:
@@ -331,25 +311,17 @@ class HistoricoFrame(ttk.Frame):
             self.tabela.tag_configure('conta fixa', background='#cce5ff')
             self.tabela.tag_configure('pago', background='#e6ffe6')  # Verde claro
             
-            # Atualizando o resumo
-            self.atualizar_resumo(mes, ano)
+            # Atualizando o resumo com os totais da mesma consulta
+            self.atualizar_resumo(historico)
             
         except (ValueError, TypeError) as e:
             messagebox.showerror("Erro", f"Erro ao atualizar o histórico: {str(e)}")
     
-    def atualizar_resumo(self, mes, ano):
-        """Atualiza o resumo financeiro"""
-        # Obtendo os dados
-        gastos = self.data_manager.obter_gastos_por_periodo(mes, ano)
-        receitas = self.data_manager.obter_receitas_por_periodo(mes, ano)
-        contas_fixas = self.data_manager.obter_contas_fixas_por_periodo(mes, ano)
-        
-        # Calculando os totais
-        total_gastos = self.data_manager.calcular_total_gastos(gastos)
-        total_receitas = self.data_manager.calcular_total_receitas(receitas)
-        
-        # Calculando o total de contas fixas considerando parcelas
-        total_contas_fixas = self.calcular_total_contas_fixas_com_parcelas(contas_fixas, mes, ano)
+    def atualizar_resumo(self, historico):
+        """Atualiza o resumo financeiro com os totais retornados junto com o histórico"""
+        total_gastos = historico['total_gastos']
+        total_receitas = historico['total_receitas']
+        total_contas_fixas = historico['total_contas_fixas']
         
         saldo = total_receitas - total_gastos - total_contas_fixas
         
@@ -364,49 +336,6 @@ class HistoricoFrame(ttk.Frame):
             foreground="green" if saldo >= 0 else "red"
         )
     
-    def calcular_total_contas_fixas_com_parcelas(self, contas_fixas, mes, ano):
-        """Calcula o total de contas fixas considerando parcelas"""
-        total = 0.0
-        
-        for conta in contas_fixas:
-            valor_original = float(conta['valor'])
-            
-            # Verificando se a conta é parcelada
-            if conta.get('parcelado', False):
-                num_parcelas = int(conta.get('num_parcelas', 1))
-                
-                # Verificando se tem juros
-                if 'valor_com_juros' in conta:
-                    valor_com_juros = float(conta['valor_com_juros'])
-                    
-                    # Calculando o valor da parcela com juros
-                    valor_parcela = valor_com_juros / num_parcelas
-                else:
-                    # Calculando o valor da parcela sem juros
-                    valor_parcela = valor_original / num_parcelas
-                
-                # Verificando se a parcela atual está dentro do período válido
-                if 'data_inicio' in conta:
-                    data_inicio = datetime.datetime.strptime(conta['data_inicio'], "%d/%m/%Y")
-                    mes_inicio = data_inicio.month
-                    ano_inicio = data_inicio.year
-                    
-                    # Calculando o número da parcela atual
-                    meses_passados = (ano - ano_inicio) * 12 + (mes - mes_inicio)
-                    parcela_atual = meses_passados + 1  # Começando em 1, não em 0
-                    
-                    # Só adiciona ao total se a parcela atual estiver dentro do período válido
-                    if 1 <= parcela_atual <= num_parcelas:
-                        total += valor_parcela
-                else:
-                    # Se não tiver data de início, considera o valor da parcela
-                    total += valor_parcela
-            else:
-                # Se não for parcelada, adiciona o valor total
-                total += valor_original
-        
-        return total
-    
     def abrir_menu_contexto(self, event):
         """Abre o menu de contexto ao clicar com o botão direito"""
         # Obtendo o item selecionado
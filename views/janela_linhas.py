@@ -0,0 +1,76 @@
+"""
+Módulo com a janela de linhas da tabela virtual: parte visível e linhas materializadas em volta dela, sem depender do Tk
+"""
+import math
+
+# Linhas criadas acima e abaixo da parte visível da tabela
+MARGEM_LINHAS = 100
+
+# Quantidade de linhas visíveis suposta até a tabela ser exibida
+LINHAS_VISIVEIS_INICIAIS = 30
+
+class JanelaLinhas:
+    """Primeira linha e altura da parte visível e faixa [inicio, fim) das linhas materializadas, com uma margem"""
+    
+    def __init__(self, margem=MARGEM_LINHAS):
+        """Inicializa a janela no topo da tabela, ainda sem linhas materializadas"""
+        self.margem = margem
+        
+        # Posição da primeira linha visível e altura da parte visível (em linhas)
+        self.topo = 0
+        self.altura = LINHAS_VISIVEIS_INICIAIS
+        
+        # Linhas materializadas: [inicio, fim)
+        self.inicio = 0
+        self.fim = 0
+    
+    def contem(self, posicao):
+        """Indica se a linha está materializada"""
+        return self.inicio <= posicao < self.fim
+    
+    def topo_do_comando(self, args, total):
+        """Converte um comando da barra de rolagem ('moveto' ou 'scroll'), relativo a todas as linhas, na nova primeira linha"""
+        if args[0] == 'moveto':
+            return round(float(args[1]) * total)
+        passo = int(args[1])
+        if args[2] == 'pages':
+            passo *= max(1, round(self.altura))
+        return self.topo + passo
+    
+    def mostrar(self, topo, total):
+        """Move a parte visível para começar na linha informada; retorna True se a janela precisar ser refeita"""
+        self.topo = max(0, min(topo, total - round(self.altura)))
+        return self.perto_da_borda(total)
+    
+    def perto_da_borda(self, total):
+        """Indica se a parte visível se aproximou de uma borda da janela que ainda tem linhas além dela"""
+        limiar = self.margem // 2
+        visiveis = math.ceil(self.altura)
+        if self.topo < self.inicio + limiar and self.inicio > 0:
+            return True
+        if self.topo + visiveis > self.fim - limiar and self.fim < total:
+            return True
+        return False
+    
+    def acompanhar(self, primeiro, ultimo, total):
+        """Atualiza a parte visível a partir da rolagem do Treeview (frações da janela) e retorna a da barra (frações do total)"""
+        tamanho = self.fim - self.inicio
+        if not total or not tamanho:
+            return 0, 1
+        
+        # O Treeview informa frações das linhas materializadas
+        self.altura = max(1.0, (ultimo - primeiro) * tamanho)
+        self.topo = self.inicio + round(primeiro * tamanho)
+        return self.topo / total, min(1.0, (self.topo + self.altura) / total)
+    
+    def refazer(self, total):
+        """Centraliza a janela na parte visível e retorna as posições das linhas a materializar"""
+        visiveis = math.ceil(self.altura)
+        self.topo = max(0, min(self.topo, total - visiveis))
+        self.inicio = max(0, self.topo - self.margem)
+        self.fim = min(total, self.topo + visiveis + self.margem)
+        return range(self.inicio, self.fim)
+    
+    def fracao_do_topo(self):
+        """Retorna a posição da primeira linha visível dentro da janela, como fração para o yview_moveto do Treeview"""
+        return (self.topo - self.inicio) / (self.fim - self.inicio)
@@ -5,6 +5,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import datetime
 
+from views.tabela_virtual import TabelaVirtual
+
 class ReceitasFrame(ttk.Frame):
     """Frame para a aba de Receitas"""
     
@@ -97,9 +99,9 @@ class ReceitasFrame(ttk.Frame):
         tabela_frame = ttk.Frame(main_frame)
         tabela_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
-        # Criando a tabela (Treeview)
+        # Criando a tabela (só as linhas visíveis são criadas no Treeview)
         colunas = ('descricao', 'valor', 'tipo', 'data')
-        self.tabela = ttk.Treeview(
+        self.tabela = TabelaVirtual(
             tabela_frame, 
             columns=colunas, 
             show='headings',
@@ -118,13 +120,8 @@ class ReceitasFrame(ttk.Frame):
         self.tabela.column('tipo', width=100)
         self.tabela.column('data', width=150)
         
-        # Adicionando a tabela ao frame com scrollbar
-        self.tabela.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tabela_frame, orient=tk.VERTICAL, command=self.tabela.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tabela.configure(yscrollcommand=scrollbar.set)
+        # Adicionando a tabela (que já tem a própria scrollbar) ao frame
+        self.tabela.pack(fill=tk.BOTH, expand=True)
         
         # Adicionando evento de clique duplo para editar
         self.tabela.bind("<Double-1>", self.editar_selecionado)
@@ -158,16 +155,15 @@ class ReceitasFrame(ttk.Frame):
     def atualizar(self, event=None):
         """Atualiza os dados da tabela"""
         # Limpando a tabela
-        for item in self.tabela.get_children():
-            self.tabela.delete(item)
+        self.tabela.limpar()
         
         try:
             # Obtendo o mês e ano selecionados
             mes = int(self.filtro_mes_var.get())
             ano = int(self.filtro_ano_var.get())
             
-            # Obtendo as receitas do período selecionado
-            receitas = self.data_manager.obter_receitas_por_periodo(mes, ano)
+            # Obtendo as receitas do período selecionado (pontuais do mês e recorrentes ativas nele)
+            receitas = self.data_manager.consulta().tipo('receita').no_mes(mes, ano)
             
             # Adicionando as receitas à tabela
             for receita in receitas:
@@ -466,13 +462,7 @@ class ReceitasFrame(ttk.Frame):
     def abrir_formulario_editar(self, receita_id):
         """Abre o formulário para editar uma receita existente"""
         # Obtendo a receita
-        receitas = self.data_manager.obter_receitas()
-        receita = None
-        
-        for r in receitas:
-            if r['id'] == receita_id:
-                receita = r
-                break
+        receita = self.data_manager.obter_receita(receita_id)
         
         if not receita:
             messagebox.showerror("Erro", "Receita não encontrada!")
@@ -0,0 +1,213 @@
+"""
+Módulo com a tabela virtual, que mantém todas as linhas em Python e cria no Treeview apenas as visíveis
+"""
+import tkinter as tk
+from tkinter import ttk
+
+from views.janela_linhas import MARGEM_LINHAS, JanelaLinhas
+
+def _valor_tk(valor):
+    """Converte um valor como o Treeview faz ao devolvê-lo em um dicionário (números inteiros em texto viram int)"""
+    valor = str(valor)
+    try:
+        return int(valor)
+    except ValueError:
+        return valor
+
+class TabelaVirtual(ttk.Frame):
+    """Treeview com barra de rolagem que só materializa a janela visível (mais uma margem) das suas linhas"""
+    
+    def __init__(self, parent, columns, margem=MARGEM_LINHAS, **opcoes):
+        """Inicializa a tabela vazia; as opções restantes são repassadas ao Treeview"""
+        super().__init__(parent)
+        
+        # Todas as linhas da tabela, como [valores, tags]; o iid de cada linha é a sua posição
+        self.linhas = []
+        
+        # Parte visível e linhas materializadas no Treeview, calculadas fora do Tk
+        self.janela = JanelaLinhas(margem)
+        
+        # Linhas selecionadas, inclusive as que estão fora da janela materializada
+        self._selecionadas = set()
+        
+        # Materialização agendada após inserções ou rolagem
+        self._agendado = None
+        
+        # Criando o Treeview e a barra de rolagem, que reflete todas as linhas e não só as materializadas
+        self.arvore = ttk.Treeview(self, columns=columns, **opcoes)
+        self.arvore.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.rolar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.arvore.configure(yscrollcommand=self._ao_rolar_arvore)
+        
+        # Acompanhando a seleção feita com o mouse e o teclado
+        self.arvore.bind("<<TreeviewSelect>>", self._ao_selecionar, add='+')
+    
+    # Operações repassadas ao Treeview
+    
+    def heading(self, coluna, **opcoes):
+        """Configura o cabeçalho de uma coluna"""
+        return self.arvore.heading(coluna, **opcoes)
+    
+    def column(self, coluna, **opcoes):
+        """Configura uma coluna"""
+        return self.arvore.column(coluna, **opcoes)
+    
+    def tag_configure(self, tag, **opcoes):
+        """Configura a aparência das linhas com uma tag"""
+        return self.arvore.tag_configure(tag, **opcoes)
+    
+    def bind(self, sequencia=None, funcao=None, add=None):
+        """Associa um evento ao Treeview (os eventos de mouse e teclado acontecem nele)"""
+        return self.arvore.bind(sequencia, funcao, add)
+    
+    def identify_row(self, y):
+        """Retorna o iid da linha na coordenada y (ou '' se não houver)"""
+        return self.arvore.identify_row(y)
+    
+    # Modelo das linhas
+    
+    def insert(self, parent, index, values=(), tags=()):
+        """Adiciona uma linha ao fim da tabela e retorna o seu iid (as linhas não têm hierarquia)"""
+        self.linhas.append([tuple(values), self._tags(tags)])
+        self._agendar()
+        return str(len(self.linhas) - 1)
+    
+    def get_children(self, item=None):
+        """Retorna os iids de todas as linhas, materializadas ou não"""
+        return tuple(str(posicao) for posicao in range(len(self.linhas)))
+    
+    def delete(self, *itens):
+        """Remove linhas da tabela; as linhas seguintes passam a ter novos iids"""
+        removidas = {int(item) for item in itens}
+        if len(removidas) == len(self.linhas):
+            self.limpar()
+            return
+        self.linhas = [linha for posicao, linha in enumerate(self.linhas) if posicao not in removidas]
+        self._selecionadas.clear()
+        self._materializar()
+    
+    def limpar(self):
+        """Remove todas as linhas da tabela"""
+        self.linhas = []
+        self._selecionadas.clear()
+        self.janela.topo = 0
+        self._materializar()
+    
+    def item(self, item, option=None, **opcoes):
+        """Consulta ou altera os valores e as tags de uma linha, respondendo como o Treeview"""
+        posicao = int(item)
+        linha = self.linhas[posicao]
+        if 'values' in opcoes:
+            linha[0] = tuple(opcoes['values'])
+        if 'tags' in opcoes:
+            linha[1] = self._tags(opcoes['tags'])
+        if opcoes and self.janela.contem(posicao):
+            self.arvore.item(item, values=linha[0], tags=linha[1])
+        
+        # Uma opção volta como o Tk a devolve: tupla de textos, ou '' quando vazia
+        if option in ('values', 'tags'):
+            valores = linha[0] if option == 'values' else linha[1]
+            return tuple(str(valor) for valor in valores) if valores else ''
+        if option is None and not opcoes:
+            # No dicionário, o Treeview devolve listas e converte os números inteiros
+            return {
+                'text': '',
+                'image': '',
+                'values': [_valor_tk(valor) for valor in linha[0]] if linha[0] else '',
+                'open': 0,
+                'tags': [_valor_tk(tag) for tag in linha[1]] if linha[1] else ''
+            }
+        return None
+    
+    def selection(self):
+        """Retorna os iids das linhas selecionadas"""
+        return tuple(str(posicao) for posicao in sorted(self._selecionadas))
+    
+    def selection_set(self, *itens):
+        """Seleciona linhas (materializadas ou não)"""
+        if len(itens) == 1 and isinstance(itens[0], (list, tuple)):
+            itens = itens[0]
+        self._selecionadas = {int(item) for item in itens}
+        self._selecionar_janela()
+    
+    def _tags(self, tags):
+        """Normaliza as tags de uma linha como uma tupla"""
+        if isinstance(tags, (list, tuple)):
+            return tuple(tags)
+        return (tags,) if tags != '' else ()
+    
+    # Rolagem e materialização
+    
+    def rolar(self, *args):
+        """Trata os comandos da barra de rolagem ('moveto' e 'scroll'), que se referem a todas as linhas"""
+        self.mostrar(self.janela.topo_do_comando(args, len(self.linhas)))
+    
+    def mostrar(self, topo):
+        """Rola a tabela para que a linha informada seja a primeira visível"""
+        if self.janela.mostrar(topo, len(self.linhas)):
+            self._materializar()
+        elif self.janela.fim > self.janela.inicio:
+            # Dentro da janela materializada basta rolar o próprio Treeview
+            self.arvore.yview_moveto(self.janela.fracao_do_topo())
+    
+    def _ao_rolar_arvore(self, primeiro, ultimo):
+        """Converte a rolagem do Treeview (relativa à janela) em posição na tabela inteira"""
+        total = len(self.linhas)
+        self.scrollbar.set(*self.janela.acompanhar(float(primeiro), float(ultimo), total))
+        if not total or self.janela.fim == self.janela.inicio:
+            return
+        
+        # Rolando com a roda do mouse ou com o teclado até perto da borda, a janela é refeita em volta da parte visível
+        if self.janela.perto_da_borda(total):
+            self._agendar()
+    
+    def _agendar(self):
+        """Agenda a materialização para quando a interface estiver ociosa"""
+        if self._agendado is None:
+            self._agendado = self.after_idle(self._materializar)
+    
+    def _materializar(self):
+        """Recria no Treeview apenas as linhas da parte visível e da margem em volta dela"""
+        if self._agendado is not None:
+            self.after_cancel(self._agendado)
+            self._agendado = None
+        
+        posicoes = self.janela.refazer(len(self.linhas))
+        
+        self.arvore.delete(*self.arvore.get_children())
+        for posicao in posicoes:
+            valores, tags = self.linhas[posicao]
+            self.arvore.insert('', 'end', iid=str(posicao), values=valores, tags=tags)
+        self._selecionar_janela()
+        
+        if posicoes:
+            self.arvore.yview_moveto(self.janela.fracao_do_topo())
+        else:
+            self.scrollbar.set(0, 1)
+    
+    # Seleção
+    
+    def _selecionar_janela(self):
+        """Reflete no Treeview a seleção das linhas materializadas"""
+        self.arvore.selection_set([
+            str(posicao) for posicao in self._selecionadas if self.janela.contem(posicao)
+        ])
+    
+    def _ao_selecionar(self, event=None):
+        """Atualiza a seleção a partir do Treeview, preservando as linhas selecionadas fora da janela"""
+        na_janela = {int(item) for item in self.arvore.selection()}
+        if na_janela and str(self.arvore.cget('selectmode')) == 'browse':
+            # Um clique em modo 'browse' substitui a seleção anterior
+            self._selecionadas = na_janela
+            return
+        fora = {posicao for posicao in self._selecionadas if not self.janela.contem(posicao)}
+        self._selecionadas = fora | na_janela
+    
+    def destroy(self):
+        """Cancela a materialização agendada antes de destruir a tabela"""
+        if self._agendado is not None:
+            self.after_cancel(self._agendado)
+            self._agendado = None
+        super().destroy()
@@ -250,17 +250,13 @@ class VisaoGeralFrame(ttk.Frame):
     
     def atualizar_resumo(self, mes, ano):
         """Atualiza o resumo financeiro"""
-        # Obtendo os dados
-        gastos = self.data_manager.obter_gastos_por_periodo(mes, ano)
-        receitas = self.data_manager.obter_receitas_por_periodo(mes, ano)
-        contas_fixas = self.data_manager.obter_contas_fixas_por_periodo(mes, ano)
+        # Os totais vêm prontos do resumo mensal, sem percorrer os registros
+        resumo = self.data_manager.obter_resumo_mensal(mes, ano)
+        total_gastos = resumo['total_gastos']
+        total_receitas = resumo['total_receitas']
         
-        # Calculando os totais
-        total_gastos = self.data_manager.calcular_total_gastos(gastos)
-        total_receitas = self.data_manager.calcular_total_receitas(receitas)
-        
-        # Calculando o total de contas fixas considerando parcelas
-        total_contas_fixas = self.calcular_total_contas_fixas_com_parcelas(contas_fixas, mes, ano)
+        # Total de contas fixas considerando parcelas e juros, o mesmo do saldo e da aba Histórico
+        total_contas_fixas = resumo['total_contas_fixas']
         
         saldo = total_receitas - total_gastos - total_contas_fixas
         
@@ -276,29 +272,7 @@ class VisaoGeralFrame(ttk.Frame):
         )
         
         # Atualizando estatísticas
-        self.atualizar_estatisticas(gastos)
-    
-    def calcular_total_contas_fixas_com_parcelas(self, contas_fixas, mes, ano):
-        """Calcula o total de contas fixas considerando parcelas"""
-        total = 0.0
-        
-        for conta in contas_fixas:
-            valor_original = float(conta['valor'])
-            
-            # Verificando se a conta é parcelada
-            if conta.get('parcelado', False):
-                num_parcelas = int(conta.get('num_parcelas', 1))
-                
-                # Calculando o valor da parcela
-                valor_parcela = valor_original / num_parcelas
-                
-                # Adicionando apenas o valor da parcela
-                total += valor_parcela
-            else:
-                # Se não for parcelada, adiciona o valor total
-                total += valor_original
-        
-        return total
+        self.atualizar_estatisticas(self.data_manager.consulta().tipo('gasto').no_mes(mes, ano).lista())
     
     def atualizar_estatisticas(self, gastos):
         """Atualiza as estatísticas"""